@@ -4,20 +4,9 @@
 Add Ashdod Port logo to all HTML presentation files
 """
 
-import re
+from html_patch_engine import HTML_FILES, patch_file, patch_files
 
-def add_logo_to_html(file_path):
-    """Add logo to HTML file"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Check if logo already exists
-    if 'class="logo"' in content:
-        print(f"  לוגו כבר קיים ב-{file_path}")
-        return False
-    
-    # Add logo CSS before closing </style>
-    logo_css = """
+LOGO_CSS = """
         .logo {
             position: fixed;
             top: 30px;
@@ -38,9 +27,8 @@ def add_logo_to_html(file_path):
             filter: drop-shadow(0 2px 8px rgba(0, 0, 0, 0.2));
         }
 """
-    
-    # Add logo HTML after <body>
-    logo_html = """
+
+LOGO_HTML = """
     <div class="logo">
         <svg width="120" height="120" viewBox="0 0 120 120" xmlns="http://www.w3.org/2000/svg">
             <circle cx="60" cy="60" r="55" fill="#003366" opacity="0.1"/>
@@ -50,49 +38,27 @@ def add_logo_to_html(file_path):
         </svg>
     </div>
 """
-    
-    # Add CSS
-    if '</style>' in content:
-        content = content.replace('</style>', logo_css + '\n    </style>')
-    
-    # Add HTML - find body tag and add after it
-    body_pattern = r'(<body[^>]*>)'
-    if re.search(body_pattern, content):
-        # Add after body tag, before first div
-        content = re.sub(
-            body_pattern,
-            r'\1' + logo_html,
-            content,
-            count=1
-        )
-    else:
-        # Fallback - add after <body>
-        content = content.replace('<body>', '<body>' + logo_html)
-    
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(content)
-    
-    return True
+
+# Both patches are skipped when the logo rule / block already exists
+PATCHES = [
+    {'id': 'logo-css', 'type': 'insert_css', 'css': LOGO_CSS, 'marker': '.logo'},
+    {'id': 'logo-html', 'type': 'insert_logo', 'html': LOGO_HTML},
+]
+
+def add_logo_to_html(file_path):
+    """Add logo to HTML file"""
+    return bool(patch_file(file_path, PATCHES))
 
 if __name__ == "__main__":
-    html_files = [
-        "presentation_v2.html",
-        "presentation_2key.html",
-        "presentation_v1.html",
-        "presentation.html"
-    ]
-    
     print("מוסיף לוגו נמל אשדוד לכל קבצי ה-HTML...")
     
-    for html_file in html_files:
-        try:
-            if add_logo_to_html(html_file):
-                print(f"✓ נוסף לוגו ל-{html_file}")
-            else:
-                print(f"  דולג על {html_file} (כבר קיים)")
-        except Exception as e:
-            print(f"  שגיאה ב-{html_file}: {e}")
+    for html_file, (applied, error) in patch_files(HTML_FILES, PATCHES).items():
+        if error:
+            print(f"  שגיאה ב-{html_file}: {error}")
+        elif applied:
+            print(f"✓ נוסף לוגו ל-{html_file}")
+        else:
+            print(f"  דולג על {html_file} (כבר קיים)")
     
     print("\n✓ הושלם!")
 
-
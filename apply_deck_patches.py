@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Apply a declarative patch set to a deck in one load/save cycle
+Text replacements, slide-title updates and style rules from a JSON patch file
+are applied slide by slide in memory; the deck is written once, atomically,
+through the zip patch writer. --dry-run prints the per-slide diff instead.
+"""
+
+import argparse
+import difflib
+import json
+import sys
+import zipfile
+from functools import lru_cache
+
+from pptx_patch_writer import (NS, read_part_xml, run_text, serialize_xml, set_run_text,
+                               slide_part_names, write_patched_package)
+from text_replacer import build_automaton, replace_in_slide
+
+DEFAULT_PATCH_FILE = "deck_patches.json"
+
+PATCH_TYPES = ('replace', 'title', 'style')
+STYLE_TARGETS = ('all', 'title', 'body')
+
+# Style keys set on <a:pPr> and on <a:rPr>; the element is only added when
+# the patch has one of its keys
+PARAGRAPH_STYLE_KEYS = ('align', 'rtl')
+RUN_STYLE_KEYS = ('size', 'bold', 'color', 'font')
+
+# Shape names that mark a title, as in final_enhance_presentation
+TITLE_NAME_WORDS = ('title', 'כותרת', 'heading', 'header')
+TITLE_PLACEHOLDER_TYPES = ('title', 'ctrTitle')
+# Runs larger than 32pt make a shape a title
+TITLE_MIN_SIZE = 3200
+
+def load_patch_set(patch_file):
+    """Read and validate a patch file before anything is touched"""
+    with open(patch_file, 'r', encoding='utf-8') as f:
+        patch_set = json.load(f)
+    return validate_patch_set(patch_set)
+
+def validate_patch_set(patch_set):
+    """Raise ValueError for unknown or incomplete patches"""
+    for index, patch in enumerate(patch_set.get('patches', []), 1):
+        kind = patch.get('type')
+        if kind not in PATCH_TYPES:
+            raise ValueError(f"תיקון {index}: סוג לא מוכר {kind!r}")
+        if kind == 'replace' and not (patch.get('find') or patch.get('terms')):
+            raise ValueError(f"תיקון {index}: חסר find או terms")
+        if kind == 'title' and ('slide' not in patch or 'text' not in patch):
+            raise ValueError(f"תיקון {index}: עדכון כותרת דורש slide ו-text")
+        if kind == 'style' and patch.get('target', 'all') not in STYLE_TARGETS:
+            raise ValueError(f"תיקון {index}: target לא מוכר {patch.get('target')!r}")
+    return patch_set
+
+def patch_applies(patch, slide_number):
+    """Slide filter: 'slides' is a list of 1-based slide numbers, default all"""
+    if patch['type'] == 'title':
+        return patch['slide'] == slide_number
+    slides = patch.get('slides')
+    return slides is None or slide_number in slides
+
+def text_shapes(slide):
+    """Top-level <p:sp> elements that have a text body"""
+    return [sp for sp in slide.iterfind('./p:cSld/p:spTree/p:sp', NS)
+            if sp.find('p:txBody', NS) is not None]
+
+def is_title_shape(sp):
+    """Placeholder type, shape name or a large run size mark a title"""
+    ph = sp.find('p:nvSpPr/p:nvPr/p:ph', NS)
+    if ph is not None and ph.get('type') in TITLE_PLACEHOLDER_TYPES:
+        return True
+    name = (sp.find('p:nvSpPr/p:cNvPr', NS).get('name') or '').lower()
+    if any(word in name for word in TITLE_NAME_WORDS):
+        return True
+    return any(int(rPr.get('sz', 0)) > TITLE_MIN_SIZE
+               for rPr in sp.iterfind('p:txBody/a:p/a:r/a:rPr', NS))
+
+def paragraph_texts(slide):
+    """Paragraph text lines of a slide, used for the dry-run diff"""
+    lines = []
+    for sp in text_shapes(slide):
+        for p in sp.iterfind('p:txBody/a:p', NS):
+            text = ''.join(run_text(r) for r in p.iterfind('a:r', NS))
+            if text:
+                lines.append(text)
+    return lines
+
+@lru_cache(maxsize=None)
+def compiled_terms(terms):
+    """Automaton for a patch's terms, built once per patch set"""
+    return build_automaton(dict(terms))
+
+def apply_replace(slide, patch):
+    """Replace text inside paragraphs, returns the number of replacements
+
+    A patch has either find/replace or a terms mapping; all terms are
+    matched together, leftmost-longest, across run boundaries.
+    """
+    terms = dict(patch.get('terms', {}))
+    if patch.get('find'):
+        terms[patch['find']] = patch.get('replace', '')
+    return replace_in_slide(slide, compiled_terms(tuple(sorted(terms.items()))))
+
+def title_problem(slide, patch):
+    """Why a title patch cannot apply to the slide, or None"""
+    for sp in text_shapes(slide):
+        if not is_title_shape(sp):
+            continue
+        runs = list(sp.iterfind('p:txBody/a:p/a:r', NS))
+        if not runs:
+            return "כותרת ריקה"
+        if patch.get('find') and patch['find'] not in ''.join(run_text(r) for r in runs):
+            return f"{patch['find']!r} לא נמצא בכותרת"
+        return None
+    return "אין כותרת בשקופית"
+
+def apply_title(slide, patch):
+    """Set the text of the slide's title shape, keeping the first run's style
+
+    The title becomes one paragraph: the other runs, and the paragraphs they
+    leave empty, are removed.
+    """
+    if title_problem(slide, patch):
+        return 0
+    sp = next(sp for sp in text_shapes(slide) if is_title_shape(sp))
+    runs = list(sp.iterfind('p:txBody/a:p/a:r', NS))
+    if ''.join(run_text(r) for r in runs) == patch['text']:
+        return 0
+    set_run_text(runs[0], patch['text'])
+    for run in runs[1:]:
+        run.getparent().remove(run)
+    first = runs[0].getparent()
+    for p in list(sp.iterfind('p:txBody/a:p', NS)):
+        if p is not first and p.find('a:r', NS) is None:
+            p.getparent().remove(p)
+    return 1
+
+def unmatched_patches(slide, slide_number, patches, counts):
+    """[(patch, reason)] for title patches of this slide that found nothing to change"""
+    changed = {id(patch) for patch, _ in counts}
+    unmatched = []
+    for patch in patches:
+        if (patch['type'] == 'title' and patch['slide'] == slide_number
+                and id(patch) not in changed):
+            reason = title_problem(slide, patch)
+            if reason:
+                unmatched.append((patch, reason))
+    return unmatched
+
+def missing_slide_patches(patches, slide_count):
+    """[(patch, reason)] for title patches aimed past the last slide"""
+    return [(patch, f"אין שקופית {patch['slide']}") for patch in patches
+            if patch['type'] == 'title' and not 1 <= patch['slide'] <= slide_count]
+
+def report_unmatched(unmatched):
+    """Warning line per patch that did not apply"""
+    for patch, reason in unmatched:
+        print(f"⚠ {patch.get('id') or patch['type']} לא הוחל: {reason}")
+
+def set_attribute(element, name, value):
+    """Set an attribute, returns True when the value changed"""
+    if element.get(name) == value:
+        return False
+    element.set(name, value)
+    return True
+
+def apply_style(slide, patch):
+    """Apply paragraph and run properties, returns the number of changed elements"""
+    target = patch.get('target', 'all')
+    changed = 0
+    for sp in text_shapes(slide):
+        if target != 'all' and (target == 'title') != is_title_shape(sp):
+            continue
+        for p in sp.iterfind('p:txBody/a:p', NS):
+            if any(key in patch for key in PARAGRAPH_STYLE_KEYS):
+                pPr = p.get_or_add_pPr()
+                touched = False
+                if 'align' in patch:
+                    touched |= set_attribute(pPr, 'algn', patch['align'])
+                if 'rtl' in patch:
+                    touched |= set_attribute(pPr, 'rtl', '1' if patch['rtl'] else '0')
+                changed += touched
+            
+            if not any(key in patch for key in RUN_STYLE_KEYS):
+                continue
+            for run in p.iterfind('a:r', NS):
+                rPr = run.get_or_add_rPr()
+                touched = False
+                if 'size' in patch:
+                    touched |= set_attribute(rPr, 'sz', str(int(round(patch['size'] * 100))))
+                if 'bold' in patch:
+                    touched |= set_attribute(rPr, 'b', '1' if patch['bold'] else '0')
+                if 'color' in patch:
+                    fill = rPr.find('a:solidFill', NS)
+                    color = fill.find('a:srgbClr', NS) if fill is not None else None
+                    if color is None or color.get('val') != patch['color']:
+                        rPr.get_or_change_to_solidFill().get_or_change_to_srgbClr().set(
+                            'val', patch['color'])
+                        touched = True
+                if 'font' in patch:
+                    touched |= set_attribute(rPr.get_or_add_latin(), 'typeface', patch['font'])
+                changed += touched
+    return changed
+
+PATCH_APPLIERS = {
+    'replace': apply_replace,
+    'title': apply_title,
+    'style': apply_style,
+}
+
+def patch_slide(slide, slide_number, patches):
+    """Apply the patches that target this slide, in order
+
+    Returns [(patch, count)] for the patches that changed something.
+    """
+    counts = []
+    for patch in patches:
+        if patch_applies(patch, slide_number):
+            count = PATCH_APPLIERS[patch['type']](slide, patch)
+            if count:
+                counts.append((patch, count))
+    return counts
+
+def slide_diff(before, after):
+    """Paragraph-level diff lines between two paragraph_texts() lists"""
+    diff = difflib.unified_diff(before, after, lineterm='', n=0)
+    return [line for line in list(diff)[2:] if not line.startswith('@@')]
+
+def apply_patch_set(deck_file, patch_set, dry_run=False):
+    """Apply every patch to every slide in one pass, then write the deck once"""
+    patches = patch_set.get('patches', [])
+    updated = {}
+    unmatched = []
+    total = 0
+    
+    with zipfile.ZipFile(deck_file) as package:
+        slide_names = slide_part_names(package)
+        for slide_number, slide_name in enumerate(slide_names, 1):
+            slide = read_part_xml(package, slide_name)
+            before = paragraph_texts(slide) if dry_run else None
+            counts = patch_slide(slide, slide_number, patches)
+            unmatched.extend(unmatched_patches(slide, slide_number, patches, counts))
+            if not counts:
+                continue
+            
+            updated[slide_name] = slide
+            total += sum(count for _, count in counts)
+            print(f"שקופית {slide_number}:")
+            for patch, count in counts:
+                label = patch.get('id') or patch['type']
+                print(f"  {label}: {count} שינויים")
+            if dry_run:
+                for line in slide_diff(before, paragraph_texts(slide)):
+                    print(f"    {line}")
+    
+    unmatched.extend(missing_slide_patches(patches, len(slide_names)))
+    if unmatched:
+        print()
+        report_unmatched(unmatched)
+    
+    if dry_run:
+        print(f"\nהרצה יבשה: {total} שינויים ב-{len(updated)} שקופיות, הקובץ לא נכתב")
+        return total
+    
+    # One atomic write: temp file + rename, nothing partial is left behind
+    write_patched_package(deck_file, patch_set.get('output', deck_file),
+                          {name: serialize_xml(slide) for name, slide in updated.items()})
+    print(f"\n✓ הושלם! בוצעו {total} שינויים ב-{len(updated)} שקופיות")
+    return total
+
+def main():
+    parser = argparse.ArgumentParser(description="החלת קובץ תיקונים על מצגת במעבר אחד")
+    parser.add_argument('patch_file', nargs='?', default=DEFAULT_PATCH_FILE,
+                        help="קובץ התיקונים (JSON)")
+    parser.add_argument('--deck', help="המצגת (ברירת מחדל: deck בקובץ התיקונים)")
+    parser.add_argument('--dry-run', action='store_true', help="הצגת השינויים לכל שקופית בלבד")
+    parser.add_argument('--daemon', action='store_true', help="שליחת התיקונים ל-deck_daemon")
+    args = parser.parse_args()
+    
+    patch_set = load_patch_set(args.patch_file)
+    deck_file = args.deck or patch_set['deck']
+    if args.daemon:
+        from deck_daemon import edit_via_daemon
+        edit_via_daemon(deck_file, patch_set['patches'], patch_set.get('output'),
+                        dry_run=args.dry_run)
+        return
+    print(f"טוען מצגת: {deck_file}")
+    apply_patch_set(deck_file, patch_set, dry_run=args.dry_run)
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"שגיאה: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark bulk slide generation from HTML
+Compares per-run python-pptx setters (the previous create_slide) with the
+cached paragraph templates from pptx_style_cache
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from pptx import Presentation
+from pptx.util import Pt, Inches
+from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
+
+import create_pptx_fixed
+from html_slide_parser import parse_html_slides
+from pptx_style_cache import append_paragraph, is_title_paragraph
+from pptx_stream_writer import stream_presentation
+
+def create_slide_with_setters(prs, slide_data, colors):
+    """Reference: style every paragraph and run through python-pptx setters"""
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    fill = slide.background.fill
+    fill.solid()
+    fill.fore_color.rgb = colors['background']
+    
+    if slide_data['title']:
+        title_box = slide.shapes.add_textbox(Inches(0.5), Inches(0.5), Inches(9), Inches(1.5))
+        title_frame = title_box.text_frame
+        title_frame.word_wrap = True
+        title_frame.vertical_anchor = MSO_ANCHOR.TOP
+        title_frame.margin_left = Inches(0.2)
+        title_frame.margin_right = Inches(0.2)
+        title_frame.margin_top = Inches(0.1)
+        title_frame.margin_bottom = Inches(0.1)
+        title_frame.clear()
+        p = title_frame.paragraphs[0]
+        p.alignment = PP_ALIGN.RIGHT
+        p.space_after = Pt(0)
+        p._element.get_or_add_pPr().set('rtl', '1')
+        run = p.add_run()
+        run.text = slide_data['title']
+        run.font.name = 'Arial Hebrew'
+        run.font.size = Pt(44)
+        run.font.bold = True
+        run.font.color.rgb = colors['primary']
+    
+    if slide_data['paragraphs']:
+        body_top = Inches(2.5) if slide_data['title'] else Inches(1)
+        body_box = slide.shapes.add_textbox(Inches(0.5), body_top, Inches(9), Inches(5.5))
+        body_frame = body_box.text_frame
+        body_frame.word_wrap = True
+        body_frame.vertical_anchor = MSO_ANCHOR.TOP
+        body_frame.margin_left = Inches(0.3)
+        body_frame.margin_right = Inches(0.3)
+        body_frame.margin_top = Inches(0.2)
+        body_frame.margin_bottom = Inches(0.2)
+        body_frame.clear()
+        for para_text in slide_data['paragraphs']:
+            p = body_frame.add_paragraph()
+            p.alignment = PP_ALIGN.RIGHT
+            p.space_after = Pt(12)
+            p.line_spacing = 1.3
+            p._element.get_or_add_pPr().set('rtl', '1')
+            is_title_para = is_title_paragraph(para_text)
+            run = p.add_run()
+            run.text = para_text
+            run.font.name = 'Arial Hebrew'
+            if is_title_para:
+                run.font.size = Pt(24)
+                run.font.bold = True
+                run.font.color.rgb = colors['primary']
+            else:
+                run.font.size = Pt(22)
+                run.font.color.rgb = colors['text']
+
+def create_slide_with_templates(prs, slide_data, colors):
+    """Cached paragraph templates through python-pptx (create_pptx_fixed before streaming)"""
+    styles = create_pptx_fixed.get_text_styles(colors)
+    slide_layout = prs.slide_layouts[6]  # Blank layout
+    slide = prs.slides.add_slide(slide_layout)
+    
+    # Set background
+    background = slide.background
+    fill = background.fill
+    fill.solid()
+    fill.fore_color.rgb = colors['background']
+    
+    # Add title if exists
+    if slide_data['title']:
+        left = Inches(0.5)
+        top = Inches(0.5)
+        width = Inches(9)
+        height = Inches(1.5)
+        
+        title_box = slide.shapes.add_textbox(left, top, width, height)
+        title_frame = title_box.text_frame
+        title_frame.word_wrap = True
+        title_frame.vertical_anchor = MSO_ANCHOR.TOP
+        title_frame.margin_left = Inches(0.2)
+        title_frame.margin_right = Inches(0.2)
+        title_frame.margin_top = Inches(0.1)
+        title_frame.margin_bottom = Inches(0.1)
+        
+        # Clear and add paragraph from the cached style template
+        title_frame.clear()
+        txBody = title_frame._txBody
+        txBody.remove(txBody.p_lst[0])
+        append_paragraph(txBody, slide_data['title'], **styles['title'])
+    
+    # Add body text
+    if slide_data['paragraphs']:
+        body_top = Inches(2.5) if slide_data['title'] else Inches(1)
+        left = Inches(0.5)
+        width = Inches(9)
+        height = Inches(5.5)
+        
+        body_box = slide.shapes.add_textbox(left, body_top, width, height)
+        body_frame = body_box.text_frame
+        body_frame.word_wrap = True
+        body_frame.vertical_anchor = MSO_ANCHOR.TOP
+        body_frame.margin_left = Inches(0.3)
+        body_frame.margin_right = Inches(0.3)
+        body_frame.margin_top = Inches(0.2)
+        body_frame.margin_bottom = Inches(0.2)
+        
+        # Clear default paragraph
+        body_frame.clear()
+        
+        txBody = body_frame._txBody
+        for para_text in slide_data['paragraphs']:
+            # Check if it's a title-like paragraph
+            style = styles['body_title'] if is_title_paragraph(para_text) else styles['body']
+            append_paragraph(txBody, para_text, **style)
+
+def time_slides(create, slides_data, colors):
+    """Build one deck with the given create function, return seconds"""
+    prs = Presentation()
+    started = time.perf_counter()
+    for slide_data in slides_data:
+        create(prs, slide_data, colors)
+    return time.perf_counter() - started
+
+def time_streaming(slides_data, colors):
+    """Build and save one deck through the streaming writer, return seconds"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_file = os.path.join(tmp_dir, 'stream.pptx')
+        started = time.perf_counter()
+        with stream_presentation(output_file) as write_slide:
+            for slide_data in slides_data:
+                write_slide(create_pptx_fixed.build_slide_xml(slide_data, colors))
+        return time.perf_counter() - started
+
+def style_with_setters(text_frame, para_text, is_title_para, colors):
+    """Reference paragraph styling through python-pptx setters"""
+    p = text_frame.add_paragraph()
+    p.alignment = PP_ALIGN.RIGHT
+    p.space_after = Pt(12)
+    p.line_spacing = 1.3
+    p._element.get_or_add_pPr().set('rtl', '1')
+    run = p.add_run()
+    run.text = para_text
+    run.font.name = 'Arial Hebrew'
+    run.font.size = Pt(24 if is_title_para else 22)
+    run.font.bold = is_title_para or None
+    run.font.color.rgb = colors['primary'] if is_title_para else colors['text']
+
+def style_with_templates(text_frame, para_text, is_title_para, colors):
+    """Paragraph styling from the cached templates"""
+    styles = create_pptx_fixed.get_text_styles(colors)
+    style = styles['body_title'] if is_title_para else styles['body']
+    append_paragraph(text_frame._txBody, para_text, **style)
+
+def time_paragraph_styling(style, slides_data, colors):
+    """Styling cost alone - paragraphs into one scratch text box, no slide bookkeeping"""
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    text_frame = slide.shapes.add_textbox(0, 0, Inches(9), Inches(5.5)).text_frame
+    started = time.perf_counter()
+    for slide_data in slides_data:
+        text_frame.clear()
+        for para_text in slide_data['paragraphs']:
+            is_title_para = is_title_paragraph(para_text)
+            style(text_frame, para_text, is_title_para, colors)
+    return time.perf_counter() - started
+
+def run_benchmark(html_file, slide_count):
+    """Generate slide_count slides from html_file with both implementations"""
+    source = parse_html_slides(html_file)
+    if not source:
+        print(f"לא נמצאו שקופיות ב-{html_file}")
+        return
+    slides_data = (source * (slide_count // len(source) + 1))[:slide_count]
+    paragraph_count = sum(len(s['paragraphs']) + bool(s['title']) for s in slides_data)
+    colors = create_pptx_fixed.get_ashdod_port_colors()
+    
+    print(f"בודק {slide_count} שקופיות ({paragraph_count} פסקאות) מתוך {html_file}")
+    setters = time_slides(create_slide_with_setters, slides_data, colors)
+    templates = time_slides(create_slide_with_templates, slides_data, colors)
+    
+    print(f"  setters לכל run:   {setters:.2f} שניות ({setters / paragraph_count * 1e6:.0f} µs לפסקה)")
+    print(f"  תבניות XML במטמון: {templates:.2f} שניות ({templates / paragraph_count * 1e6:.0f} µs לפסקה)")
+    print(f"  האצה: x{setters / templates:.1f}")
+    
+    # כתיבה ישירה לקובץ ה-ZIP, כולל השמירה
+    streaming = time_streaming(slides_data, colors)
+    print(f"  כתיבה זורמת (כולל שמירה): {streaming:.2f} שניות (x{setters / streaming:.1f})")
+    
+    # עיצוב הפסקאות בלבד (ללא add_slide של python-pptx)
+    setters = time_paragraph_styling(style_with_setters, slides_data, colors)
+    templates = time_paragraph_styling(style_with_templates, slides_data, colors)
+    print("עיצוב פסקאות בלבד:")
+    print(f"  setters לכל run:   {setters:.2f} שניות")
+    print(f"  תבניות XML במטמון: {templates:.2f} שניות")
+    print(f"  האצה: x{setters / templates:.1f}")
+
+if __name__ == "__main__":
+    html_file = sys.argv[1] if len(sys.argv) > 1 else "presentation_v1.html"
+    slide_count = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    
+    run_benchmark(html_file, slide_count)
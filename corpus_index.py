@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite FTS5 index over every deck in the corpus (.pptx, .key, .html)
+Decks are streamed through the deck_text extractors in worker processes and
+written in batched transactions to a WAL-mode database, one FTS row per slide.
+Re-indexing is incremental: a deck whose size and mtime are unchanged is
+skipped on a stat, a touched deck is only re-hashed, a copy of an indexed
+deck reuses its rows, and only new or edited decks are extracted again.
+Decks that disappeared under the indexed directories are dropped.
+
+The FTS column holds the hebrew_text index terms of the slide (niqqud,
+final letters and prefix letters normalized); the original text is stored
+unindexed for the snippet. Results are ranked with bm25.
+
+Usage:
+    python3 corpus_index.py index [paths ...]
+    python3 corpus_index.py search "שרשרת אספקה"
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from deck_daemon import file_sha256
+from deck_text import extract_deck, find_decks, slide_texts
+from hebrew_text import normalize_words, prefix_variants
+
+DEFAULT_DB = ".corpus_index.sqlite"
+SCHEMA_VERSION = 1
+
+# Slide rows of deck N take rowids N << DECK_ROWID_BITS .. +slides, so a
+# deck's rows are deleted or copied by rowid range
+DECK_ROWID_BITS = 20
+
+# Decks per transaction
+BATCH_SIZE = 64
+
+SNIPPET_WORDS = 16
+SNIPPET_MARKS = ('[', ']')
+
+# A word of the original text, niqqud and geresh / gershayim included
+TEXT_WORD_RE = re.compile('(?:[^\\W_]|[\\u0591-\\u05C7\'"`\\u05F3\\u05F4])+')
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS decks (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    slides INTEGER NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS decks_sha256 ON decks (sha256);
+CREATE VIRTUAL TABLE IF NOT EXISTS slides USING fts5(
+    terms, text UNINDEXED, title UNINDEXED, number UNINDEXED, deck_id UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 0', prefix = '2 3'
+);
+INSERT OR IGNORE INTO meta VALUES ('schema', '{SCHEMA_VERSION}');
+"""
+
+def connect(db_path):
+    """Open (and create) the index database in WAL mode"""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    version = conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()[0]
+    if version != str(SCHEMA_VERSION):
+        raise RuntimeError(f"גרסת אינדקס {version} לא נתמכת - מחק את {db_path} ובנה מחדש")
+    return conn
+
+def rowid_range(deck_id):
+    """First and last rowid a deck's slides may take"""
+    first = deck_id << DECK_ROWID_BITS
+    return first, first + (1 << DECK_ROWID_BITS) - 1
+
+def slide_rows(slides):
+    """(terms, text, title, number) for each slide with text"""
+    rows = []
+    for slide in slides:
+        texts = slide_texts(slide)
+        if not texts:
+            continue
+        text = '\n'.join(texts)
+        # Every prefix variant of every word, so bm25 still sees term frequencies
+        terms = ' '.join(variant for word in normalize_words(text) for variant in prefix_variants(word))
+        rows.append((terms, text, slide['title'], slide['number']))
+    return rows
+
+def extract_rows(path):
+    """Worker: (path, rows, error) for one deck"""
+    try:
+        return path, slide_rows(extract_deck(path)), None
+    except Exception as e:
+        return path, [], f"{type(e).__name__}: {e}"
+
+def plan_updates(conn, paths):
+    """Split the decks into unchanged, re-stamped, copied and to-extract
+
+    Returns ({path: (size, mtime_ns, sha256)} to extract, counters). Decks
+    whose hash is already indexed (touched files, copies) are updated here.
+    """
+    known = {path: (deck_id, size, mtime_ns, sha256) for deck_id, path, size, mtime_ns, sha256
+             in conn.execute("SELECT id, path, size, mtime_ns, sha256 FROM decks")}
+    pending = {}
+    counts = {'unchanged': 0, 'touched': 0, 'copied': 0}
+    for path in paths:
+        stat = os.stat(path)
+        entry = known.get(path)
+        if entry and entry[1:3] == (stat.st_size, stat.st_mtime_ns):
+            counts['unchanged'] += 1
+            continue
+        digest = file_sha256(path)
+        if entry and entry[3] == digest:
+            conn.execute("UPDATE decks SET size = ?, mtime_ns = ? WHERE id = ?",
+                         (stat.st_size, stat.st_mtime_ns, entry[0]))
+            counts['touched'] += 1
+            continue
+        source = conn.execute("SELECT id, slides, error FROM decks WHERE sha256 = ? AND path != ?",
+                              (digest, path)).fetchone()
+        if source:
+            deck_id = store_deck(conn, path, (stat.st_size, stat.st_mtime_ns, digest),
+                                 source[1], source[2])
+            first, last = rowid_range(source[0])
+            offset = (deck_id - source[0]) << DECK_ROWID_BITS
+            conn.execute("INSERT INTO slides (rowid, terms, text, title, number, deck_id) "
+                         "SELECT rowid + ?, terms, text, title, number, ? FROM slides "
+                         "WHERE rowid BETWEEN ? AND ?", (offset, deck_id, first, last))
+            counts['copied'] += 1
+            continue
+        pending[path] = (stat.st_size, stat.st_mtime_ns, digest)
+    conn.commit()
+    return pending, counts
+
+def store_deck(conn, path, state, slides, error):
+    """Insert or replace a deck row and clear its old slide rows, returns its id"""
+    size, mtime_ns, digest = state
+    row = conn.execute("SELECT id FROM decks WHERE path = ?", (path,)).fetchone()
+    if row:
+        deck_id = row[0]
+        conn.execute("UPDATE decks SET size = ?, mtime_ns = ?, sha256 = ?, slides = ?, error = ? "
+                     "WHERE id = ?", (size, mtime_ns, digest, slides, error, deck_id))
+        conn.execute("DELETE FROM slides WHERE rowid BETWEEN ? AND ?", rowid_range(deck_id))
+    else:
+        deck_id = conn.execute("INSERT INTO decks (path, size, mtime_ns, sha256, slides, error) "
+                               "VALUES (?, ?, ?, ?, ?, ?)",
+                               (path, size, mtime_ns, digest, slides, error)).lastrowid
+    return deck_id
+
+def write_rows(conn, path, state, rows, error):
+    """Store one extracted deck"""
+    deck_id = store_deck(conn, path, state, len(rows), error)
+    first = rowid_range(deck_id)[0]
+    conn.executemany("INSERT INTO slides (rowid, terms, text, title, number, deck_id) "
+                     "VALUES (?, ?, ?, ?, ?, ?)",
+                     [(first + number, terms, text, title, number, deck_id)
+                      for terms, text, title, number in rows])
+
+def prune_missing(conn, roots, paths):
+    """Drop decks under the indexed roots that no longer exist"""
+    seen = set(paths)
+    prefixes = tuple(os.path.join(os.path.abspath(root), '') if os.path.isdir(root)
+                     else os.path.abspath(root) for root in roots)
+    removed = 0
+    for deck_id, path in conn.execute("SELECT id, path FROM decks").fetchall():
+        if path not in seen and path.startswith(prefixes) and not os.path.exists(path):
+            conn.execute("DELETE FROM slides WHERE rowid BETWEEN ? AND ?", rowid_range(deck_id))
+            conn.execute("DELETE FROM decks WHERE id = ?", (deck_id,))
+            removed += 1
+    conn.commit()
+    return removed
+
+def index_corpus(roots, db_path=DEFAULT_DB, workers=None):
+    """Bring the index up to date with the decks under roots; returns counters"""
+    conn = connect(db_path)
+    try:
+        paths = find_decks(roots)
+        pending, counts = plan_updates(conn, paths)
+        counts.update(indexed=0, failed=0, slides=0)
+        if pending:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(extract_rows, sorted(pending), chunksize=4)
+                for done, (path, rows, error) in enumerate(results, 1):
+                    write_rows(conn, path, pending[path], rows, error)
+                    counts['failed' if error else 'indexed'] += 1
+                    counts['slides'] += len(rows)
+                    if error:
+                        print(f"   ✗ {path}: {error}")
+                    if done % BATCH_SIZE == 0:
+                        conn.commit()
+            conn.commit()
+        counts['removed'] = prune_missing(conn, roots, paths)
+        counts['decks'] = len(paths)
+        return counts
+    finally:
+        conn.close()
+
+def fts_query(words, prefix_last):
+    """FTS5 MATCH expression: every word, the last one as a prefix while typing"""
+    terms = [f'"{word}"' for word in words]
+    if prefix_last:
+        terms[-1] += '*'
+    return ' AND '.join(terms)
+
+def snippet(text, words, prefix_last):
+    """SNIPPET_WORDS words of text around the first match, matches marked"""
+    wanted = set(words)
+    matches = list(TEXT_WORD_RE.finditer(text))
+    hits = set()
+    for i, match in enumerate(matches):
+        normalized = normalize_words(match.group())
+        variants = {variant for word in normalized for variant in prefix_variants(word)}
+        if variants & wanted or (prefix_last and any(v.startswith(words[-1]) for v in variants)):
+            hits.add(i)
+    start = max(0, min(hits) - SNIPPET_WORDS // 3) if hits else 0
+    window = matches[start:start + SNIPPET_WORDS]
+    if not window:
+        return ''
+    pieces = []
+    position = window[0].start()
+    for i, match in enumerate(window, start):
+        if i in hits:
+            pieces += [text[position:match.start()], SNIPPET_MARKS[0], match.group(), SNIPPET_MARKS[1]]
+            position = match.end()
+    pieces.append(text[position:window[-1].end()])
+    prefix = '… ' if start else ''
+    suffix = ' …' if start + SNIPPET_WORDS < len(matches) else ''
+    return prefix + ' '.join(''.join(pieces).split()) + suffix
+
+def search(conn, query, limit=20):
+    """[{'path', 'number', 'title', 'snippet', 'score'}] best first"""
+    words = normalize_words(query)
+    if not words:
+        return []
+    prefix_last = not query[-1:].isspace()
+    rows = conn.execute("SELECT deck_id, number, title, text, rank FROM slides "
+                        "WHERE slides MATCH ? ORDER BY rank LIMIT ?",
+                        (fts_query(words, prefix_last), limit)).fetchall()
+    if not rows:
+        return []
+    paths = dict(conn.execute(f"SELECT id, path FROM decks WHERE id IN "
+                              f"({','.join('?' * len(rows))})", [row[0] for row in rows]))
+    return [{'path': paths.get(deck_id, '?'), 'number': number, 'title': title,
+             'snippet': snippet(text, words, prefix_last), 'score': -score}
+            for deck_id, number, title, text, score in rows]
+
+def main():
+    parser = argparse.ArgumentParser(description="אינדקס FTS5 לכל המצגות")
+    parser.add_argument('--db', default=DEFAULT_DB, help="קובץ האינדקס")
+    commands = parser.add_subparsers(dest='command', required=True)
+    index_parser = commands.add_parser('index', help="עדכון האינדקס")
+    index_parser.add_argument('paths', nargs='*', default=['.'])
+    index_parser.add_argument('--workers', type=int, default=None)
+    search_parser = commands.add_parser('search', help="חיפוש")
+    search_parser.add_argument('query')
+    search_parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+    
+    started = time.perf_counter()
+    if args.command == 'index':
+        counts = index_corpus(args.paths, args.db, args.workers)
+        print(f"✓ {counts['decks']} מצגות: {counts['indexed']} נסרקו ({counts['slides']} שקופיות), "
+              f"{counts['copied']} הועתקו, {counts['touched']} עודכנו לפי hash, "
+              f"{counts['unchanged']} ללא שינוי, {counts['removed']} הוסרו, {counts['failed']} נכשלו "
+              f"({time.perf_counter() - started:.2f} שניות)")
+        return
+    conn = connect(args.db)
+    try:
+        results = search(conn, args.query, args.limit)
+    finally:
+        conn.close()
+    elapsed = (time.perf_counter() - started) * 1000
+    for result in results:
+        print(f"{result['path']} · שקופית {result['number']}  ({result['score']:.2f})")
+        print(f"   {result['snippet']}")
+    print(f"{len(results)} תוצאות ({elapsed:.1f} ms)")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"שגיאה: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
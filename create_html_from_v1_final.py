@@ -8,6 +8,7 @@ Extract exact content and create professional HTML
 from pptx import Presentation
 from pptx.util import Pt
 import html
+from slide_search_index import SEARCH_CSS, SEARCH_HTML, SEARCH_SCRIPT, search_index_island
 
 def extract_slide_content(slide):
     """Extract text content from a slide"""
@@ -229,7 +230,11 @@ def create_html_presentation(pptx_file, output_file='presentation_v1.html'):
             left: 0;
             height: 4px;
             background: #0066CC;
-            transition: width 0.3s ease;
+            width: 100%;
+            transform: scaleX(0);
+            transform-origin: left;
+            transition: transform 0.3s ease;
+            will-change: transform;
             z-index: 1001;
         }
         
@@ -256,13 +261,13 @@ def create_html_presentation(pptx_file, output_file='presentation_v1.html'):
                 font-size: 14px;
             }
         }
-    </style>
+""" + SEARCH_CSS + """    </style>
 </head>
 <body>
     <div class="progress-bar" id="progressBar"></div>
     <div class="slide-counter" id="slideCounter"></div>
     
-    <div class="presentation-container">
+""" + SEARCH_HTML + """    <div class="presentation-container">
         <div class="slide-container">
 """
     
@@ -301,23 +306,32 @@ def create_html_presentation(pptx_file, output_file='presentation_v1.html'):
         const slides = document.querySelectorAll('.slide');
         let currentSlide = 0;
         const totalSlides = slides.length;
+        const progressBar = document.getElementById('progressBar');
+        // The markup marks the first slide active
+        let shownSlide = 0;
+        let slideFrame = 0;
         
         function updateSlide() {
-            slides.forEach((slide, index) => {
-                slide.classList.remove('active');
-                if (index === currentSlide) {
-                    slide.classList.add('active');
-                }
-            });
+            // Only the outgoing and incoming slides change, once per frame
+            cancelAnimationFrame(slideFrame);
+            slideFrame = requestAnimationFrame(showCurrentSlide);
             
             document.getElementById('slideCounter').textContent = `${currentSlide + 1} / ${totalSlides}`;
-            const progress = ((currentSlide + 1) / totalSlides) * 100;
-            document.getElementById('progressBar').style.width = progress + '%';
+            progressBar.style.transform = `scaleX(${(currentSlide + 1) / totalSlides})`;
             
             document.getElementById('prevBtn').disabled = currentSlide === 0;
             document.getElementById('nextBtn').disabled = currentSlide === totalSlides - 1;
         }
         
+        function showCurrentSlide() {
+            if (shownSlide === currentSlide) {
+                return;
+            }
+            slides[shownSlide].classList.remove('active');
+            slides[currentSlide].classList.add('active');
+            shownSlide = currentSlide;
+        }
+        
         function nextSlide() {
             if (currentSlide < totalSlides - 1) {
                 currentSlide++;
@@ -367,7 +381,7 @@ def create_html_presentation(pptx_file, output_file='presentation_v1.html'):
         
         updateSlide();
     </script>
-</body>
+""" + search_index_island(slides_data) + SEARCH_SCRIPT + """</body>
 </html>"""
     
     # Write HTML file
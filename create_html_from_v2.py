@@ -8,6 +8,7 @@ Extract content and create professional interactive presentation
 from pptx import Presentation
 from pptx.util import Pt
 import html
+from slide_search_index import SEARCH_CSS, SEARCH_HTML, SEARCH_SCRIPT, search_index_island
 
 def extract_slide_content(slide):
     """Extract text content from a slide"""
@@ -246,7 +247,11 @@ def create_interactive_html(pptx_file, output_file='presentation_v2.html'):
             left: 0;
             height: 5px;
             background: linear-gradient(90deg, #0066CC, #003366);
-            transition: width 0.4s ease;
+            width: 100%;
+            transform: scaleX(0);
+            transform-origin: left;
+            transition: transform 0.4s ease;
+            will-change: transform;
             z-index: 1001;
             box-shadow: 0 2px 10px rgba(0, 102, 204, 0.5);
         }}
@@ -311,7 +316,7 @@ def create_interactive_html(pptx_file, output_file='presentation_v2.html'):
                 display: none;
             }}
         }}
-    </style>
+{SEARCH_CSS}    </style>
 </head>
 <body>
     <div class="progress-bar" id="progressBar"></div>
@@ -319,7 +324,7 @@ def create_interactive_html(pptx_file, output_file='presentation_v2.html'):
     
     <div class="slide-thumbnails" id="thumbnails"></div>
     
-    <div class="presentation-wrapper">
+{SEARCH_HTML}    <div class="presentation-wrapper">
         <div class="presentation-container">
             <div class="slide-container">
 """
@@ -357,38 +362,47 @@ def create_interactive_html(pptx_file, output_file='presentation_v2.html'):
         const slides = document.querySelectorAll('.slide');
         let currentSlide = 0;
         const totalSlides = slides.length;
+        const progressBar = document.getElementById('progressBar');
+        // The markup marks the first slide active
+        let shownSlide = 0;
+        let slideFrame = 0;
+        let thumbs = [];
         
         function updateSlide() {
-            slides.forEach((slide, index) => {
-                slide.classList.remove('active');
-                if (index === currentSlide) {
-                    setTimeout(() => {
-                        slide.classList.add('active');
-                    }, 50);
-                }
-            });
+            // Only the outgoing and incoming slides change, once per frame
+            cancelAnimationFrame(slideFrame);
+            slideFrame = requestAnimationFrame(showCurrentSlide);
             
             document.getElementById('slideCounter').textContent = `${currentSlide + 1} / ${totalSlides}`;
-            const progress = ((currentSlide + 1) / totalSlides) * 100;
-            document.getElementById('progressBar').style.width = progress + '%';
+            progressBar.style.transform = `scaleX(${(currentSlide + 1) / totalSlides})`;
             
             document.getElementById('prevBtn').disabled = currentSlide === 0;
             document.getElementById('nextBtn').disabled = currentSlide === totalSlides - 1;
-            
-            updateThumbnails();
         }
         
-        function updateThumbnails() {
-            const thumbnails = document.getElementById('thumbnails');
-            thumbnails.innerHTML = '';
-            
-            slides.forEach((slide, index) => {
+        function showCurrentSlide() {
+            if (shownSlide === currentSlide) {
+                return;
+            }
+            slides[shownSlide].classList.remove('active');
+            thumbs[shownSlide].classList.remove('active');
+            slides[currentSlide].classList.add('active');
+            thumbs[currentSlide].classList.add('active');
+            shownSlide = currentSlide;
+        }
+        
+        // Thumbnails are built once; navigation only toggles two of them
+        function buildThumbnails() {
+            const fragment = document.createDocumentFragment();
+            thumbs = Array.from(slides, (slide, index) => {
                 const thumb = document.createElement('div');
-                thumb.className = 'thumbnail' + (index === currentSlide ? ' active' : '');
+                thumb.className = 'thumbnail' + (index === shownSlide ? ' active' : '');
                 thumb.textContent = index + 1;
                 thumb.onclick = () => goToSlide(index);
-                thumbnails.appendChild(thumb);
+                fragment.appendChild(thumb);
+                return thumb;
             });
+            document.getElementById('thumbnails').appendChild(fragment);
         }
         
         function goToSlide(index) {
@@ -453,9 +467,10 @@ def create_interactive_html(pptx_file, output_file='presentation_v2.html'):
             }
         }, { passive: true });
         
+        buildThumbnails();
         updateSlide();
     </script>
-</body>
+""" + search_index_island(slides_data) + SEARCH_SCRIPT + """</body>
 </html>"""
     
     # Write HTML file
@@ -13,6 +13,7 @@ from pptx.util import Pt
 import html
 import json
 import os
+from slide_search_index import SEARCH_CSS, SEARCH_HTML, SEARCH_SCRIPT, search_index_island
 
 def extract_slide_content(slide):
     """Extract text content from a slide"""
@@ -63,6 +64,17 @@ def create_html_presentation(pptx_file, output_file='presentation.html'):
         slides_data.append(content)
         print(f"מעבד שקופית {slide_idx + 1}...")
     
+    html_content = render_presentation_html(slides_data)
+    
+    # Write HTML file
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(html_content)
+    
+    print(f"\n✓ ממשק HTML נוצר בהצלחה: {output_file}")
+    print(f"  פתח את הקובץ בדפדפן כדי להציג את המצגת")
+
+def render_presentation_html(slides_data):
+    """Build the presentation page for extracted slide contents"""
     # Create HTML
     html_content = f"""<!DOCTYPE html>
 <html lang="he" dir="rtl">
@@ -227,7 +239,11 @@ def create_html_presentation(pptx_file, output_file='presentation.html'):
             left: 0;
             height: 4px;
             background: #0066CC;
-            transition: width 0.3s ease;
+            width: 100%;
+            transform: scaleX(0);
+            transform-origin: left;
+            transition: transform 0.3s ease;
+            will-change: transform;
             z-index: 1001;
         }}
         
@@ -267,13 +283,13 @@ def create_html_presentation(pptx_file, output_file='presentation.html'):
                 font-size: 14px;
             }}
         }}
-    </style>
+{SEARCH_CSS}    </style>
 </head>
 <body>
     <div class="progress-bar" id="progressBar"></div>
     <div class="slide-counter" id="slideCounter"></div>
     
-    <div class="presentation-container">
+{SEARCH_HTML}    <div class="presentation-container">
         <div class="slide-container">
 """
     
@@ -311,27 +327,36 @@ def create_html_presentation(pptx_file, output_file='presentation.html'):
         const slides = document.querySelectorAll('.slide');
         let currentSlide = 0;
         const totalSlides = slides.length;
+        const progressBar = document.getElementById('progressBar');
+        // The markup marks the first slide active
+        let shownSlide = 0;
+        let slideFrame = 0;
         
         function updateSlide() {
-            slides.forEach((slide, index) => {
-                slide.classList.remove('active');
-                if (index === currentSlide) {
-                    slide.classList.add('active');
-                }
-            });
+            // Only the outgoing and incoming slides change, once per frame
+            cancelAnimationFrame(slideFrame);
+            slideFrame = requestAnimationFrame(showCurrentSlide);
             
             // Update counter
             document.getElementById('slideCounter').textContent = `${currentSlide + 1} / ${totalSlides}`;
             
             // Update progress bar
-            const progress = ((currentSlide + 1) / totalSlides) * 100;
-            document.getElementById('progressBar').style.width = progress + '%';
+            progressBar.style.transform = `scaleX(${(currentSlide + 1) / totalSlides})`;
             
             // Update buttons
             document.getElementById('prevBtn').disabled = currentSlide === 0;
             document.getElementById('nextBtn').disabled = currentSlide === totalSlides - 1;
         }
         
+        function showCurrentSlide() {
+            if (shownSlide === currentSlide) {
+                return;
+            }
+            slides[shownSlide].classList.remove('active');
+            slides[currentSlide].classList.add('active');
+            shownSlide = currentSlide;
+        }
+        
         function nextSlide() {
             if (currentSlide < totalSlides - 1) {
                 currentSlide++;
@@ -400,15 +425,10 @@ def create_html_presentation(pptx_file, output_file='presentation.html'):
             }, 500);
         }, 5000);
     </script>
-</body>
+""" + search_index_island(slides_data) + SEARCH_SCRIPT + """</body>
 </html>"""
     
-    # Write HTML file
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    
-    print(f"\n✓ ממשק HTML נוצר בהצלחה: {output_file}")
-    print(f"  פתח את הקובץ בדפדפן כדי להציג את המצגת")
+    return html_content
 
 if __name__ == "__main__":
     input_file = "ספריה דיגיטלית חכמה.pptx"
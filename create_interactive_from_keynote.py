@@ -9,6 +9,7 @@ import subprocess
 import os
 import html
 import json
+from slide_search_index import SEARCH_CSS, SEARCH_HTML, SEARCH_SCRIPT, search_index_island
 
 def extract_keynote_content(key_file):
     """Extract content from Keynote using AppleScript"""
@@ -303,7 +304,11 @@ def create_interactive_html(slides_data, output_file):
             left: 0;
             height: 5px;
             background: linear-gradient(90deg, #0066CC, #003366);
-            transition: width 0.4s ease;
+            width: 100%;
+            transform: scaleX(0);
+            transform-origin: left;
+            transition: transform 0.4s ease;
+            will-change: transform;
             z-index: 1001;
             box-shadow: 0 2px 10px rgba(0, 102, 204, 0.5);
         }}
@@ -390,7 +395,7 @@ def create_interactive_html(slides_data, output_file):
                 display: none;
             }}
         }}
-    </style>
+{SEARCH_CSS}    </style>
 </head>
 <body>
     <div class="progress-bar" id="progressBar"></div>
@@ -399,7 +404,7 @@ def create_interactive_html(slides_data, output_file):
     
     <div class="slide-thumbnails" id="thumbnails"></div>
     
-    <div class="presentation-wrapper">
+{SEARCH_HTML}    <div class="presentation-wrapper">
         <div class="presentation-container">
             <div class="slide-container">
 """
@@ -438,39 +443,48 @@ def create_interactive_html(slides_data, output_file):
         const slides = document.querySelectorAll('.slide');
         let currentSlide = 0;
         const totalSlides = slides.length;
+        const progressBar = document.getElementById('progressBar');
+        // The markup marks the first slide active
+        let shownSlide = 0;
+        let slideFrame = 0;
+        let thumbs = [];
         let isFullscreen = false;
         
         function updateSlide() {
-            slides.forEach((slide, index) => {
-                slide.classList.remove('active');
-                if (index === currentSlide) {
-                    setTimeout(() => {
-                        slide.classList.add('active');
-                    }, 50);
-                }
-            });
+            // Only the outgoing and incoming slides change, once per frame
+            cancelAnimationFrame(slideFrame);
+            slideFrame = requestAnimationFrame(showCurrentSlide);
             
             document.getElementById('slideCounter').textContent = `${currentSlide + 1} / ${totalSlides}`;
-            const progress = ((currentSlide + 1) / totalSlides) * 100;
-            document.getElementById('progressBar').style.width = progress + '%';
+            progressBar.style.transform = `scaleX(${(currentSlide + 1) / totalSlides})`;
             
             document.getElementById('prevBtn').disabled = currentSlide === 0;
             document.getElementById('nextBtn').disabled = currentSlide === totalSlides - 1;
-            
-            updateThumbnails();
         }
         
-        function updateThumbnails() {
-            const thumbnails = document.getElementById('thumbnails');
-            thumbnails.innerHTML = '';
-            
-            slides.forEach((slide, index) => {
+        function showCurrentSlide() {
+            if (shownSlide === currentSlide) {
+                return;
+            }
+            slides[shownSlide].classList.remove('active');
+            thumbs[shownSlide].classList.remove('active');
+            slides[currentSlide].classList.add('active');
+            thumbs[currentSlide].classList.add('active');
+            shownSlide = currentSlide;
+        }
+        
+        // Thumbnails are built once; navigation only toggles two of them
+        function buildThumbnails() {
+            const fragment = document.createDocumentFragment();
+            thumbs = Array.from(slides, (slide, index) => {
                 const thumb = document.createElement('div');
-                thumb.className = 'thumbnail' + (index === currentSlide ? ' active' : '');
+                thumb.className = 'thumbnail' + (index === shownSlide ? ' active' : '');
                 thumb.textContent = index + 1;
                 thumb.onclick = () => goToSlide(index);
-                thumbnails.appendChild(thumb);
+                fragment.appendChild(thumb);
+                return thumb;
             });
+            document.getElementById('thumbnails').appendChild(fragment);
         }
         
         function goToSlide(index) {
@@ -566,6 +580,7 @@ def create_interactive_html(slides_data, output_file):
         }, { passive: true });
         
         // Initialize
+        buildThumbnails();
         updateSlide();
         
         // Auto-hide controls after 3 seconds of inactivity
@@ -581,7 +596,7 @@ def create_interactive_html(slides_data, output_file):
         document.addEventListener('mousemove', resetInactivityTimer);
         resetInactivityTimer();
     </script>
-</body>
+""" + search_index_island(slides_data) + SEARCH_SCRIPT + """</body>
 </html>"""
     
     with open(output_file, 'w', encoding='utf-8') as f:
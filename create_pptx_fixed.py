@@ -2,16 +2,27 @@
 # -*- coding: utf-8 -*-
 """
 Create PowerPoint presentation from HTML content - Fixed version
+When the output file already exists, slides whose text did not change
+(deck_diff alignment) are copied from it instead of being rebuilt.
 """
 
-from pptx import Presentation
-from pptx.util import Pt, Inches
-from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
+import os
+import sys
+import zipfile
+
+from pptx.util import Inches
 from pptx.dml.color import RGBColor
-from pptx.oxml import parse_xml
-from pptx.oxml.ns import nsdecls, qn
-import re
-import html
+from pptx.oxml.ns import nsdecls
+from deck_diff import unchanged_slides
+from deck_text import pptx_slides
+from html_slide_parser import parse_html_slides
+from pptx_patch_writer import slide_part_names
+from pptx_style_cache import is_title_paragraph, paragraph_xml
+from pptx_stream_writer import stream_presentation, write_slides_parallel
+
+# Decks at least this long are serialized in worker processes
+PARALLEL_MIN_SLIDES = 200
+PARALLEL_CHUNK_SIZE = 50
 
 def get_ashdod_port_colors():
     """Return Ashdod Port color scheme"""
@@ -24,210 +35,100 @@ def get_ashdod_port_colors():
         'white': RGBColor(255, 255, 255),
     }
 
-def parse_html_slides(html_file):
-    """Parse HTML file and extract slide content"""
-    with open(html_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    slides = []
+def get_text_styles(colors):
+    """Return paragraph styles (keys into the style template cache)"""
+    return {
+        'title': dict(size=44, bold=True, color=colors['primary'], space_after=0),
+        'body_title': dict(size=24, bold=True, color=colors['primary'],
+                           space_after=12, line_spacing=1.3),
+        'body': dict(size=22, color=colors['text'], space_after=12, line_spacing=1.3),
+    }
+
+def textbox_xml(shape_id, left, top, width, height, margin_x, margin_y, paragraphs):
+    """<p:sp> text box as python-pptx add_textbox + text_frame setup writes it"""
+    return (
+        f'<p:sp><p:nvSpPr><p:cNvPr id="{shape_id}" name="TextBox {shape_id - 1}"/>'
+        f'<p:cNvSpPr txBox="1"/><p:nvPr/></p:nvSpPr>'
+        f'<p:spPr><a:xfrm><a:off x="{left}" y="{top}"/><a:ext cx="{width}" cy="{height}"/></a:xfrm>'
+        f'<a:prstGeom prst="rect"><a:avLst/></a:prstGeom><a:noFill/></p:spPr>'
+        f'<p:txBody><a:bodyPr wrap="square" lIns="{margin_x}" tIns="{margin_y}" '
+        f'rIns="{margin_x}" bIns="{margin_y}" anchor="t"><a:spAutoFit/></a:bodyPr>'
+        f'<a:lstStyle/>{"".join(paragraphs)}</p:txBody></p:sp>'
+    )
+
+def build_slide_xml(slide_data, colors):
+    """Serialized slide part: title and body text boxes with the cached paragraph styles"""
+    styles = get_text_styles(colors)
+    shapes = []
     
-    # Find all slide divs - improved regex
-    slide_pattern = r'<div class="slide[^"]*" id="slide(\d+)">(.*?)</div>\s*</div>'
-    matches = re.finditer(slide_pattern, content, re.DOTALL)
+    if slide_data['title']:
+        shapes.append(textbox_xml(
+            len(shapes) + 2, Inches(0.5), Inches(0.5), Inches(9), Inches(1.5),
+            Inches(0.2), Inches(0.1),
+            [paragraph_xml(slide_data['title'], **styles['title'])]))
     
-    for match in matches:
-        slide_num = int(match.group(1))
-        slide_content = match.group(2)
-        
-        # Extract title
-        title_match = re.search(r'<h1 class="slide-title">(.*?)</h1>', slide_content)
-        title = ''
-        if title_match:
-            title = html.unescape(title_match.group(1).strip())
-        
-        # Extract body paragraphs - improved extraction
-        paragraphs = []
-        
-        # First, extract title area to exclude it
-        title_end_pos = 0
-        if title_match:
-            title_end_pos = slide_content.find('</h1>') + 5
-        
-        # Find slide-body div - use non-greedy match
-        body_match = re.search(r'<div class="slide-body">(.*?)</div>\s*</div>', slide_content[title_end_pos:], re.DOTALL)
-        if not body_match:
-            # Try without closing div
-            body_match = re.search(r'<div class="slide-body">(.*?)</div>', slide_content[title_end_pos:], re.DOTALL)
-        
-        if body_match:
-            body_text = body_match.group(1)
-            # Find all <p> tags in body
-            p_matches = re.finditer(r'<p>(.*?)</p>', body_text, re.DOTALL)
-            for p_match in p_matches:
-                para_text = p_match.group(1).strip()
-                # Remove any remaining HTML tags
-                para_text = re.sub(r'<[^>]+>', '', para_text)
-                # Decode HTML entities like &quot;
-                para_text = html.unescape(para_text)
-                # Clean up whitespace
-                para_text = ' '.join(para_text.split())
-                if para_text:
-                    paragraphs.append(para_text)
-        
-        # Debug: if still no paragraphs, try finding all <p> tags
-        if not paragraphs:
-            # Look for any <p> tags after title
-            remaining_content = slide_content[title_end_pos:]
-            p_matches = re.finditer(r'<p>(.*?)</p>', remaining_content, re.DOTALL)
-            for p_match in p_matches:
-                para_text = p_match.group(1).strip()
-                para_text = re.sub(r'<[^>]+>', '', para_text)
-                para_text = html.unescape(para_text)
-                para_text = ' '.join(para_text.split())
-                if para_text:
-                    paragraphs.append(para_text)
-        
-        slides.append({
-            'number': slide_num,
-            'title': title,
-            'paragraphs': paragraphs
-        })
+    if slide_data['paragraphs']:
+        body_top = Inches(2.5) if slide_data['title'] else Inches(1)
+        # text_frame.clear() leaves one empty paragraph before the content
+        paragraphs = ['<a:p/>']
+        for para_text in slide_data['paragraphs']:
+            style = styles['body_title'] if is_title_paragraph(para_text) else styles['body']
+            paragraphs.append(paragraph_xml(para_text, **style))
+        shapes.append(textbox_xml(
+            len(shapes) + 2, Inches(0.5), body_top, Inches(9), Inches(5.5),
+            Inches(0.3), Inches(0.2), paragraphs))
     
-    return slides
+    return (
+        "<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n"
+        f'<p:sld {nsdecls("a", "r", "p")}><p:cSld>'
+        f'<p:bg><p:bgPr><a:solidFill><a:srgbClr val="{colors["background"]}"/></a:solidFill>'
+        f'<a:effectLst/></p:bgPr></p:bg>'
+        f'<p:spTree><p:nvGrpSpPr><p:cNvPr id="1" name=""/><p:cNvGrpSpPr/><p:nvPr/></p:nvGrpSpPr>'
+        f'<p:grpSpPr/>{"".join(shapes)}</p:spTree></p:cSld>'
+        f'<p:clrMapOvr><a:masterClrMapping/></p:clrMapOvr></p:sld>'
+    ).encode('utf-8')
 
-def create_slide(prs, slide_data, colors):
-    """Create a slide with the given content"""
-    slide_layout = prs.slide_layouts[6]  # Blank layout
-    slide = prs.slides.add_slide(slide_layout)
-    
-    # Set background
-    background = slide.background
-    fill = background.fill
-    fill.solid()
-    fill.fore_color.rgb = colors['background']
+def build_slide_chunk(slides_data, colors=None):
+    """Worker entry point: serialize a range of slides in order
     
-    # Add title if exists
-    if slide_data['title']:
-        left = Inches(0.5)
-        top = Inches(0.5)
-        width = Inches(9)
-        height = Inches(1.5)
-        
-        title_box = slide.shapes.add_textbox(left, top, width, height)
-        title_frame = title_box.text_frame
-        title_frame.word_wrap = True
-        title_frame.vertical_anchor = MSO_ANCHOR.TOP
-        title_frame.margin_left = Inches(0.2)
-        title_frame.margin_right = Inches(0.2)
-        title_frame.margin_top = Inches(0.1)
-        title_frame.margin_bottom = Inches(0.1)
-        
-        # Clear and add paragraph
-        title_frame.clear()
-        p = title_frame.paragraphs[0]
-        p.alignment = PP_ALIGN.RIGHT
-        p.space_after = Pt(0)
-        
-        # Set RTL
-        try:
-            pPr = p._element.get_or_add_pPr()
-            pPr.set(qn('a:rtl'), '1')
-        except:
-            pass
-        
-        run = p.add_run()
-        run.text = slide_data['title']
-        
-        # Set font with fallback
+    RGBColor does not pickle, so workers build the color scheme themselves.
+    A slide that fails aborts the build: skipping it would shift every later
+    slide (and the reused ones) and leave a shorter deck. The output file is
+    only replaced when the whole package is written.
+    """
+    colors = colors or get_ashdod_port_colors()
+    slides = []
+    for slide_data in slides_data:
         try:
-            run.font.name = 'Arial Hebrew'
-        except:
-            try:
-                run.font.name = 'David'
-            except:
-                try:
-                    run.font.name = 'Arial'
-                except:
-                    pass
-        
-        run.font.size = Pt(44)
-        run.font.bold = True
-        run.font.color.rgb = colors['primary']
-        
-        # Ensure text is visible
-        if not run.text:
-            run.text = slide_data['title']
+            slides.append((build_slide_xml(slide_data, colors), ()))
+        except Exception as e:
+            raise RuntimeError(f"שגיאה בשקופית {slide_data['number'] + 1}: {e}") from e
+    return slides
+
+def previous_slide_xml(output_file, slides_data, colors):
+    """({slide index: slide XML} reusable from a previous build, its slide count)
     
-    # Add body text
-    if slide_data['paragraphs']:
-        body_top = Inches(2.5) if slide_data['title'] else Inches(1)
-        left = Inches(0.5)
-        width = Inches(9)
-        height = Inches(5.5)
-        
-        body_box = slide.shapes.add_textbox(left, body_top, width, height)
-        body_frame = body_box.text_frame
-        body_frame.word_wrap = True
-        body_frame.vertical_anchor = MSO_ANCHOR.TOP
-        body_frame.margin_left = Inches(0.3)
-        body_frame.margin_right = Inches(0.3)
-        body_frame.margin_top = Inches(0.2)
-        body_frame.margin_bottom = Inches(0.2)
-        
-        # Clear default paragraph
-        body_frame.clear()
-        
-        for idx, para_text in enumerate(slide_data['paragraphs']):
-            p = body_frame.add_paragraph()
-            p.alignment = PP_ALIGN.RIGHT
-            p.space_after = Pt(12)
-            p.line_spacing = 1.3
-            
-            # Set RTL
-            try:
-                pPr = p._element.get_or_add_pPr()
-                pPr.set(qn('a:rtl'), '1')
-            except:
-                pass
-            
-            # Check if it's a title-like paragraph
-            is_title_para = False
-            emoji_starters = ('📚', '🤖', '💬', '📊', '📖', '🔍', '❌', '✅', '💡', '🎯', '📈')
-            if any(para_text.startswith(emoji) for emoji in emoji_starters):
-                is_title_para = True
-            elif len(para_text) < 50 and ':' in para_text:
-                is_title_para = True
-            elif para_text.endswith('%'):
-                is_title_para = True
-            
-            run = p.add_run()
-            run.text = para_text
-            
-            # Set font with fallback
-            try:
-                run.font.name = 'Arial Hebrew'
-            except:
-                try:
-                    run.font.name = 'David'
-                except:
-                    try:
-                        run.font.name = 'Arial'
-                    except:
-                        pass
-            
-            if is_title_para:
-                run.font.size = Pt(24)
-                run.font.bold = True
-                run.font.color.rgb = colors['primary']
-            else:
-                run.font.size = Pt(22)
-                run.font.color.rgb = colors['text']
-            
-            # Ensure text is visible
-            if not run.text:
-                run.text = para_text
+    The first reused slide is rebuilt and compared; if the builder or the
+    styles changed since that build nothing is reused.
+    """
+    if not os.path.exists(output_file):
+        return {}, 0
+    try:
+        reused = unchanged_slides(pptx_slides(output_file), slides_data)
+        with zipfile.ZipFile(output_file) as package:
+            names = slide_part_names(package)
+            reused = {j: package.read(names[i]) for j, i in reused.items()}
+    except (OSError, KeyError, zipfile.BadZipFile) as e:
+        print(f"  לא ניתן לקרוא את הבנייה הקודמת ({e}), בנייה מלאה")
+        return {}, 0
+    if reused:
+        probe = min(reused)
+        if build_slide_xml(slides_data[probe], colors) != reused[probe]:
+            print("  הבנייה הקודמת נוצרה בסגנון אחר, בנייה מלאה")
+            return {}, 0
+    return reused, len(names)
 
-def create_presentation_from_html(html_file, output_file):
+def create_presentation_from_html(html_file, output_file, workers=None, incremental=True):
     """Create PowerPoint presentation from HTML file"""
     print(f"קורא קובץ HTML: {html_file}")
     slides_data = parse_html_slides(html_file)
@@ -242,28 +143,49 @@ def create_presentation_from_html(html_file, output_file):
         if slides_data[0]['paragraphs']:
             print(f"  פסקה ראשונה: {slides_data[0]['paragraphs'][0][:50]}...")
     
-    # Create new presentation
-    prs = Presentation()
-    prs.slide_width = Inches(10)
-    prs.slide_height = Inches(7.5)
-    
     colors = get_ashdod_port_colors()
     
     # Sort slides by number
     slides_data.sort(key=lambda x: x['number'])
     
-    # Create slides
-    for slide_data in slides_data:
-        print(f"יוצר שקופית {slide_data['number'] + 1}...")
-        try:
-            create_slide(prs, slide_data, colors)
-        except Exception as e:
-            print(f"  שגיאה בשקופית {slide_data['number'] + 1}: {e}")
-            import traceback
-            traceback.print_exc()
+    reused, previous_count = previous_slide_xml(output_file, slides_data, colors) if incremental else ({}, 0)
+    if len(reused) == len(slides_data) == previous_count:
+        print(f"\n✓ {output_file} עדכני - אף שקופית לא השתנתה")
+        return
+    to_build = [slide_data for idx, slide_data in enumerate(slides_data) if idx not in reused]
+    if reused:
+        print(f"\n{len(reused)} שקופיות ללא שינוי מועתקות מהבנייה הקודמת, {len(to_build)} נבנות מחדש")
+    
+    # Create slides - each slide part goes straight into the output package
+    print(f"\nכותב ל: {output_file}")
+    with stream_presentation(output_file, Inches(10), Inches(7.5)) as write_slide:
+        position = 0
+        
+        def write_reused():
+            # Unchanged slides before the next built one keep their place
+            nonlocal position
+            while position in reused:
+                write_slide(reused[position])
+                position += 1
+        
+        def write_built(slide_xml, media=()):
+            nonlocal position
+            write_reused()
+            write_slide(slide_xml, media)
+            position += 1
+        
+        if len(to_build) >= PARALLEL_MIN_SLIDES and workers != 1:
+            print(f"יוצר {len(to_build)} שקופיות במקביל...")
+            chunks = [to_build[i:i + PARALLEL_CHUNK_SIZE]
+                      for i in range(0, len(to_build), PARALLEL_CHUNK_SIZE)]
+            write_slides_parallel(write_built, build_slide_chunk, chunks, workers=workers)
+        else:
+            for slide_data in to_build:
+                print(f"יוצר שקופית {slide_data['number'] + 1}...")
+                for slide_xml, media in build_slide_chunk([slide_data], colors):
+                    write_built(slide_xml, media)
+        write_reused()
     
-    print(f"\nשומר ל: {output_file}")
-    prs.save(output_file)
     print("✓ המצגת נוצרה בהצלחה!")
 
 if __name__ == "__main__":
@@ -276,4 +198,5 @@ if __name__ == "__main__":
         print(f"שגיאה: {e}")
         import traceback
         traceback.print_exc()
+        sys.exit(1)
 
@@ -6,13 +6,11 @@ Extract slides from presentation.html and create a new PPTX file
 """
 
 from pptx import Presentation
-from pptx.util import Pt, Inches
-from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
+from pptx.util import Inches
+from pptx.enum.text import MSO_ANCHOR
 from pptx.dml.color import RGBColor
-from pptx.oxml import parse_xml
-from pptx.oxml.ns import nsdecls, qn
-import re
-import html
+from html_slide_parser import parse_html_slides
+from pptx_style_cache import append_paragraph, is_title_paragraph
 
 def get_ashdod_port_colors():
     """Return Ashdod Port color scheme"""
@@ -26,102 +24,18 @@ def get_ashdod_port_colors():
         'white': RGBColor(255, 255, 255),
     }
 
-def parse_html_slides(html_file):
-    """Parse HTML file and extract slide content"""
-    with open(html_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    slides = []
-    
-    # Find all slide divs
-    slide_pattern = r'<div class="slide[^"]*" id="slide(\d+)">(.*?)</div>\s*</div>'
-    matches = re.finditer(slide_pattern, content, re.DOTALL)
-    
-    for match in matches:
-        slide_num = int(match.group(1))
-        slide_content = match.group(2)
-        
-        # Extract title
-        title_match = re.search(r'<h1 class="slide-title">(.*?)</h1>', slide_content)
-        title = html.unescape(title_match.group(1)) if title_match else ''
-        
-        # Extract body paragraphs
-        body_match = re.search(r'<div class="slide-body">(.*?)</div>', slide_content, re.DOTALL)
-        body_text = body_match.group(1) if body_match else ''
-        
-        # Extract all paragraphs
-        paragraphs = []
-        p_matches = re.finditer(r'<p>(.*?)</p>', body_text, re.DOTALL)
-        for p_match in p_matches:
-            para_text = p_match.group(1).strip()
-            # Remove HTML tags if any
-            para_text = re.sub(r'<[^>]+>', '', para_text)
-            # Decode HTML entities
-            para_text = html.unescape(para_text)
-            if para_text:
-                paragraphs.append(para_text)
-        
-        slides.append({
-            'number': slide_num,
-            'title': title,
-            'paragraphs': paragraphs
-        })
-    
-    return slides
-
-def set_rtl_direction(paragraph):
-    """Set RTL direction for a paragraph using XML"""
-    try:
-        pPr = paragraph._element.get_or_add_pPr()
-        
-        # Set RTL using PowerPoint's namespace
-        rtl_attr = qn('a:rtl')
-        pPr.set(rtl_attr, '1')
-        
-        # Also try the text direction attribute
-        try:
-            pPr.set('{http://schemas.openxmlformats.org/wordprocessingml/2006/main}dir', 'rtl')
-            pPr.set('{http://schemas.openxmlformats.org/wordprocessingml/2006/main}bidi', '1')
-        except:
-            pass
-            
-    except Exception as e:
-        # Fallback: just set alignment
-        paragraph.alignment = PP_ALIGN.RIGHT
-
-def apply_hebrew_font(run, size=None, bold=False, color=None):
-    """Apply Hebrew font with fallback options"""
-    hebrew_fonts = ['Arial Hebrew', 'David', 'Gisha', 'Miriam', 'Arial', 'Calibri']
-    
-    font_set = False
-    for font_name in hebrew_fonts:
-        try:
-            run.font.name = font_name
-            font_set = True
-            break
-        except:
-            continue
-    
-    # If no font was set, try setting a default
-    if not font_set:
-        try:
-            run.font.name = 'Arial'
-        except:
-            pass
-    
-    if size:
-        run.font.size = size
-    if bold:
-        run.font.bold = True
-    if color:
-        run.font.color.rgb = color
-    
-    # Ensure text is visible
-    if not run.font.color.rgb:
-        run.font.color.rgb = RGBColor(20, 20, 20)
+def get_text_styles(colors):
+    """Return paragraph styles (keys into the style template cache)"""
+    return {
+        'title': dict(size=44, bold=True, color=colors['primary']),
+        'body_title': dict(size=24, bold=True, color=colors['primary'],
+                           space_after=12, line_spacing=1.3),
+        'body': dict(size=22, color=colors['text'], space_after=12, line_spacing=1.3),
+    }
 
 def create_slide(prs, slide_data, colors):
     """Create a slide with the given content"""
+    styles = get_text_styles(colors)
     slide_layout = prs.slide_layouts[6]  # Blank layout
     slide = prs.slides.add_slide(slide_layout)
     
@@ -148,13 +62,7 @@ def create_slide(prs, slide_data, colors):
         # Clear default paragraph
         title_frame.clear()
         
-        p = title_frame.add_paragraph()
-        p.alignment = PP_ALIGN.RIGHT
-        set_rtl_direction(p)
-        
-        run = p.add_run()
-        run.text = slide_data['title']
-        apply_hebrew_font(run, size=Pt(44), bold=True, color=colors['primary'])
+        append_paragraph(title_frame._txBody, slide_data['title'], **styles['title'])
     
     # Add body text
     if slide_data['paragraphs']:
@@ -173,31 +81,11 @@ def create_slide(prs, slide_data, colors):
         # Clear default paragraph
         body_frame.clear()
         
-        for idx, para_text in enumerate(slide_data['paragraphs']):
-            p = body_frame.add_paragraph()
-            
-            p.alignment = PP_ALIGN.RIGHT
-            p.space_after = Pt(12)
-            p.line_spacing = 1.3
-            set_rtl_direction(p)
-            
+        txBody = body_frame._txBody
+        for para_text in slide_data['paragraphs']:
             # Check if it's a title-like paragraph (starts with emoji or is short)
-            is_title_para = False
-            emoji_starters = ('📚', '🤖', '💬', '📊', '📖', '🔍', '❌', '✅', '💡', '🎯', '📈')
-            if any(para_text.startswith(emoji) for emoji in emoji_starters):
-                is_title_para = True
-            elif len(para_text) < 50 and ':' in para_text:
-                is_title_para = True
-            elif para_text.endswith('%'):  # Percentage values
-                is_title_para = True
-            
-            run = p.add_run()
-            run.text = para_text
-            
-            if is_title_para:
-                apply_hebrew_font(run, size=Pt(24), bold=True, color=colors['primary'])
-            else:
-                apply_hebrew_font(run, size=Pt(22), color=colors['text'])
+            style = styles['body_title'] if is_title_paragraph(para_text) else styles['body']
+            append_paragraph(txBody, para_text, **style)
 
 def create_presentation_from_html(html_file, output_file):
     """Create PowerPoint presentation from HTML file"""
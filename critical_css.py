@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CSS קריטי לשקופית הראשונה
+מחשב אילו כללי CSS נדרשים לשלד המצגת (לוגו, מונה, פס התקדמות, כפתורים)
+ולשקופית הראשונה, ומשאיר ב-<style> רק אותם - כולל ה-@keyframes שהם מפעילים
+(firstSlideEntrance, waveEntrance, החלקיקים). הגיליון המלא נכתב לקובץ CSS
+עם hash בשם ונטען ברקע (preload), כך שהכניסה של השקופית הראשונה לא מחכה
+לפענוח הכללים של כל סוגי השקופיות.
+הקובץ הנדחה מכיל את כל הגיליון ולא רק את השארית - אחרי שהוא נטען סדר
+ה-cascade זהה בדיוק למקור.
+"""
+
+import argparse
+import gzip
+import hashlib
+import re
+import sys
+
+from css_index import declarations
+from html_patch_engine import block_end, serialize, stylesheets, tag_attributes, tag_name, tokenize
+
+# מחלקת השקופיות - רק הראשונה מביניהן נכנסת לחישוב
+SLIDE_CLASS = "slide"
+
+# מחלקות שה-JavaScript מוסיף לאלמנטים (className = '...', classList.add('...'))
+SCRIPT_CLASS_RE = re.compile(
+    r'''(?:\.className\s*=\s*|classList\.(?:add|toggle)\(\s*)(['"`])([\w\s-]+)\1''')
+
+# פסאודו-מחלקות ופסאודו-אלמנטים (כולל :not(...) ו-:nth-child(...)) וסלקטורי מאפיינים
+# לא מצמצמים את הכלל - מוסרים לפני הבדיקה
+PSEUDO_RE = re.compile(r'::?[\w-]+(?:\((?:[^()]|\([^()]*\))*\))?')
+ATTRIBUTE_SELECTOR_RE = re.compile(r'\[[^\]]*\]')
+SIMPLE_SELECTOR_RE = re.compile(r'([#.]?)(-?[_a-zA-Z][\w-]*)')
+
+KEYFRAMES_RE = re.compile(r'@(?:-[a-z]+-)?keyframes\s+([\w-]+)', re.I)
+ANIMATION_PROPERTIES = ('animation', 'animation-name')
+
+STYLESHEET_HASH_LENGTH = 10
+
+PRELOAD_HTML = ('<link rel="preload" href="{href}" as="style" '
+                'onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+                '    <noscript><link rel="stylesheet" href="{href}"></noscript>')
+
+def first_slide_range(tokens):
+    """(first, last) של השקופית הראשונה, או None"""
+    for i, (kind, text, *_) in enumerate(tokens):
+        if kind == 'tag' and not text.startswith('</') and \
+                SLIDE_CLASS in tag_attributes(text).get('class', '').split():
+            return i, block_end(tokens, i)
+    return None
+
+def render_names(tokens):
+    """תגיות, מחלקות ו-id שקיימים בציור הראשון
+
+    כל הדף מלבד השקופיות שאחרי הראשונה, ועוד המחלקות שהסקריפטים מוסיפים
+    (ניצוצות, חלקיקים, תמונות ממוזערות, מצבי הלוגו).
+    """
+    names = {'tags': set(), 'classes': set(), 'ids': set()}
+    seen_slide = False
+    i = 0
+    while i < len(tokens):
+        kind, text, *_ = tokens[i]
+        if kind == 'script':
+            for _, classes in SCRIPT_CLASS_RE.findall(text):
+                names['classes'].update(classes.split())
+        elif kind == 'tag' and not text.startswith('</'):
+            attributes = tag_attributes(text)
+            classes = attributes.get('class', '').split()
+            if SLIDE_CLASS in classes:
+                if seen_slide:
+                    i = block_end(tokens, i) + 1
+                    continue
+                seen_slide = True
+            names['tags'].add(tag_name(text))
+            names['classes'].update(classes)
+            if 'id' in attributes:
+                names['ids'].add(attributes['id'])
+        i += 1
+    return names
+
+def selector_matches(selector, names):
+    """True אם כל המחלקות, ה-id והתגיות שבסלקטור קיימים בציור הראשון"""
+    selector = ATTRIBUTE_SELECTOR_RE.sub('', PSEUDO_RE.sub('', selector))
+    for prefix, name in SIMPLE_SELECTOR_RE.findall(selector):
+        if prefix == '#':
+            present = name in names['ids']
+        elif prefix == '.':
+            present = name in names['classes']
+        else:
+            present = name.lower() in names['tags']
+        if not present:
+            return False
+    return True
+
+def keyframes_name(block):
+    """שם האנימציה של בלוק @keyframes, או None לבלוק אחר"""
+    match = KEYFRAMES_RE.match(block['prelude'])
+    return match.group(1) if match else None
+
+def is_keyframe(sheet, rule):
+    """True למסגרת בתוך @keyframes (0%, from ...)"""
+    return rule['block'] is not None and keyframes_name(sheet['blocks'][rule['block']]) is not None
+
+def critical_rules(sheet, names):
+    """מספרי הכללים הקריטיים ושמות ה-@keyframes שהם מפעילים"""
+    keyframes = {keyframes_name(block) for block in sheet['blocks']} - {None}
+    rules = set()
+    animations = set()
+    for rule in sheet['rules']:
+        if is_keyframe(sheet, rule):
+            continue
+        if not any(selector_matches(selector, names) for selector in rule['selectors']):
+            continue
+        rules.add(rule['number'])
+        for prop, start, end in declarations(rule['body']):
+            if prop in ANIMATION_PROPERTIES:
+                value = rule['body'][start:end].split(':', 1)[1]
+                animations.update(set(re.findall(r'[\w-]+', value)) & keyframes)
+    return rules, animations
+
+def source_text(css, start, end):
+    """טקסט של כלל / בלוק עם ההזחה של השורה שלו"""
+    line_start = css.rfind('\n', 0, start) + 1
+    indent = css[line_start:start]
+    return (indent if not indent.strip() else '') + css[start:end]
+
+def critical_pieces(sheet, rules, animations, parent=None):
+    """הכללים והבלוקים הקריטיים תחת בלוק אחד, לפי סדר המקור"""
+    css = sheet['css']
+    items = [(rule['start'], 'rule', rule) for rule in sheet['rules'] if rule['block'] == parent]
+    items += [(block['start'], 'block', block) for block in sheet['blocks']
+              if block['parent'] == parent]
+    pieces = []
+    for _, kind, item in sorted(items, key=lambda entry: entry[0]):
+        end = item['end'] or len(css)
+        if kind == 'rule':
+            if item['number'] in rules:
+                pieces.append(source_text(css, item['start'], end))
+            continue
+        name = keyframes_name(item)
+        nested = any(rule['block'] == item['number'] for rule in sheet['rules']) or \
+            any(block['parent'] == item['number'] for block in sheet['blocks'])
+        if name:
+            if name in animations:
+                pieces.append(source_text(css, item['start'], end))
+        elif nested:
+            # @media / @supports: רק הכללים הקריטיים שבתוכם
+            inner = critical_pieces(sheet, rules, animations, item['number'])
+            if inner:
+                head = source_text(css, item['start'], item['start'])
+                pieces.append(f"{head}{item['prelude']} {{\n" + '\n\n'.join(inner) + f"\n{head}}}")
+        else:
+            # @font-face, @page ... נשארים תמיד
+            pieces.append(source_text(css, item['start'], end))
+    return pieces
+
+def first_render_bytes(tokens):
+    """הבתים עד סוף השקופית הראשונה - גולמי ו-gzip"""
+    slide = first_slide_range(tokens)
+    data = serialize(tokens[:slide[1] + 1] if slide else tokens).encode('utf-8')
+    return len(data), len(gzip.compress(data, compresslevel=9, mtime=0))
+
+def split_critical_css(content, stem):
+    """השארת ה-CSS הקריטי ב-<style> וטעינת הגיליון המלא ברקע
+
+    מחזיר (content, deferred); deferred הוא {'name', 'css', 'critical_size',
+    'deferred_size', 'rules', 'critical_rules', 'first_render'} או None כשאין
+    <style> או שקופית, כשכל הכללים קריטיים או כשהציור הראשון לא קטן (gzip).
+    """
+    tokens = tokenize(content)
+    blocks = [token for token in tokens if token[0] == 'css']
+    if not blocks or not first_slide_range(tokens):
+        return content, None
+    before = first_render_bytes(tokens)
+    
+    names = render_names(tokens)
+    full_css = '\n'.join(token[1].strip('\n') for token in blocks) + '\n'
+    total_rules = 0
+    kept_rules = 0
+    critical_size = 0
+    for token, sheet in zip(blocks, stylesheets(tokens)):
+        rules, animations = critical_rules(sheet, names)
+        total_rules += sum(not is_keyframe(sheet, rule) for rule in sheet['rules'])
+        kept_rules += len(rules)
+        css = sheet['css']
+        pieces = critical_pieces(sheet, rules, animations)
+        token[1] = '\n' + '\n\n'.join(pieces) + css[len(css.rstrip()):]
+        token[2] = None
+        critical_size += len(token[1].encode('utf-8'))
+    if kept_rules == total_rules:
+        return content, None
+    
+    digest = hashlib.sha256(full_css.encode('utf-8')).hexdigest()[:STYLESHEET_HASH_LENGTH]
+    name = f"{stem}.{digest}.css"
+    last_style = max(i for i, token in enumerate(tokens) if token[0] == 'css') + 1
+    tokens[last_style + 1:last_style + 1] = [['text', '\n    ']] + tokenize(PRELOAD_HTML.format(href=name))
+    after = first_render_bytes(tokens)
+    if after[1] >= before[1]:
+        # מצגת קטנה - הקישור לגיליון עולה יותר ממה שנחסך
+        return content, None
+    return serialize(tokens), {
+        'name': name,
+        'css': full_css,
+        'critical_size': critical_size,
+        'deferred_size': len(full_css.encode('utf-8')),
+        'rules': total_rules,
+        'critical_rules': kept_rules,
+        'first_render': (before, after),
+    }
+
+def summary_lines(deferred):
+    """שורות הדו"ח של השלב"""
+    (raw_before, gzip_before), (raw_after, gzip_after) = deferred['first_render']
+    return [
+        f"CSS קריטי: {deferred['critical_size']:,} בתים inline "
+        f"({deferred['critical_rules']}/{deferred['rules']} כללים), "
+        f"{deferred['deferred_size']:,} בתים ברקע ({deferred['name']})",
+        f"עד הציור הראשון: {raw_before:,} → {raw_after:,} בתים "
+        f"(gzip {gzip_before:,} → {gzip_after:,})",
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description="חישוב ה-CSS הקריטי של השקופית הראשונה")
+    parser.add_argument('html_file', nargs='?', default="presentation_v2.html")
+    parser.add_argument('--print', action='store_true', help="הדפסת ה-HTML עם ה-CSS הקריטי")
+    args = parser.parse_args()
+    
+    with open(args.html_file, 'r', encoding='utf-8') as f:
+        content = f.read()
+    stem = args.html_file.rsplit('.', 1)[0]
+    new_content, deferred = split_critical_css(content, stem)
+    if deferred is None:
+        print(f"{args.html_file}: אין CSS לדחות")
+        return
+    if args.print:
+        print(new_content)
+        return
+    for line in summary_lines(deferred):
+        print(f"{args.html_file}: {line}")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"שגיאה: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Selector index over the CSS of one <style> block
+The block is scanned once for its structural characters (braces and
+semicolons outside comments and strings) and every style rule is indexed by
+each selector in its list, including rules nested in @media. Edits touch only
+the rules found through the index, and serialize_stylesheet() rebuilds the
+text only when a rule changed - untouched blocks come back byte for byte.
+"""
+
+import re
+
+# Comments and strings are skipped as a whole; only {, } and ; drive the scan
+STRUCTURE_RE = re.compile(r'''/\*.*?\*/|"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'|[{};]''', re.S)
+# Declaration separators: ; outside comments, strings and url(...)/var(...)
+DECLARATION_RE = re.compile(r'''/\*.*?\*/|"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'|\([^)]*\)|;''', re.S)
+LEADING_TRIVIA_RE = re.compile(r'(?:\s+|/\*.*?\*/)*', re.S)
+COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+
+DEFAULT_DECLARATION_INDENT = " " * 12
+
+def split_selectors(selector_text):
+    """Selector list of a rule, comments and whitespace stripped"""
+    return tuple(s.strip() for s in COMMENT_RE.sub('', selector_text).split(','))
+
+def parse_stylesheet(css):
+    """Index the style rules of a CSS text
+
+    Returns a sheet dict: the original text, the rules in source order,
+    {selector: [rule numbers]} and the at-rule blocks (@media, @keyframes,
+    @font-face ...) in source order. A rule keeps the offsets of its selector
+    and closing brace, its selector text, body, enclosing at-rule prelude (or
+    None) and the number of that block; a block keeps its prelude, offsets
+    and parent block number.
+    """
+    rules = []
+    index = {}
+    blocks = []
+    at_rules = []
+    segment = 0
+    rule_open = None
+    nested = 0
+    for match in STRUCTURE_RE.finditer(css):
+        char = match.group()
+        if len(char) > 1:
+            continue
+        if char == '{':
+            if rule_open is not None:
+                # Nested block inside a style rule: left as raw text
+                nested += 1
+                continue
+            prelude_start = LEADING_TRIVIA_RE.match(css, segment).end()
+            if css.startswith('@', prelude_start):
+                blocks.append({
+                    'number': len(blocks),
+                    'prelude': css[prelude_start:match.start()].strip(),
+                    'start': prelude_start,
+                    'end': None,
+                    'parent': at_rules[-1] if at_rules else None,
+                })
+                at_rules.append(len(blocks) - 1)
+                segment = match.end()
+            else:
+                rule_open = (prelude_start, match.start())
+        elif char == '}':
+            if nested:
+                nested -= 1
+                continue
+            if rule_open is not None:
+                start, brace = rule_open
+                rule = {
+                    'number': len(rules),
+                    'start': start,
+                    'end': match.end(),
+                    'selector_text': css[start:brace],
+                    'body': css[brace + 1:match.start()],
+                    'context': blocks[at_rules[-1]]['prelude'] if at_rules else None,
+                    'block': at_rules[-1] if at_rules else None,
+                    'dirty': False,
+                    'removed': False,
+                }
+                rule['selectors'] = split_selectors(rule['selector_text'])
+                for selector in rule['selectors']:
+                    index.setdefault(selector, []).append(len(rules))
+                rules.append(rule)
+                rule_open = None
+            elif at_rules:
+                blocks[at_rules.pop()]['end'] = match.end()
+            segment = match.end()
+        elif rule_open is None:
+            # End of a statement at-rule such as @import
+            segment = match.end()
+    return {'css': css, 'rules': rules, 'index': index, 'blocks': blocks, 'dirty': False}
+
+def find_rules(sheet, selector):
+    """Live rules whose selector list contains the selector"""
+    return [sheet['rules'][number] for number in sheet['index'].get(selector, ())
+            if not sheet['rules'][number]['removed']]
+
+def has_rule(sheet, selector):
+    """True if some rule lists the selector"""
+    return bool(find_rules(sheet, selector))
+
+def mark_dirty(sheet, rule):
+    """Flag a rule (and its sheet) for re-serialization"""
+    rule['dirty'] = True
+    sheet['dirty'] = True
+
+def rename_selector(sheet, rule, old, new):
+    """Replace one selector in a rule's selector list"""
+    parts = rule['selector_text'].split(',')
+    for i, part in enumerate(parts):
+        if split_selectors(part) == (old,):
+            parts[i] = part.replace(old, new, 1)
+    rule['selector_text'] = ','.join(parts)
+    rule['selectors'] = split_selectors(rule['selector_text'])
+    sheet['index'][old].remove(rule['number'])
+    sheet['index'].setdefault(new, []).append(rule['number'])
+    mark_dirty(sheet, rule)
+
+def remove_rule(sheet, rule):
+    """Drop a rule together with the indentation of its line"""
+    rule['removed'] = True
+    mark_dirty(sheet, rule)
+
+def declarations(body):
+    """(property, start, end) of each declaration in a rule body
+
+    The span runs from the property name to the separating semicolon.
+    """
+    result = []
+    start = 0
+    for match in DECLARATION_RE.finditer(body + ';'):
+        if match.group() != ';':
+            continue
+        # The last declaration may have no semicolon; its span stops at the text
+        end = match.end() if match.end() <= len(body) else len(body.rstrip())
+        text = COMMENT_RE.sub('', body[start:end])
+        if ':' in text:
+            prop = text.split(':', 1)[0].strip().lower()
+            offset = LEADING_TRIVIA_RE.match(body, start).end()
+            result.append((prop, offset, end))
+        start = match.end()
+    return result
+
+def has_declaration(rule, prop):
+    """True if the rule body declares the property"""
+    return any(name == prop for name, _, _ in declarations(rule['body']))
+
+def declaration_value(rule, prop):
+    """Value of the rule's last declaration of the property, or None"""
+    value = None
+    for name, start, end in declarations(rule['body']):
+        if name == prop:
+            value = rule['body'][start:end].split(':', 1)[1].rstrip(';').strip()
+    return value
+
+def set_declaration(sheet, rule, prop, value):
+    """Replace the value of every declaration of prop, returns True if one was found"""
+    body = rule['body']
+    spans = [(start, end) for name, start, end in declarations(body) if name == prop]
+    for start, end in reversed(spans):
+        text = body[start:end]
+        semicolon = ';' if text.endswith(';') else ''
+        body = body[:start] + text.split(':', 1)[0] + ': ' + value + semicolon + body[end:]
+    if spans:
+        rule['body'] = body
+        mark_dirty(sheet, rule)
+    return bool(spans)
+
+def remove_declaration(sheet, rule, prop):
+    """Remove every declaration of prop, returns True if one was found"""
+    body = rule['body']
+    spans = [(start, end) for name, start, end in declarations(body) if name == prop]
+    if not spans:
+        return False
+    for start, end in reversed(spans):
+        # Take the line's indentation and newline with the declaration
+        line_start = len(body[:start].rstrip(' \t'))
+        if body[line_start - 1:line_start] == '\n':
+            line_start -= 1
+        body = body[:line_start] + body[end:]
+    rule['body'] = body
+    mark_dirty(sheet, rule)
+    return True
+
+def prepend_declaration(sheet, rule, prop, value):
+    """Add 'prop: value;' as the rule's first declaration"""
+    indent = re.match(r'[ \t]*\n([ \t]*)', rule['body'])
+    indent = indent.group(1) if indent else DEFAULT_DECLARATION_INDENT
+    rule['body'] = f"\n{indent}{prop}: {value};" + rule['body']
+    mark_dirty(sheet, rule)
+
+def serialize_stylesheet(sheet):
+    """CSS text with the edited rules spliced in; untouched sheets are returned as-is"""
+    css = sheet['css']
+    if not sheet['dirty']:
+        return css
+    pieces = []
+    position = 0
+    for rule in sheet['rules']:
+        if not rule['dirty']:
+            continue
+        start = rule['start']
+        if rule['removed']:
+            line_start = len(css[position:start].rstrip(' \t')) + position
+            if css[line_start - 1:line_start] == '\n':
+                line_start -= 1
+            start = line_start
+            text = ''
+        else:
+            text = rule['selector_text'] + '{' + rule['body'] + '}'
+        pieces.append(css[position:start])
+        pieces.append(text)
+        position = rule['end']
+    pieces.append(css[position:])
+    return ''.join(pieces)
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Deck daemon: keeps parsed decks in memory between script runs
+A JSON-RPC 2.0 server on a Unix socket (one request per line). Parsed slide
+XML is kept in an LRU cache keyed by path and invalidated when the file's
+size/mtime change and its content hash no longer matches.
+
+Methods:
+    extract  {deck}                              -> slide titles and paragraphs
+    edit     {deck, patches, enhance, dry_run, output} -> apply a patch set
+    render   {deck, output}                      -> HTML presentation
+    stats    {}                                  -> cache counters
+    shutdown {}
+
+deck and output must be absolute paths: the daemon's working directory is
+not the caller's.
+
+Usage:
+    python3 deck_daemon.py                # start the daemon
+    python3 fix_nhalim.py --daemon        # scripts send their edit instead
+"""
+
+import os
+import sys
+import copy
+import json
+import socket
+import stat
+import asyncio
+import hashlib
+import argparse
+import tempfile
+import zipfile
+from collections import OrderedDict
+
+from pptx_patch_writer import (NS, read_part_xml, run_text, serialize_xml, slide_part_names,
+                               write_patched_package)
+
+SOCKET_PATH = os.path.join(tempfile.gettempdir(), f"deck_daemon-{os.getuid()}.sock")
+CACHE_SIZE = 8
+HASH_CHUNK_SIZE = 1024 * 1024
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+
+# The socket is created 0600: the daemon reads and writes any deck it is sent
+SOCKET_UMASK = 0o177
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+# Parameters naming files; relative paths would resolve against the daemon's cwd
+PATH_PARAMS = ('deck', 'output')
+
+class RPCError(Exception):
+    """Error reported to the client as a JSON-RPC error object"""
+    
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+def file_sha256(path):
+    """Content hash, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_deck(path):
+    """Parse every slide of a deck: {'slide_names', 'slides'}"""
+    with zipfile.ZipFile(path) as package:
+        slide_names = slide_part_names(package)
+        slides = {name: read_part_xml(package, name) for name in slide_names}
+    return {'slide_names': slide_names, 'slides': slides}
+
+def get_deck(state, path):
+    """Cached deck for path, reparsed only when its content changed"""
+    cache = state['cache']
+    stat = os.stat(path)
+    signature = (stat.st_size, stat.st_mtime_ns)
+    entry = cache.get(path)
+    
+    if entry is not None and entry['signature'] != signature:
+        # Touched but not changed (copy -p, checkout) keeps the parsed deck
+        if entry['sha256'] is not None and entry['sha256'] == file_sha256(path):
+            entry['signature'] = signature
+        else:
+            entry = None
+            state['invalidations'] += 1
+    
+    if entry is None:
+        state['misses'] += 1
+        entry = load_deck(path)
+        entry['signature'] = signature
+        entry['sha256'] = file_sha256(path)
+        cache[path] = entry
+        while len(cache) > CACHE_SIZE:
+            cache.popitem(last=False)
+    else:
+        state['hits'] += 1
+    cache.move_to_end(path)
+    return entry
+
+def slide_content(slide):
+    """Title and body paragraphs, as create_html_presentation extracts them"""
+    content = {'title': '', 'body': []}
+    for sp in slide.iterfind('./p:cSld/p:spTree/p:sp', NS):
+        paragraphs = [''.join(run_text(r) for r in p.iterfind('a:r', NS))
+                      for p in sp.iterfind('p:txBody/a:p', NS)]
+        text = '\n'.join(paragraphs).strip()
+        if not text:
+            continue
+        name = (sp.find('p:nvSpPr/p:cNvPr', NS).get('name') or '').lower()
+        is_title = (any(int(rPr.get('sz', 0)) > 3200
+                        for rPr in sp.iterfind('p:txBody/a:p/a:r/a:rPr', NS))
+                    or 'title' in name or 'כותרת' in name)
+        if is_title and not content['title']:
+            content['title'] = text
+        else:
+            content['body'].extend(p.strip() for p in text.split('\n') if p.strip())
+    return content
+
+def rpc_extract(state, deck):
+    """Slide contents of a deck"""
+    entry = get_deck(state, deck)
+    slides = []
+    for number, name in enumerate(entry['slide_names'], 1):
+        slides.append(dict(slide_content(entry['slides'][name]), number=number))
+    return {'slides': slides}
+
+def rpc_edit(state, deck, patches=(), enhance=False, dry_run=False, output=None):
+    """Apply a patch set (and optionally final_enhance) to the cached deck
+
+    Work happens on copies, so a failing patch leaves the cache intact.
+    """
+    from apply_deck_patches import (missing_slide_patches, paragraph_texts, patch_slide,
+                                    slide_diff, unmatched_patches, validate_patch_set)
+    
+    # Same validation as a patch file
+    try:
+        patches = validate_patch_set({'patches': list(patches)})['patches']
+    except ValueError as e:
+        raise RPCError(INVALID_PARAMS, str(e))
+    
+    compiled = stats = None
+    if enhance:
+        from final_enhance_presentation import (compile_rules, enhance_slide,
+                                                get_ashdod_port_colors, get_style_rules)
+        compiled = compile_rules(get_style_rules(get_ashdod_port_colors()))
+        stats = {}
+    
+    entry = get_deck(state, deck)
+    updated = {}
+    report = []
+    unmatched = missing_slide_patches(patches, len(entry['slide_names']))
+    for number, name in enumerate(entry['slide_names'], 1):
+        slide = copy.deepcopy(entry['slides'][name])
+        before = paragraph_texts(slide)
+        original = serialize_xml(entry['slides'][name]) if enhance else None
+        applied = patch_slide(slide, number, patches)
+        unmatched.extend(unmatched_patches(slide, number, patches, applied))
+        counts = [[patch.get('id') or patch['type'], count] for patch, count in applied]
+        if enhance:
+            enhance_slide(slide, number - 1, compiled, stats)
+            if serialize_xml(slide) != original:
+                counts.append(['final-enhance', 1])
+        if not counts:
+            continue
+        updated[name] = slide
+        report.append({
+            'slide': number,
+            'patches': counts,
+            'diff': slide_diff(before, paragraph_texts(slide)),
+        })
+    
+    result = {
+        'changes': sum(count for item in report for _, count in item['patches']),
+        'slides': report,
+        'unmatched': [[patch.get('id') or patch['type'], reason] for patch, reason in unmatched],
+    }
+    if stats is not None:
+        result['rules'] = {name: [count, round(seconds * 1000, 2)]
+                           for name, (count, seconds) in stats.items()}
+    if dry_run:
+        return result
+    
+    output = output or deck
+    write_patched_package(deck, output, {name: serialize_xml(slide)
+                                         for name, slide in updated.items()})
+    if os.path.abspath(output) == deck and updated:
+        # The daemon wrote this file itself: keep the edited slides cached
+        entry['slides'].update(updated)
+        stat = os.stat(deck)
+        entry['signature'] = (stat.st_size, stat.st_mtime_ns)
+        entry['sha256'] = None
+    result['output'] = output
+    return result
+
+def rpc_render(state, deck, output):
+    """Render the deck with the create_html_presentation page"""
+    from create_html_presentation import render_presentation_html
+    
+    slides = rpc_extract(state, deck)['slides']
+    with open(output, 'w', encoding='utf-8') as f:
+        f.write(render_presentation_html(slides))
+    return {'output': output, 'slides': len(slides)}
+
+def rpc_stats(state):
+    """Cache counters"""
+    return {
+        'decks': list(state['cache']),
+        'hits': state['hits'],
+        'misses': state['misses'],
+        'invalidations': state['invalidations'],
+    }
+
+METHODS = {
+    'extract': rpc_extract,
+    'edit': rpc_edit,
+    'render': rpc_render,
+    'stats': rpc_stats,
+}
+
+def handle_request(state, request):
+    """Run one JSON-RPC request object, return the response object (or None)"""
+    request_id = request.get('id') if isinstance(request, dict) else None
+    try:
+        if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+            raise RPCError(INVALID_REQUEST, "Invalid Request")
+        method = METHODS.get(request['method'])
+        if method is None and request['method'] != 'shutdown':
+            raise RPCError(METHOD_NOT_FOUND, f"Method not found: {request['method']}")
+        params = request.get('params', {})
+        if not isinstance(params, dict):
+            raise RPCError(INVALID_PARAMS, "params must be an object")
+        for name in PATH_PARAMS:
+            path = params.get(name)
+            if path is not None and not (isinstance(path, str) and os.path.isabs(path)):
+                raise RPCError(INVALID_PARAMS, f"{name} must be an absolute path: {path!r}")
+        if request['method'] == 'shutdown':
+            state['shutdown'].set()
+            result = {'ok': True}
+        else:
+            try:
+                result = method(state, **params)
+            except TypeError as e:
+                raise RPCError(INVALID_PARAMS, str(e))
+        response = {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+    except RPCError as e:
+        response = {'jsonrpc': '2.0', 'id': request_id,
+                    'error': {'code': e.code, 'message': str(e)}}
+    except Exception as e:
+        response = {'jsonrpc': '2.0', 'id': request_id,
+                    'error': {'code': SERVER_ERROR, 'message': f"{type(e).__name__}: {e}"}}
+    # Notifications (no id) get no response
+    if isinstance(request, dict) and 'id' not in request:
+        return None
+    return response
+
+async def handle_connection(state, reader, writer):
+    """Newline-delimited JSON-RPC over one connection"""
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                request = json.loads(line)
+            except ValueError:
+                response = {'jsonrpc': '2.0', 'id': None,
+                            'error': {'code': PARSE_ERROR, 'message': "Parse error"}}
+            else:
+                # Requests run one at a time, so edits never interleave
+                async with state['lock']:
+                    response = handle_request(state, request)
+            if response is not None:
+                writer.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+                await writer.drain()
+    except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+def remove_stale_socket(socket_path):
+    """Remove a socket left by a daemon that is gone; refuse if one still answers"""
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise RuntimeError(f"{socket_path} קיים ואינו socket - לא נמחק")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except ConnectionRefusedError:
+            os.remove(socket_path)
+            return
+    raise RuntimeError(f"daemon כבר רץ ב-{socket_path} - לעצירה: python3 deck_daemon.py --stop")
+
+async def serve(socket_path):
+    """Listen on the Unix socket until a shutdown request arrives"""
+    state = {
+        'cache': OrderedDict(),
+        'hits': 0,
+        'misses': 0,
+        'invalidations': 0,
+        'lock': asyncio.Lock(),
+        'shutdown': asyncio.Event(),
+    }
+    remove_stale_socket(socket_path)
+    # Bind under a restrictive umask so the socket is never reachable by others
+    old_umask = os.umask(SOCKET_UMASK)
+    try:
+        server = await asyncio.start_unix_server(
+            lambda reader, writer: handle_connection(state, reader, writer),
+            path=socket_path, limit=MAX_REQUEST_BYTES)
+    finally:
+        os.umask(old_umask)
+    print(f"deck daemon מאזין ב-{socket_path}")
+    async with server:
+        await state['shutdown'].wait()
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    print("deck daemon נעצר")
+
+def call_daemon(method, params=None, socket_path=SOCKET_PATH):
+    """Send one request to the daemon and return its result"""
+    request = {'jsonrpc': '2.0', 'id': 1, 'method': method, 'params': params or {}}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(socket_path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            raise RuntimeError(f"ה-daemon לא רץ ({socket_path}) - הפעל: python3 deck_daemon.py")
+        client.sendall(json.dumps(request, ensure_ascii=False).encode('utf-8') + b'\n')
+        response = b''
+        while not response.endswith(b'\n'):
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            response += chunk
+    response = json.loads(response)
+    if 'error' in response:
+        raise RuntimeError(response['error']['message'])
+    return response['result']
+
+def edit_via_daemon(deck, patches=(), output=None, enhance=False, dry_run=False):
+    """Client side of the scripts' --daemon mode: send the edit, print the report"""
+    print(f"שולח ל-daemon: {deck}")
+    # The daemon has its own working directory
+    result = call_daemon('edit', {'deck': os.path.abspath(deck), 'patches': list(patches),
+                                  'enhance': enhance, 'dry_run': dry_run,
+                                  'output': os.path.abspath(output) if output else None})
+    for item in result['slides']:
+        print(f"שקופית {item['slide']}:")
+        for label, count in item['patches']:
+            print(f"  {label}: {count} שינויים")
+        for line in item['diff']:
+            print(f"    {line}")
+    for label, reason in result.get('unmatched', []):
+        print(f"⚠ {label} לא הוחל: {reason}")
+    if dry_run:
+        print(f"\nהרצה יבשה: {result['changes']} שינויים, הקובץ לא נכתב")
+    else:
+        print(f"\n✓ הושלם! בוצעו {result['changes']} שינויים")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="deck daemon - מצגות מנותחות בזיכרון")
+    parser.add_argument('--socket', default=SOCKET_PATH, help="נתיב ה-Unix socket")
+    parser.add_argument('--stop', action='store_true', help="עצירת daemon שרץ")
+    parser.add_argument('--stats', action='store_true', help="מוני המטמון של daemon שרץ")
+    args = parser.parse_args()
+    
+    if args.stop:
+        call_daemon('shutdown', socket_path=args.socket)
+    elif args.stats:
+        print(json.dumps(call_daemon('stats', socket_path=args.socket),
+                         ensure_ascii=False, indent=2))
+    else:
+        asyncio.run(serve(args.socket))
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"שגיאה: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
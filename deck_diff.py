@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Slide-level diff between two versions of a deck (.pptx, .key or .html)
+Each slide is reduced to a hash of its paragraphs - normalized with
+hebrew_text, so a .pptx and its generated HTML compare equal - and the two
+hash sequences are aligned with patience diff: slides unique to both sides
+anchor the alignment (longest increasing run), the gaps between anchors are
+aligned recursively and gaps without unique slides fall back to Myers' O(ND)
+diff. Slides that did not match are paired by title, then by position, and
+only those are opened for a paragraph-level diff.
+Incremental builds call unchanged_slides() with exact=True to reuse the
+output of every slide whose text did not change.
+
+Usage:
+    python3 deck_diff.py v1.pptx v2.pptx
+    python3 deck_diff.py deck.pptx presentation.html
+"""
+
+import argparse
+import bisect
+import difflib
+import hashlib
+import sys
+from collections import Counter
+
+from deck_text import extract_deck, slide_texts
+from hebrew_text import normalize_text
+
+def slide_key(slide, exact=False):
+    """Hash of a slide's title and paragraphs (normalized unless exact)"""
+    texts = slide_texts(slide)
+    if not exact:
+        texts = [text for text in map(normalize_text, texts) if text]
+    return hashlib.sha1('\n'.join(texts).encode('utf-8')).digest()
+
+def title_key(slide):
+    """Normalized title, for pairing slides that did not match"""
+    return normalize_text(slide['title'] or '')
+
+def myers_matches(a, b):
+    """Matched (i, j) pairs of a shortest edit script (Myers' greedy O(ND))"""
+    n, m = len(a), len(b)
+    v = {1: 0}
+    trace = []
+    for d in range(n + m + 1):
+        trace.append(dict(v))
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[k - 1] < v[k + 1]):
+                x = v[k + 1]
+            else:
+                x = v[k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[k] = x
+            if x >= n and y >= m:
+                return myers_backtrack(trace, n, m)
+    return []
+
+def myers_backtrack(trace, x, y):
+    """Walk the saved frontiers back from (x, y), collecting the diagonals"""
+    matches = []
+    for d in range(len(trace) - 1, -1, -1):
+        v = trace[d]
+        k = x - y
+        if k == -d or (k != d and v[k - 1] < v[k + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = v[prev_k]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            matches.append((x, y))
+        x, y = prev_x, prev_y
+    matches.reverse()
+    return matches
+
+def unique_anchors(a, b, a_lo, a_hi, b_lo, b_hi):
+    """Longest increasing run of the keys unique to both ranges (patience sorting)"""
+    a_counts = Counter(a[a_lo:a_hi])
+    b_counts = Counter(b[b_lo:b_hi])
+    b_index = {b[j]: j for j in range(b_lo, b_hi) if b_counts[b[j]] == 1}
+    pairs = [(i, b_index[a[i]]) for i in range(a_lo, a_hi)
+             if a_counts[a[i]] == 1 and a[i] in b_index]
+    tops = []
+    top_pairs = []
+    back = []
+    for n, (_, j) in enumerate(pairs):
+        pile = bisect.bisect_left(tops, j)
+        if pile == len(tops):
+            tops.append(j)
+            top_pairs.append(n)
+        else:
+            tops[pile] = j
+            top_pairs[pile] = n
+        back.append(top_pairs[pile - 1] if pile else None)
+    anchors = []
+    n = top_pairs[-1] if top_pairs else None
+    while n is not None:
+        anchors.append(pairs[n])
+        n = back[n]
+    anchors.reverse()
+    return anchors
+
+def _patience(a, b, a_lo, a_hi, b_lo, b_hi, matches):
+    # Common head and tail need no anchors
+    while a_lo < a_hi and b_lo < b_hi and a[a_lo] == b[b_lo]:
+        matches.append((a_lo, b_lo))
+        a_lo += 1
+        b_lo += 1
+    tail = []
+    while a_lo < a_hi and b_lo < b_hi and a[a_hi - 1] == b[b_hi - 1]:
+        a_hi -= 1
+        b_hi -= 1
+        tail.append((a_hi, b_hi))
+    
+    anchors = unique_anchors(a, b, a_lo, a_hi, b_lo, b_hi)
+    if anchors:
+        for i, j in anchors:
+            _patience(a, b, a_lo, i, b_lo, j, matches)
+            matches.append((i, j))
+            a_lo, b_lo = i + 1, j + 1
+        _patience(a, b, a_lo, a_hi, b_lo, b_hi, matches)
+    elif not set(a[a_lo:a_hi]).isdisjoint(b[b_lo:b_hi]):
+        matches.extend((a_lo + i, b_lo + j)
+                       for i, j in myers_matches(a[a_lo:a_hi], b[b_lo:b_hi]))
+    matches.extend(reversed(tail))
+
+def align(a, b):
+    """Matched (i, j) pairs of two key sequences, in order (patience diff)"""
+    matches = []
+    _patience(a, b, 0, len(a), 0, len(b), matches)
+    return matches
+
+def gaps(matches, a_len, b_len):
+    """(old range, new range, matched) for each match and each gap between matches"""
+    i = j = 0
+    for match_i, match_j in matches + [(a_len, b_len)]:
+        if i < match_i or j < match_j:
+            yield range(i, match_i), range(j, match_j), False
+        if match_i < a_len:
+            yield range(match_i, match_i + 1), range(match_j, match_j + 1), True
+        i, j = match_i + 1, match_j + 1
+
+def pair_gap(old, new, old_range, new_range):
+    """Opcodes for an unmatched range of slides
+
+    Slides with the same title are 'changed', the rest are paired by position
+    and what is left over is 'removed' / 'added'.
+    """
+    ops = []
+    titles = align([title_key(old[i]) for i in old_range], [title_key(new[j]) for j in new_range])
+    for old_part, new_part, matched in gaps(titles, len(old_range), len(new_range)):
+        old_part = [old_range[i] for i in old_part]
+        new_part = [new_range[j] for j in new_part]
+        ops.extend(('changed', i, j) for i, j in zip(old_part, new_part))
+        ops.extend(('removed', i, None) for i in old_part[len(new_part):])
+        ops.extend(('added', None, j) for j in new_part[len(old_part):])
+    return ops
+
+def diff_slides(old, new, exact=False):
+    """Opcodes (tag, old index, new index) aligning two slide lists
+
+    tag is 'equal', 'changed', 'removed' or 'added'; the index of the side a
+    slide is missing from is None.
+    """
+    matches = align([slide_key(slide, exact) for slide in old],
+                    [slide_key(slide, exact) for slide in new])
+    ops = []
+    for old_range, new_range, matched in gaps(matches, len(old), len(new)):
+        if matched:
+            ops.append(('equal', old_range[0], new_range[0]))
+        else:
+            ops.extend(pair_gap(old, new, old_range, new_range))
+    return ops
+
+def unchanged_slides(old, new):
+    """{new index: old index} for slides whose exact text did not change"""
+    return {j: i for tag, i, j in diff_slides(old, new, exact=True) if tag == 'equal'}
+
+def paragraph_changes(old_slide, new_slide):
+    """'- ' / '+ ' lines for the paragraphs that differ between two slides"""
+    before = slide_texts(old_slide)
+    after = slide_texts(new_slide)
+    matcher = difflib.SequenceMatcher(None, [normalize_text(text) for text in before],
+                                      [normalize_text(text) for text in after], autojunk=False)
+    lines = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag != 'equal':
+            lines.extend(f"- {text}" for text in before[i1:i2])
+            lines.extend(f"+ {text}" for text in after[j1:j2])
+    return lines
+
+def slide_heading(slide):
+    """Title, or the start of the first paragraph"""
+    return (slide['title'] or next(iter(slide['paragraphs']), ''))[:60]
+
+def main():
+    parser = argparse.ArgumentParser(description="השוואת שתי גרסאות מצגת ברמת השקופית")
+    parser.add_argument('old', help="הגרסה הקודמת")
+    parser.add_argument('new', help="הגרסה החדשה")
+    parser.add_argument('--exact', action='store_true',
+                        help="השוואת הטקסט המדויק (ללא נרמול ניקוד, פיסוק וסופיות)")
+    args = parser.parse_args()
+    
+    old = extract_deck(args.old)
+    new = extract_deck(args.new)
+    ops = diff_slides(old, new, args.exact)
+    counts = Counter(tag for tag, _, _ in ops)
+    
+    for tag, i, j in ops:
+        if tag == 'changed':
+            print(f"\n~ שקופית {i + 1} → {j + 1}: {slide_heading(new[j])}")
+            for line in paragraph_changes(old[i], new[j]):
+                print(f"    {line}")
+        elif tag == 'removed':
+            print(f"\n- שקופית {i + 1} הוסרה: {slide_heading(old[i])}")
+        elif tag == 'added':
+            print(f"\n+ שקופית {j + 1} נוספה: {slide_heading(new[j])}")
+    
+    print(f"\n✓ {len(old)} → {len(new)} שקופיות: {counts['equal']} זהות, {counts['changed']} שונו, "
+          f"{counts['added']} נוספו, {counts['removed']} הוסרו")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"שגיאה: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Slide text of any deck in the corpus: .pptx, .key and generated .html
+Every format goes through the extractor the repo already uses for it - the
+daemon's slide XML reader for PowerPoint, the .iwa string scan for Keynote
+and the streaming HTML slide parser - and comes back in one shape:
+[{'number', 'title', 'paragraphs'}], slides numbered from 1.
+"""
+
+import os
+import zipfile
+
+from deck_daemon import slide_content
+from extract_keynote_content import extract_text_from_iwa
+from html_slide_parser import parse_html_slides
+from pptx_patch_writer import read_part_xml, slide_part_names
+
+DECK_EXTENSIONS = ('.pptx', '.key', '.html', '.htm')
+
+# Output and cache directories are not part of the corpus
+SKIP_DIRS = {'deploy', '__pycache__', 'node_modules'}
+
+# Keynote titles are the first short string of a slide
+KEYNOTE_TITLE_LENGTH = 100
+
+def pptx_slides(path):
+    """Slides of a .pptx, one slide XML part parsed at a time"""
+    slides = []
+    with zipfile.ZipFile(path) as package:
+        for number, name in enumerate(slide_part_names(package), 1):
+            content = slide_content(read_part_xml(package, name))
+            slides.append({'number': number, 'title': content['title'],
+                           'paragraphs': content['body']})
+    return slides
+
+def keynote_slides(path):
+    """Slides of a zipped .key, from the strings in Index/Slide*.iwa"""
+    slides = []
+    with zipfile.ZipFile(path) as package:
+        names = sorted(name for name in package.namelist()
+                       if 'Index/Slide' in name and name.endswith('.iwa'))
+        for number, name in enumerate(names, 1):
+            title = ''
+            paragraphs = []
+            for text in extract_text_from_iwa(package.read(name)):
+                if not title and len(text) < KEYNOTE_TITLE_LENGTH:
+                    title = text
+                else:
+                    paragraphs.append(text)
+            slides.append({'number': number, 'title': title, 'paragraphs': paragraphs})
+    return slides
+
+def html_slides(path):
+    """Slides of a generated HTML presentation"""
+    return [{'number': number, 'title': slide['title'], 'paragraphs': slide['paragraphs']}
+            for number, slide in enumerate(parse_html_slides(path), 1)]
+
+def extract_deck(path):
+    """Slides of a deck, by file extension"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.pptx':
+        return pptx_slides(path)
+    if ext == '.key':
+        return keynote_slides(path)
+    if ext in ('.html', '.htm'):
+        return html_slides(path)
+    raise ValueError(f"סוג קובץ לא נתמך: {path}")
+
+def slide_texts(slide):
+    """Title (if any) and paragraphs of a slide"""
+    return ([slide['title']] if slide['title'] else []) + list(slide['paragraphs'])
+
+def find_decks(paths):
+    """Deck files under the given files / directories, sorted, hidden dirs skipped"""
+    decks = []
+    for path in paths:
+        if os.path.isfile(path):
+            if path.lower().endswith(DECK_EXTENSIONS):
+                decks.append(os.path.abspath(path))
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs[:] = [d for d in dirs if not d.startswith('.') and d not in SKIP_DIRS]
+            decks.extend(os.path.abspath(os.path.join(root, name)) for name in files
+                         if name.lower().endswith(DECK_EXTENSIONS))
+    return sorted(set(decks))
@@ -6,14 +6,43 @@ Final enhanced script with advanced RTL support:
 - Ashdod Port professional styling
 - Hebrew fonts and typography
 - Enhanced design elements
+
+Title detection and styling are declared as rules and compiled once; each
+slide is then visited in a single pass, classifying shapes from metadata
+collected up front and applying the compiled styles in bulk.
 """
 
-from pptx import Presentation
+import copy
+import sys
+import time
+import zipfile
+
 from pptx.util import Pt, Inches
-from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
+from pptx.enum.text import MSO_ANCHOR
 from pptx.dml.color import RGBColor
 from pptx.oxml import parse_xml
-from pptx.oxml.ns import nsdecls, qn
+from pptx.oxml.ns import nsdecls
+from pptx_patch_writer import (NS, read_part_xml, serialize_xml, slide_part_names,
+                               write_patched_package)
+
+HEBREW_FONT = 'Arial Hebrew'
+TITLE_NAME_WORDS = ('title', 'כותרת', 'heading', 'header')
+# Run sizes are in hundredths of a point in the XML
+TITLE_MIN_SIZE = 3200
+BODY_MIN_SIZE = 1400
+# r + g + b above this is too light to read in daylight
+LIGHT_COLOR_SUM = 600
+
+# spTree children that are not shapes
+NON_SHAPE_TAGS = {
+    f'{{{NS["p"]}}}nvGrpSpPr',
+    f'{{{NS["p"]}}}grpSpPr',
+    f'{{{NS["p"]}}}extLst',
+}
+SP_TAG = f'{{{NS["p"]}}}sp'
+LNSPC_TAG = f'{{{NS["a"]}}}lnSpc'
+SPCBEF_TAG = f'{{{NS["a"]}}}spcBef'
+SPCAFT_TAG = f'{{{NS["a"]}}}spcAft'
 
 def get_ashdod_port_colors():
     """Return Ashdod Port color scheme - optimized for daylight viewing"""
@@ -29,176 +58,256 @@ def get_ashdod_port_colors():
         'border': RGBColor(220, 230, 240),    # Light border
     }
 
-def set_rtl_direction(paragraph):
-    """Set RTL direction for a paragraph using XML"""
-    try:
-        pPr = paragraph._element.get_or_add_pPr()
-        
-        # Set RTL using PowerPoint's namespace
-        # This is the proper way to set RTL in PowerPoint XML
-        rtl_attr = qn('a:rtl')
-        pPr.set(rtl_attr, '1')
-        
-        # Also try the text direction attribute
-        try:
-            pPr.set('{http://schemas.openxmlformats.org/wordprocessingml/2006/main}dir', 'rtl')
-            pPr.set('{http://schemas.openxmlformats.org/wordprocessingml/2006/main}bidi', '1')
-        except:
-            pass
-            
-    except Exception as e:
-        # Fallback: just set alignment
-        paragraph.alignment = PP_ALIGN.RIGHT
+def get_style_rules(colors):
+    """Shape classification and style rules, in evaluation order
 
-def apply_hebrew_font(run, size=None, bold=False, color=None):
-    """Apply Hebrew font with fallback options"""
-    hebrew_fonts = ['Arial Hebrew', 'David', 'Gisha', 'Miriam', 'Arial', 'Calibri']
+    Classification rules are (name, predicate(meta, state)); the first match
+    makes a shape a title. Run rules are (name, predicate(run_meta), style);
+    the first match styles the run.
+    """
+    return {
+        'classify': [
+            # Placeholder idx 0 is the title placeholder
+            ('placeholder-title', lambda meta, state: meta['placeholder_idx'] == 0),
+            ('name-title', lambda meta, state: meta['title_name']),
+            ('large-font-title', lambda meta, state: meta['max_size'] > TITLE_MIN_SIZE),
+            # First text shape on first slide is likely title
+            ('first-slide-title', lambda meta, state: (
+                state['slide_idx'] == 0 and not state['title_seen'] and meta['is_text']
+                and meta['short_single_line'])),
+        ],
+        'title': {
+            'frame': dict(wrap='square', anchor=MSO_ANCHOR.MIDDLE),
+            'paragraph': dict(align='r', rtl=True, space_after=Pt(12)),
+            'runs': [
+                ('title-run', lambda run: True,
+                 dict(font=HEBREW_FONT, size=4400, bold=True, color=colors['primary'])),
+            ],
+        },
+        'body': {
+            'frame': dict(wrap='square', anchor=MSO_ANCHOR.TOP,
+                          margin_left=Inches(0.5), margin_right=Inches(0.5)),
+            'paragraph': dict(align='r', rtl=True, space_after=Pt(8), line_spacing=1.3),
+            # Use darker text for better contrast in daylight
+            'runs': [
+                ('body-small-run', lambda run: run['size'] < BODY_MIN_SIZE,
+                 dict(font=HEBREW_FONT, size=2200, color=colors['text'])),
+                ('body-light-run', lambda run: run['rgb'] is not None and sum(run['rgb']) > LIGHT_COLOR_SUM,
+                 dict(font=HEBREW_FONT, color=colors['text'])),
+                ('body-uncolored-run', lambda run: run['rgb'] is None,
+                 dict(font=HEBREW_FONT, color=colors['text'])),
+            ],
+        },
+        'background': colors['background'],
+    }
+
+def compile_frame_style(style):
+    """Text-frame (bodyPr) properties as one function"""
+    wrap, anchor = style.get('wrap'), style.get('anchor')
+    margin_left, margin_right = style.get('margin_left'), style.get('margin_right')
     
-    for font_name in hebrew_fonts:
-        try:
-            run.font.name = font_name
-            break
-        except:
-            continue
+    def apply(txBody):
+        bodyPr = txBody.bodyPr
+        if wrap is not None:
+            bodyPr.wrap = wrap
+        if anchor is not None:
+            bodyPr.anchor = anchor
+        if margin_left is not None:
+            bodyPr.lIns = margin_left
+        if margin_right is not None:
+            bodyPr.rIns = margin_right
+    return apply
+
+def compile_paragraph_style(style):
+    """Paragraph (pPr) properties as one function
+
+    Spacing children are built once and copied into each paragraph instead
+    of going through the python-pptx spacing setters per paragraph.
+    """
+    align = style.get('align')
+    rtl = '1' if style.get('rtl') else None
+    line_spacing = None
+    if style.get('line_spacing') is not None:
+        line_spacing = parse_xml(f'<a:lnSpc {nsdecls("a")}><a:spcPct '
+                                 f'val="{int(round(style["line_spacing"] * 100000))}"/></a:lnSpc>')
+    space_after = None
+    if style.get('space_after') is not None:
+        space_after = parse_xml(f'<a:spcAft {nsdecls("a")}><a:spcPts '
+                                f'val="{style["space_after"].centipoints}"/></a:spcAft>')
     
-    if size:
-        run.font.size = size
-    if bold:
-        run.font.bold = True
-    if color:
-        run.font.color.rgb = color
-
-def style_title(shape, colors):
-    """Style title shapes"""
-    if not shape.has_text_frame:
-        return
+    def apply(p):
+        pPr = p.get_or_add_pPr()
+        if align is not None:
+            pPr.set('algn', align)
+        if rtl is not None:
+            pPr.set('rtl', rtl)
+        # Schema order: lnSpc, spcBef, spcAft, then bullets and the rest
+        if line_spacing is not None:
+            old = pPr.find(LNSPC_TAG)
+            if old is not None:
+                pPr.remove(old)
+            pPr.insert(0, copy.deepcopy(line_spacing))
+        if space_after is not None:
+            old = pPr.find(SPCAFT_TAG)
+            if old is not None:
+                pPr.remove(old)
+            position = 0
+            for tag in (LNSPC_TAG, SPCBEF_TAG):
+                previous = pPr.find(tag)
+                if previous is not None:
+                    position = pPr.index(previous) + 1
+            pPr.insert(position, copy.deepcopy(space_after))
+    return apply
+
+def compile_run_style(style):
+    """Run (rPr) properties as one function"""
+    font, size, bold = style.get('font'), style.get('size'), style.get('bold')
+    color = str(style['color']) if style.get('color') is not None else None
     
-    text_frame = shape.text_frame
-    text_frame.word_wrap = True
-    text_frame.vertical_anchor = MSO_ANCHOR.MIDDLE
+    def apply(rPr):
+        if font is not None:
+            rPr.get_or_add_latin().typeface = font
+        if size is not None:
+            rPr.sz = size
+        if bold:
+            rPr.b = True
+        if color is not None:
+            rPr.get_or_change_to_solidFill().get_or_change_to_srgbClr().set('val', color)
+    return apply
+
+def compile_rules(rules):
+    """Compile the declarative rules once into callables"""
+    compiled = {
+        'classify': rules['classify'],
+        'background': str(rules['background']),
+    }
+    for kind in ('title', 'body'):
+        compiled[kind] = {
+            'frame': compile_frame_style(rules[kind]['frame']),
+            'paragraph': compile_paragraph_style(rules[kind]['paragraph']),
+            'runs': [(name, predicate, compile_run_style(style))
+                     for name, predicate, style in rules[kind]['runs']],
+        }
+    return compiled
+
+def shape_metadata(shape):
+    """Everything the classification rules look at, collected in one pass"""
+    nv = shape[0] if len(shape) else None
+    cNvPr = nv.find('p:cNvPr', NS) if nv is not None else None
+    ph = nv.find('p:nvPr/p:ph', NS) if nv is not None else None
+    name = (cNvPr.get('name') or '').lower() if cNvPr is not None else ''
+    is_text = shape.tag == SP_TAG
+    txBody = shape.find('p:txBody', NS) if is_text else None
     
-    for paragraph in text_frame.paragraphs:
-        paragraph.alignment = PP_ALIGN.RIGHT
-        paragraph.space_after = Pt(12)
-        set_rtl_direction(paragraph)
-        
-        for run in paragraph.runs:
-            apply_hebrew_font(run, size=Pt(44), bold=True, color=colors['primary'])
-            try:
-                run.font.shadow = True
-            except:
-                pass
-
-def style_body_text(shape, colors):
-    """Style body text shapes"""
-    if not shape.has_text_frame:
-        return
+    runs = []
+    paragraphs = []
+    max_size = 0
+    if txBody is not None:
+        for p in txBody.iterfind('a:p', NS):
+            texts = []
+            for r in p.iterfind('a:r', NS):
+                rPr = r.find('a:rPr', NS)
+                size = int(rPr.get('sz', 0)) if rPr is not None else 0
+                color = rPr.find('a:solidFill/a:srgbClr', NS) if rPr is not None else None
+                rgb = RGBColor.from_string(color.get('val')) if color is not None else None
+                runs.append({'element': r, 'size': size, 'rgb': rgb})
+                max_size = max(max_size, size)
+                texts.append(r.findtext('a:t', '', NS))
+            paragraphs.append(''.join(texts))
+    text = '\n'.join(paragraphs).strip()
     
-    text_frame = shape.text_frame
-    text_frame.word_wrap = True
-    text_frame.vertical_anchor = MSO_ANCHOR.TOP
-    text_frame.margin_left = Inches(0.5)
-    text_frame.margin_right = Inches(0.5)
+    return {
+        'placeholder_idx': int(ph.get('idx', 0)) if ph is not None else None,
+        'title_name': any(word in name for word in TITLE_NAME_WORDS),
+        'max_size': max_size,
+        'is_text': is_text,
+        'short_single_line': bool(text) and len(text) < 80 and '\n' not in text,
+        'runs': runs,
+    }
+
+def record(stats, name, started, matched=True):
+    """Accumulate match count and time for one rule"""
+    entry = stats.setdefault(name, [0, 0.0])
+    entry[0] += matched
+    entry[1] += time.perf_counter() - started
+
+def style_shape(shape, meta, style, stats, kind):
+    """Apply a compiled shape style: frame, all paragraphs, then runs by rule"""
+    started = time.perf_counter()
+    txBody = shape.get_or_add_txBody()
+    style['frame'](txBody)
+    for p in txBody.iterfind('a:p', NS):
+        style['paragraph'](p)
+    record(stats, f'{kind}-style', started)
+    
+    for run in meta['runs']:
+        for name, predicate, apply in style['runs']:
+            started = time.perf_counter()
+            if predicate(run):
+                apply(run['element'].get_or_add_rPr())
+                record(stats, name, started)
+                break
+            record(stats, name, started, matched=False)
+
+def enhance_slide(slide, slide_idx, compiled, stats):
+    """Single pass over one slide: background, then classify and style each shape"""
+    started = time.perf_counter()
+    # Set slide background - bright white for daylight viewing
+    bgPr = slide.find('p:cSld', NS).get_or_add_bgPr()
+    bgPr.get_or_change_to_solidFill().get_or_change_to_srgbClr().set('val', compiled['background'])
+    record(stats, 'background', started)
     
-    for paragraph in text_frame.paragraphs:
-        paragraph.alignment = PP_ALIGN.RIGHT
-        paragraph.space_after = Pt(8)
-        paragraph.line_spacing = 1.3
-        set_rtl_direction(paragraph)
+    state = {'slide_idx': slide_idx, 'title_seen': False}
+    for shape in slide.find('p:cSld/p:spTree', NS):
+        if shape.tag in NON_SHAPE_TAGS or not isinstance(shape.tag, str):
+            continue
+        started = time.perf_counter()
+        meta = shape_metadata(shape)
+        record(stats, 'metadata', started)
         
-        for run in paragraph.runs:
-            # Preserve existing size if reasonable, otherwise set default
-            # Use darker text for better contrast in daylight
-            if not run.font.size or run.font.size < Pt(14):
-                apply_hebrew_font(run, size=Pt(22), color=colors['text'])
-            else:
-                # Ensure text is dark enough for visibility
-                if run.font.color.rgb:
-                    # Make text darker if it's too light
-                    r, g, b = run.font.color.rgb
-                    if r + g + b > 600:  # If too light
-                        apply_hebrew_font(run, color=colors['text'])
-                else:
-                    apply_hebrew_font(run, color=colors['text'])
+        is_title = False
+        for name, predicate in compiled['classify']:
+            started = time.perf_counter()
+            matched = predicate(meta, state)
+            record(stats, name, started, matched)
+            if matched:
+                is_title = state['title_seen'] = True
+                break
+        
+        # Apply styling
+        if is_title and meta['is_text']:
+            style_shape(shape, meta, compiled['title'], stats, 'title')
+        elif meta['is_text']:
+            style_shape(shape, meta, compiled['body'], stats, 'body')
+
+def print_rule_report(stats):
+    """Per-rule match counts and time"""
+    print("\nכללים:")
+    for name, (count, seconds) in stats.items():
+        print(f"  {name:<20} {count:>6} התאמות {seconds * 1000:>9.2f} ms")
 
 def process_presentation(input_file, output_file):
     """Process and enhance the presentation"""
     print(f"טוען מצגת: {input_file}")
-    prs = Presentation(input_file)
-    
-    colors = get_ashdod_port_colors()
-    
-    print(f"מעבד {len(prs.slides)} שקופיות...")
+    compiled = compile_rules(get_style_rules(get_ashdod_port_colors()))
+    stats = {}
+    patches = {}
     
-    for slide_idx, slide in enumerate(prs.slides):
-        print(f"מעבד שקופית {slide_idx + 1}...")
+    with zipfile.ZipFile(input_file) as package:
+        slide_names = slide_part_names(package)
+        print(f"מעבד {len(slide_names)} שקופיות...")
         
-        # Set slide background - bright white for daylight viewing
-        try:
-            background = slide.background
-            fill = background.fill
-            fill.solid()
-            # Use pure white for maximum clarity in daylight
-            fill.fore_color.rgb = colors['background']
-            
-            # Add subtle border for definition
-            try:
-                line = fill.line
-                line.color.rgb = colors['border']
-                line.width = Pt(1)
-            except:
-                pass
-        except:
-            pass
-        
-        # Process shapes
-        title_processed = False
-        
-        for shape in slide.shapes:
-            is_title = False
-            
-            # Check if placeholder title
-            try:
-                if hasattr(shape, 'is_placeholder') and shape.is_placeholder:
-                    if shape.placeholder_format.idx == 0:
-                        is_title = True
-                        title_processed = True
-            except:
-                pass
-            
-            # Check shape name
-            if not is_title and shape.name:
-                name_lower = shape.name.lower()
-                if any(word in name_lower for word in ['title', 'כותרת', 'heading', 'header']):
-                    is_title = True
-                    title_processed = True
-            
-            # Check font size
-            if not is_title and shape.has_text_frame:
-                for paragraph in shape.text_frame.paragraphs:
-                    for run in paragraph.runs:
-                        if run.font.size and run.font.size > Pt(32):
-                            is_title = True
-                            title_processed = True
-                            break
-                    if is_title:
-                        break
-            
-            # First text shape on first slide is likely title
-            if not title_processed and slide_idx == 0 and shape.has_text_frame:
-                text = shape.text_frame.text.strip()
-                if len(text) < 80 and text and '\n' not in text:
-                    is_title = True
-                    title_processed = True
-            
-            # Apply styling
-            if is_title:
-                style_title(shape, colors)
-            elif shape.has_text_frame:
-                style_body_text(shape, colors)
+        for slide_idx, slide_name in enumerate(slide_names):
+            print(f"מעבד שקופית {slide_idx + 1}...")
+            slide = read_part_xml(package, slide_name)
+            enhance_slide(slide, slide_idx, compiled, stats)
+            patches[slide_name] = serialize_xml(slide)
+    
+    print_rule_report(stats)
     
-    print(f"שומר ל: {output_file}")
-    prs.save(output_file)
+    # Only the slide XML is rewritten, media is copied raw
+    print(f"\nשומר ל: {output_file}")
+    write_patched_package(input_file, output_file, patches)
     print("\n✓ הושלם בהצלחה!")
     print("  ✓ כיוון RTL (מימין לשמאל)")
     print("  ✓ עיצוב נמל אשדוד")
@@ -210,7 +319,12 @@ if __name__ == "__main__":
     output_file = "ספריה דיגיטלית חכמה.pptx"
     
     try:
-        process_presentation(input_file, output_file)
+        if '--daemon' in sys.argv[1:]:
+            # The parsed deck stays in deck_daemon between runs
+            from deck_daemon import edit_via_daemon
+            edit_via_daemon(input_file, output=output_file, enhance=True)
+        else:
+            process_presentation(input_file, output_file)
     except Exception as e:
         print(f"שגיאה: {e}")
         import traceback
@@ -4,44 +4,28 @@
 Fix logo CSS in all HTML files - change img to svg
 """
 
-import re
+from html_patch_engine import HTML_FILES, logo_css_patches, patch_file, patch_files
+
+PATCHES = [
+    *logo_css_patches('img', 'svg'),
+    # Remove border-radius as it's not needed for SVG
+    {'id': 'logo-radius', 'type': 'remove_declaration', 'selector': '.logo svg',
+     'property': 'border-radius'},
+]
 
 def fix_logo_css(file_path):
     """Fix logo CSS to work with SVG"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Replace .logo img with .logo svg
-    if '.logo img' in content:
-        content = content.replace('.logo img', '.logo svg')
-        # Remove border-radius as it's not needed for SVG
-        content = re.sub(r'border-radius:\s*8px;?\s*', '', content)
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        return True
-    
-    return False
+    return bool(patch_file(file_path, PATCHES))
 
 if __name__ == "__main__":
-    html_files = [
-        "presentation_v2.html",
-        "presentation_2key.html",
-        "presentation_v1.html",
-        "presentation.html"
-    ]
-    
     print("מתקן CSS של לוגו...")
     
-    for html_file in html_files:
-        try:
-            if fix_logo_css(html_file):
-                print(f"✓ תוקן {html_file}")
-            else:
-                print(f"  {html_file} כבר תקין")
-        except Exception as e:
-            print(f"  שגיאה ב-{html_file}: {e}")
+    for html_file, (applied, error) in patch_files(HTML_FILES, PATCHES).items():
+        if error:
+            print(f"  שגיאה ב-{html_file}: {error}")
+        elif applied:
+            print(f"✓ תוקן {html_file}")
+        else:
+            print(f"  {html_file} כבר תקין")
     
     print("\n✓ הושלם!")
-
-
@@ -2,29 +2,30 @@
 # -*- coding: utf-8 -*-
 """
 Fix logo image - replace with working SVG logo
+The SVG is emitted once per page as a <symbol> sprite and every logo
+references it with <use> - the logo div and, in presentation_v2.html, the
+#mainLogo image and the two halves of the exploding logo.
 """
 
-import re
+from html_patch_engine import (HTML_FILES, LOGO_SPRITE_ID, LOGO_SYMBOL_ID, logo_css_patches,
+                               patch_file, patch_files)
 
-def fix_logo_image(file_path):
-    """Replace logo image with working SVG"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Find logo div and replace image with SVG
-    logo_pattern = r'(<div class="logo">.*?</div>)'
-    
-    new_logo_html = '''    <div class="logo">
-        <svg width="120" height="120" viewBox="0 0 120 120" xmlns="http://www.w3.org/2000/svg">
-            <defs>
-                <linearGradient id="portGradient" x1="0%" y1="0%" x2="100%" y2="100%">
-                    <stop offset="0%" style="stop-color:#003366;stop-opacity:1" />
-                    <stop offset="100%" style="stop-color:#0066CC;stop-opacity:1" />
-                </linearGradient>
-            </defs>
-            <circle cx="60" cy="60" r="55" fill="url(#portGradient)" opacity="0.15"/>
+# The logo is drawn once in a sprite; ids are namespaced so they can't clash
+# with ids in the slides. A zero-size sprite (not display:none) keeps the
+# gradient paintable in every browser.
+LOGO_GRADIENT_ID = f"{LOGO_SYMBOL_ID}-gradient"
+
+LOGO_SPRITE_HTML = f'''<svg id="{LOGO_SPRITE_ID}" width="0" height="0" style="position:absolute" aria-hidden="true" xmlns="http://www.w3.org/2000/svg">
+        <defs>
+            <linearGradient id="{LOGO_GRADIENT_ID}" x1="0%" y1="0%" x2="100%" y2="100%">
+                <stop offset="0%" style="stop-color:#003366;stop-opacity:1" />
+                <stop offset="100%" style="stop-color:#0066CC;stop-opacity:1" />
+            </linearGradient>
+        </defs>
+        <symbol id="{LOGO_SYMBOL_ID}" viewBox="0 0 120 120">
+            <circle cx="60" cy="60" r="55" fill="url(#{LOGO_GRADIENT_ID})" opacity="0.15"/>
             <!-- Anchor/Ship symbol -->
-            <path d="M60 25 L75 45 L90 45 L70 65 L80 90 L60 75 L40 90 L50 65 L30 45 L45 45 Z" fill="url(#portGradient)" stroke="#003366" stroke-width="1.5"/>
+            <path d="M60 25 L75 45 L90 45 L70 65 L80 90 L60 75 L40 90 L50 65 L30 45 L45 45 Z" fill="url(#{LOGO_GRADIENT_ID})" stroke="#003366" stroke-width="1.5"/>
             <!-- Circle center -->
             <circle cx="60" cy="60" r="6" fill="#0066CC"/>
             <!-- Waves -->
@@ -32,45 +33,39 @@ def fix_logo_image(file_path):
             <path d="M25 95 Q35 90, 45 95 T65 95 T85 95 T95 95" stroke="#0066CC" stroke-width="1.5" fill="none" opacity="0.4"/>
             <!-- Text -->
             <text x="60" y="110" font-family="Arial Hebrew, David, Arial" font-size="11" fill="#003366" text-anchor="middle" font-weight="bold">נמל אשדוד</text>
-        </svg>
+        </symbol>
+    </svg>'''
+
+# Every logo on the page is a reference to the symbol; the viewBox keeps the
+# aspect ratio when CSS sizes the graphic (width: 100%; height: auto)
+LOGO_SVG_TAG = (f'<svg width="120" height="120" viewBox="0 0 120 120" role="img" '
+                f'aria-label="לוגו נמל אשדוד"><use href="#{LOGO_SYMBOL_ID}"/></svg>')
+NEW_LOGO_HTML = f'''<div class="logo">
+        {LOGO_SVG_TAG}
     </div>'''
-    
-    if re.search(logo_pattern, content, re.DOTALL):
-        content = re.sub(logo_pattern, new_logo_html, content, flags=re.DOTALL)
-        
-        # Also update CSS to work with SVG
-        if '.logo img' in content:
-            content = content.replace(
-                '.logo img {',
-                '.logo svg {'
-            )
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        
-        return True
-    
-    return False
+
+PATCHES = [
+    {'id': 'logo-svg', 'type': 'replace_logo', 'html': NEW_LOGO_HTML},
+    {'id': 'logo-graphics-svg', 'type': 'replace_logo_graphics', 'html': LOGO_SVG_TAG},
+    {'id': 'logo-sprite', 'type': 'insert_sprite', 'sprite_id': LOGO_SPRITE_ID,
+     'symbol_id': LOGO_SYMBOL_ID, 'html': LOGO_SPRITE_HTML},
+    # Also update CSS to work with SVG
+    *logo_css_patches('img', 'svg'),
+]
+
+def fix_logo_image(file_path):
+    """Replace logo image with a <use> of the page's SVG logo sprite"""
+    return bool(patch_file(file_path, PATCHES))
 
 if __name__ == "__main__":
-    html_files = [
-        "presentation_v2.html",
-        "presentation_2key.html",
-        "presentation_v1.html",
-        "presentation.html"
-    ]
-    
     print("מתקן לוגו - מחליף ל-SVG שעובד בוודאות...")
     
-    for html_file in html_files:
-        try:
-            if fix_logo_image(html_file):
-                print(f"✓ עודכן {html_file}")
-            else:
-                print(f"  לא נמצא לוגו ב-{html_file}")
-        except Exception as e:
-            print(f"  שגיאה ב-{html_file}: {e}")
+    for html_file, (applied, error) in patch_files(HTML_FILES, PATCHES).items():
+        if error:
+            print(f"  שגיאה ב-{html_file}: {error}")
+        elif applied:
+            print(f"✓ עודכן {html_file}")
+        else:
+            print(f"  לא נמצא לוגו ב-{html_file} או שהוא כבר מעודכן")
     
     print("\n✓ הושלם! הלוגו עכשיו SVG שעובד בוודאות.")
-
-
@@ -4,28 +4,36 @@
 Fix "תנהלים" to "נהלים" in the first slide
 """
 
-from pptx import Presentation
+import sys
+import zipfile
+
+from pptx_patch_writer import (read_part_xml, run_text, serialize_xml, set_run_text,
+                               slide_part_names, text_runs, write_patched_package)
+
+# The same edit as a patch set, for --daemon mode
+DAEMON_PATCHES = [
+    {'id': 'fix-nhalim', 'type': 'replace', 'slides': [1], 'find': 'תנהלים', 'replace': 'נהלים'},
+]
 
 def fix_text_in_presentation(input_file, output_file):
     """Fix text in presentation"""
     print(f"טוען מצגת: {input_file}")
-    prs = Presentation(input_file)
-    
-    # Fix only the first slide
-    slide = prs.slides[0]
+    with zipfile.ZipFile(input_file) as package:
+        # Fix only the first slide
+        slide_name = slide_part_names(package)[0]
+        slide = read_part_xml(package, slide_name)
     changes_count = 0
     
-    for shape in slide.shapes:
-        if shape.has_text_frame:
-            for paragraph in shape.text_frame.paragraphs:
-                for run in paragraph.runs:
-                    if 'תנהלים' in run.text:
-                        run.text = run.text.replace('תנהלים', 'נהלים')
-                        changes_count += 1
-                        print(f"  עודכן: תנהלים → נהלים")
+    for run in text_runs(slide):
+        if 'תנהלים' in run_text(run):
+            set_run_text(run, run_text(run).replace('תנהלים', 'נהלים'))
+            changes_count += 1
+            print(f"  עודכן: תנהלים → נהלים")
     
+    # Only the slide XML is rewritten, all other parts are copied as-is
     print(f"שומר ל: {output_file}")
-    prs.save(output_file)
+    patches = {slide_name: serialize_xml(slide)} if changes_count else {}
+    write_patched_package(input_file, output_file, patches)
     print(f"\n✓ הושלם! בוצעו {changes_count} שינויים")
 
 if __name__ == "__main__":
@@ -33,7 +41,12 @@ if __name__ == "__main__":
     output_file = "ספריה דיגיטלית חכמה.pptx"
     
     try:
-        fix_text_in_presentation(input_file, output_file)
+        if '--daemon' in sys.argv[1:]:
+            # The parsed deck stays in deck_daemon between runs
+            from deck_daemon import edit_via_daemon
+            edit_via_daemon(input_file, DAEMON_PATCHES, output_file)
+        else:
+            fix_text_in_presentation(input_file, output_file)
     except Exception as e:
         print(f"שגיאה: {e}")
         import traceback
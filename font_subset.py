@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+תת-קבוצת גופן עברי לפי התווים שבמצגת
+אוסף את נקודות הקוד שמופיעות בטקסט המצגת, חותך את הגופן המצורף (fonts/)
+רק לגליפים האלה ב-fontTools ומייצר WOFF2 (אם brotli מותקן) ו-WOFF.
+ה-CSS מקבל @font-face עם unicode-range ו-font-display: swap, והגופן נכנס
+לראש ה-font-family כך שכל הקיוסקים מציגים אותו גופן.
+התוצאה נשמרת במטמון הבנייה לפי hash של קבוצת הגליפים - מצגת שהטקסט שלה
+לא השתנה לא נחתכת מחדש. בלי fontTools או בלי קובץ גופן הפרסום ממשיך
+בגופני המערכת, או נכשל עם --require-fonts (ההוראות להורדת הגופן
+ב-fonts/README.md).
+"""
+
+import argparse
+import hashlib
+import html
+import os
+import sys
+
+try:
+    from fontTools import subset as font_subsetter
+except ImportError:
+    font_subsetter = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from css_index import declaration_value, set_declaration
+from html_patch_engine import serialize, stylesheets, tokenize
+
+# שם המשפחה בדף, והגופנים המצורפים לפי משקל (OFL, ראו fonts/README.md)
+FONT_FAMILY = "Ashdod Hebrew"
+FONT_SOURCES = {
+    400: "fonts/NotoSansHebrew-Regular.ttf",
+    700: "fonts/NotoSansHebrew-Bold.ttf",
+}
+
+# גופנים שהמשפחה החדשה נכנסת לפניהם ב-font-family
+HEBREW_FALLBACK_FONTS = ("'Arial Hebrew'", "'David'", "'Gisha'", "'Miriam'")
+
+# תווים שה-JavaScript כותב לדף (מונה שקופיות, כפתורים)
+RUNTIME_CHARACTERS = "0123456789 /:.,-–•←→"
+
+# טווח האותיות העבריות (כולל ניקוד) - נאסף גם מתוך סקריפטים
+HEBREW_BLOCK = (0x0590, 0x05FF)
+
+# שינוי הגרסה מבטל את כל המטמון (למשל שינוי באפשרויות החיתוך)
+SUBSET_VERSION = 1
+SUBSET_HASH_LENGTH = 10
+
+def collect_codepoints(content):
+    """נקודות הקוד שבטקסט הדף, בתוספת אותיות עבריות מתוך <script>"""
+    codepoints = set(map(ord, RUNTIME_CHARACTERS))
+    for kind, text, *_ in tokenize(content):
+        if kind == 'text':
+            codepoints.update(map(ord, html.unescape(text)))
+        elif kind == 'tag':
+            # alt / title / aria-label מוצגים גם הם
+            codepoints.update(ord(char) for char in html.unescape(text)
+                              if HEBREW_BLOCK[0] <= ord(char) <= HEBREW_BLOCK[1])
+        elif kind == 'script':
+            codepoints.update(ord(char) for char in text
+                              if HEBREW_BLOCK[0] <= ord(char) <= HEBREW_BLOCK[1])
+    # תווי בקרה ורווחים שאינם נראים לא צריכים גליף
+    return sorted(cp for cp in codepoints if cp >= 0x20 and cp != 0x7F)
+
+def unicode_range(codepoints):
+    """U+5D0-5EA, U+2190 ... - רצפים רצופים מקובצים לטווח אחד"""
+    ranges = []
+    for cp in codepoints:
+        if ranges and cp == ranges[-1][1] + 1:
+            ranges[-1][1] = cp
+        else:
+            ranges.append([cp, cp])
+    return ', '.join(f"U+{start:X}" if start == end else f"U+{start:X}-{end:X}"
+                     for start, end in ranges)
+
+def glyph_set_hash(font_path, codepoints, flavor):
+    """מפתח המטמון: תוכן הגופן, קבוצת הגליפים והפורמט"""
+    digest = hashlib.sha256(f"{SUBSET_VERSION}:{flavor}:".encode('ascii'))
+    with open(font_path, 'rb') as f:
+        digest.update(hashlib.sha256(f.read()).digest())
+    digest.update(','.join(map(str, codepoints)).encode('ascii'))
+    return digest.hexdigest()[:SUBSET_HASH_LENGTH]
+
+def font_codepoints(font_path):
+    """נקודות הקוד שיש להן גליף בגופן (טבלת cmap)"""
+    font = font_subsetter.load_font(font_path, font_subsetter.Options())
+    try:
+        return set(font.getBestCmap())
+    finally:
+        font.close()
+
+def subset_font(font_path, codepoints, output_path, flavor):
+    """חיתוך הגופן לנקודות הקוד הנתונות ושמירה כ-WOFF2 / WOFF"""
+    options = font_subsetter.Options()
+    options.flavor = flavor
+    # כל תכונות ה-OpenType - מיקום ניקוד (mark/mkmk) חיוני בעברית
+    options.layout_features = ['*']
+    options.notdef_outline = True
+    font = font_subsetter.load_font(font_path, options)
+    subsetter = font_subsetter.Subsetter(options=options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+    tmp_path = output_path + '.tmp'
+    font_subsetter.save_font(font, tmp_path, options)
+    font.close()
+    os.replace(tmp_path, output_path)
+
+def available_flavors():
+    """WOFF2 דורש brotli; WOFF תמיד זמין"""
+    return ('woff2', 'woff') if brotli is not None else ('woff',)
+
+def font_sources_problem():
+    """הסיבה שאי אפשר לחתוך את הגופן (אין fontTools / חסר קובץ גופן), או None"""
+    if font_subsetter is None:
+        return "fontTools לא מותקן (pip install fonttools)"
+    missing = [path for path in FONT_SOURCES.values() if not os.path.exists(path)]
+    if missing:
+        return f"חסרים קבצי גופן: {', '.join(missing)} - ההוראות להורדה ב-fonts/README.md"
+    return None
+
+def check_font_sources():
+    """שגיאה מפורשת כשאין fontTools או כשחסר אחד מקבצי הגופן"""
+    problem = font_sources_problem()
+    if problem:
+        raise RuntimeError(problem)
+
+def build_font_subsets(content, cache_dir):
+    """חיתוך הגופנים המצורפים לטקסט הדף
+
+    מחזיר רשימת קבצים [{'weight', 'flavor', 'name', 'path', 'size', 'cached', 'codepoints'}]
+    ואת נקודות הקוד של הדף. לכל משקל נשמרות רק נקודות הקוד שיש להן גליף
+    בגופן (אמוג'י נשארים לגופן המערכת). בלי fontTools או גופן - RuntimeError.
+    """
+    check_font_sources()
+    
+    os.makedirs(cache_dir, exist_ok=True)
+    codepoints = collect_codepoints(content)
+    files = []
+    for weight, font_path in sorted(FONT_SOURCES.items()):
+        stem = os.path.splitext(os.path.basename(font_path))[0]
+        covered = font_codepoints(font_path)
+        glyphs = [cp for cp in codepoints if cp in covered]
+        for flavor in available_flavors():
+            name = f"{stem}.{glyph_set_hash(font_path, glyphs, flavor)}.{flavor}"
+            path = os.path.join(cache_dir, name)
+            cached = os.path.exists(path)
+            if not cached:
+                subset_font(font_path, glyphs, path, flavor)
+            files.append({'weight': weight, 'flavor': flavor, 'name': name, 'path': path,
+                          'size': os.path.getsize(path), 'cached': cached, 'codepoints': glyphs})
+    return {'files': files, 'codepoints': codepoints}
+
+def font_face_css(fonts, indent="        "):
+    """@font-face לכל משקל, WOFF2 לפני WOFF"""
+    blocks = []
+    for weight in sorted({entry['weight'] for entry in fonts['files']}):
+        entries = [entry for entry in fonts['files'] if entry['weight'] == weight]
+        sources = ', '.join(f"url('{entry['name']}') format('{entry['flavor']}')"
+                            for entry in entries)
+        blocks.append('\n'.join([
+            f"{indent}@font-face {{",
+            f"{indent}    font-family: '{FONT_FAMILY}';",
+            f"{indent}    src: {sources};",
+            f"{indent}    font-weight: {weight};",
+            f"{indent}    font-display: swap;",
+            f"{indent}    unicode-range: {unicode_range(entries[0]['codepoints'])};",
+            f"{indent}}}",
+        ]))
+    return '\n\n'.join(blocks)
+
+def apply_font_faces(content, fonts):
+    """הוספת ה-@font-face לראש ה-<style> הראשון והמשפחה לראש כל font-family עברי"""
+    tokens = tokenize(content)
+    sheets = stylesheets(tokens)
+    if not sheets:
+        return content
+    family = f"'{FONT_FAMILY}'"
+    for sheet in sheets:
+        for rule in sheet['rules']:
+            value = declaration_value(rule, 'font-family')
+            if value and family not in value and any(font in value for font in HEBREW_FALLBACK_FONTS):
+                set_declaration(sheet, rule, 'font-family', f"{family}, {value}")
+    
+    # ה-@font-face נכנס מיד אחרי <style> הראשון
+    first = next(token for token in tokens if token[0] == 'css')
+    first[1] = '\n' + font_face_css(fonts) + '\n' + serialize([first])
+    first[2] = None
+    return serialize(tokens)
+
+def main():
+    parser = argparse.ArgumentParser(description="חיתוך הגופן העברי לתווים שבמצגת")
+    parser.add_argument('html_file', nargs='?', default="presentation_v2.html")
+    parser.add_argument('--cache-dir', default=os.path.join(".deploy_cache", "fonts"))
+    args = parser.parse_args()
+    
+    with open(args.html_file, 'r', encoding='utf-8') as f:
+        content = f.read()
+    codepoints = collect_codepoints(content)
+    print(f"{args.html_file}: {len(codepoints)} תווים")
+    print(f"unicode-range: {unicode_range(codepoints)}")
+    fonts = build_font_subsets(content, args.cache_dir)
+    for entry in fonts['files']:
+        state = "מהמטמון" if entry['cached'] else "נחתך"
+        print(f"✓ {entry['name']} ({entry['size']:,} בתים, {len(entry['codepoints'])} תווים, {state})")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"שגיאה: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
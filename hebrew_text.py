@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Hebrew text normalization shared by the search and comparison tools
+Niqqud and cantillation marks are stripped, final letters are folded to their
+regular forms (ך→כ, ם→מ, ן→נ, ף→פ, ץ→צ), geresh / gershayim inside a word are
+dropped (ע״י → עי) and Latin text is lower-cased. Words may also be expanded
+with the forms that have one to three prefix letters (ו, ה, ב, כ, ל, מ, ש)
+removed, so "שרשרת" finds "לשרשרת" and "והשרשרת".
+The JavaScript twin of normalize_words() is SEARCH_NORMALIZE_JS in
+slide_search_index; both must split text into the same words.
+"""
+
+import re
+
+# Niqqud and cantillation marks (maqaf, paseq and sof pasuq separate words)
+NIQQUD_RE = re.compile('[\u0591-\u05BD\u05BF\u05C1\u05C2\u05C4\u05C5\u05C7]')
+
+# Geresh, gershayim and quotes between two letters belong to the word
+WORD_JOINER_RE = re.compile('(?<=[^\\W_])[\'"`\u05F3\u05F4](?=[^\\W_])')
+
+WORD_RE = re.compile(r'[^\W_]+')
+
+FINAL_LETTERS = str.maketrans('ךםןףץ', 'כמנפצ')
+
+PREFIX_LETTERS = frozenset('ובהכלמש')
+MAX_PREFIX_LETTERS = 3
+MIN_STEM_LENGTH = 2
+
+def normalize_words(text):
+    """Normalized words of a text, in order"""
+    text = WORD_JOINER_RE.sub('', NIQQUD_RE.sub('', text))
+    return [word.translate(FINAL_LETTERS) for word in WORD_RE.findall(text.lower())]
+
+def normalize_text(text):
+    """Normalized words joined by single spaces (for hashing and comparison)"""
+    return ' '.join(normalize_words(text))
+
+def prefix_variants(word):
+    """The word and its forms without up to MAX_PREFIX_LETTERS prefix letters"""
+    variants = [word]
+    for length in range(1, MAX_PREFIX_LETTERS + 1):
+        if word[length - 1] not in PREFIX_LETTERS or len(word) - length < MIN_STEM_LENGTH:
+            break
+        variants.append(word[length:])
+    return variants
+
+def index_terms(text):
+    """Distinct terms under which a text is indexed"""
+    terms = set()
+    for word in normalize_words(text):
+        terms.update(prefix_variants(word))
+    return terms
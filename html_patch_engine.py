@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+One-pass patch engine for the HTML presentations
+Each file is read and tokenized once (tags, text, comments, <style> CSS and
+<script> blocks), an ordered list of idempotent patches edits the tokens, and
+the file is written once - only if some patch changed it. Unchanged files are
+never opened for writing, so their mtime is kept. Files are patched in
+parallel worker processes. A ledger next to the scripts (html_patch_ledger) lets
+files that are already patched be skipped with a single stat.
+
+A patch is a dict with a 'type' (see PATCH_APPLIERS) and an optional 'id':
+    insert_css          css, marker      - add rules unless marker selector exists
+    insert_logo         html             - add the logo block after <body>
+    insert_sprite       sprite_id, symbol_id, html - SVG sprite after <body> for pages using it
+    remove_sprite       sprite_id, symbol_id       - drop the sprite once nothing uses it
+    replace_logo        html             - replace the <div class="logo"> block
+    replace_logo_graphics html           - every <img>/<svg> inside logo and logo-piece divs
+    indent_logo         indent           - indentation of the logo block line
+    set_src             patterns, src    - img src values matching a pattern
+    rename_selector     old, new         - rename a selector in the CSS
+    strip_rule          selector         - remove a rule
+    ensure_declaration  selector, property, value
+    remove_declaration  selector, property
+"""
+
+import argparse
+import os
+import re
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from css_index import (find_rules, has_declaration, parse_stylesheet, prepend_declaration,
+                       remove_declaration, remove_rule, rename_selector, serialize_stylesheet)
+from html_patch_ledger import (content_hash, file_state, is_current, known_hash, ledger_entry,
+                               ledger_key, load_ledger, patch_versions, save_ledger)
+
+HTML_FILES = [
+    "presentation_v2.html",
+    "presentation_2key.html",
+    "presentation_v1.html",
+    "presentation.html"
+]
+
+LOGO_SRC = "asdod_port_logo_official.png"
+LOGO_INDENT = "    "
+
+# SVG logo sprite written by fix_logo_image; ids are namespaced
+LOGO_SYMBOL_ID = "ashdod-port-logo"
+LOGO_SPRITE_ID = f"{LOGO_SYMBOL_ID}-sprite"
+
+LOGO_IMG_TAG = '<img src="{src}" alt="לוגו נמל אשדוד" />'
+LOGO_IMG_HTML = f'''<div class="logo">
+        {LOGO_IMG_TAG}
+    </div>'''
+
+# Divs holding a logo graphic: the logo itself and the halves of the
+# exploding logo in presentation_v2.html
+LOGO_CONTAINER_CLASSES = {'logo', 'logo-piece'}
+
+# Rules styling the logo graphic; {} is its element (img or svg)
+LOGO_GRAPHIC_SELECTORS = ('.logo {}', '.logo:not(.exploded) {}', '.logo-piece {}',
+                          '.logo-piece.left {}', '.logo-piece.right {}')
+
+# Drops the SVG sprite once no logo references it
+REMOVE_LOGO_SPRITE = {'id': 'logo-sprite-unused', 'type': 'remove_sprite',
+                      'sprite_id': LOGO_SPRITE_ID, 'symbol_id': LOGO_SYMBOL_ID}
+
+def logo_css_patches(old, new):
+    """rename_selector patches moving the logo graphic rules from <old> to <new>"""
+    return [{'id': f'css:{selector.format(new)}', 'type': 'rename_selector',
+             'old': selector.format(old), 'new': selector.format(new)}
+            for selector in LOGO_GRAPHIC_SELECTORS]
+
+# Canonical logo state the old fixer scripts converged on
+LOGO_PATCHES = [
+    {'id': 'logo-block', 'type': 'replace_logo', 'html': LOGO_IMG_HTML.format(src=LOGO_SRC)},
+    {'id': 'logo-graphics', 'type': 'replace_logo_graphics',
+     'html': LOGO_IMG_TAG.format(src=LOGO_SRC)},
+    REMOVE_LOGO_SPRITE,
+    {'id': 'logo-indent', 'type': 'indent_logo', 'indent': LOGO_INDENT},
+    *logo_css_patches('svg', 'img'),
+    {'id': 'logo-text-css', 'type': 'strip_rule', 'selector': '.logo-text'},
+    {'id': 'logo-radius', 'type': 'ensure_declaration', 'selector': '.logo img',
+     'property': 'border-radius', 'value': '8px'},
+]
+
+TOKEN_RE = re.compile(r'''
+    (?P<comment><!--.*?-->)
+  | (?P<style_open><style\b[^>]*>)(?P<css>.*?)(?P<style_close></style\s*>)
+  | (?P<script><script\b[^>]*>.*?</script\s*>)
+  | (?P<tag></?[a-zA-Z][^>]*>)
+  | (?P<text>[^<]+|<)
+''', re.S | re.I | re.X)
+
+ATTRIBUTE_RE = re.compile(r'''([\w:-]+)\s*=\s*("[^"]*"|'[^']*')''')
+TAG_NAME_RE = re.compile(r'</?([a-zA-Z][\w-]*)')
+
+def tokenize(content):
+    """Split HTML into [kind, text] tokens; joining the texts gives the input back
+
+    <style> contents are ['css', text, sheet] tokens; the css_index sheet is
+    built on first use by a CSS patch.
+    """
+    tokens = []
+    for match in TOKEN_RE.finditer(content):
+        kind = match.lastgroup
+        if kind == 'style_close':
+            tokens.append(['tag', match.group('style_open')])
+            tokens.append(['css', match.group('css'), None])
+            tokens.append(['tag', match.group('style_close')])
+        else:
+            tokens.append([kind, match.group(kind)])
+    return tokens
+
+def serialize(tokens):
+    """Tokens back to HTML text; only edited <style> blocks are re-serialized"""
+    return ''.join(serialize_stylesheet(token[2]) if token[0] == 'css' and token[2] else token[1]
+                   for token in tokens)
+
+def tag_name(text):
+    """Lower-case element name of a tag token"""
+    match = TAG_NAME_RE.match(text)
+    return match.group(1).lower() if match else ''
+
+def tag_attributes(text):
+    """Attributes of a start tag as a dict"""
+    return {name.lower(): value[1:-1] for name, value in ATTRIBUTE_RE.findall(text)}
+
+def is_logo_tag(text):
+    """The plain <div class="logo"> start tag the logo scripts manage"""
+    return (not text.startswith('</') and tag_name(text) == 'div'
+            and tag_attributes(text) == {'class': 'logo'})
+
+def has_logo_class(text):
+    """Any <div> start tag whose class list includes "logo" (id="mainLogo" etc.)"""
+    return (not text.startswith('</') and tag_name(text) == 'div'
+            and 'logo' in tag_attributes(text).get('class', '').split())
+
+def is_logo_container(text):
+    """<div> start tag of the logo or of one of its exploding pieces"""
+    if text.startswith('</') or tag_name(text) != 'div':
+        return False
+    return not LOGO_CONTAINER_CLASSES.isdisjoint(tag_attributes(text).get('class', '').split())
+
+def block_end(tokens, first):
+    """Index of the closing tag of the element starting at tokens[first]"""
+    name = tag_name(tokens[first][1])
+    depth = 0
+    for last in range(first, len(tokens)):
+        kind, text, *_ = tokens[last]
+        if kind != 'tag' or tag_name(text) != name or text.endswith('/>'):
+            continue
+        depth += -1 if text.startswith('</') else 1
+        if depth == 0:
+            return last
+    return len(tokens) - 1
+
+def find_block(tokens, is_start):
+    """(first, last) token indexes of the first element is_start(tag) accepts
+
+    The range ends with the element's closing tag.
+    """
+    for first, (kind, text, *_) in enumerate(tokens):
+        if kind == 'tag' and not text.startswith('</') and is_start(text):
+            return first, block_end(tokens, first)
+    return None
+
+def find_logo_block(tokens):
+    """(first, last) token indexes of the logo div, closing tag included"""
+    return find_block(tokens, is_logo_tag)
+
+def logo_graphics(tokens):
+    """(first, last) token ranges of the <img> tags and <svg> blocks inside logo divs"""
+    ranges = []
+    i = 0
+    while i < len(tokens):
+        kind, text, *_ = tokens[i]
+        if kind == 'tag' and is_logo_container(text):
+            container_end = block_end(tokens, i)
+            i += 1
+            while i < container_end:
+                kind, text, *_ = tokens[i]
+                name = tag_name(text) if kind == 'tag' and not text.startswith('</') else ''
+                if name == 'img' or (name == 'svg' and text.endswith('/>')):
+                    ranges.append((i, i))
+                elif name == 'svg':
+                    ranges.append((i, block_end(tokens, i)))
+                    i = ranges[-1][1]
+                i += 1
+        i += 1
+    return ranges
+
+def insert_after_body(tokens, html):
+    """Insert markup on its own line right after <body>, returns False without one"""
+    for i, (kind, text, *_) in enumerate(tokens):
+        if kind == 'tag' and tag_name(text) == 'body' and not text.startswith('</'):
+            tokens[i + 1:i + 1] = [['text', '\n' + LOGO_INDENT]] + tokenize(html.strip())
+            return True
+    return False
+
+def stylesheets(tokens):
+    """Selector-indexed sheets of all <style> blocks, parsed once per file"""
+    sheets = []
+    for token in tokens:
+        if token[0] == 'css':
+            if token[2] is None:
+                token[2] = parse_stylesheet(token[1])
+            sheets.append(token[2])
+    return sheets
+
+def matching_rules(tokens, selector):
+    """(sheet, rule) pairs for the selector, found through the index"""
+    return [(sheet, rule) for sheet in stylesheets(tokens) for rule in find_rules(sheet, selector)]
+
+def apply_insert_css(tokens, patch):
+    """Append rules to the first <style> block unless the marker rule exists"""
+    blocks = [token for token in tokens if token[0] == 'css']
+    if not blocks or matching_rules(tokens, patch.get('marker', '.logo')):
+        return False
+    css = serialize_stylesheet(blocks[0][2])
+    end = len(css.rstrip())
+    blocks[0][1] = css[:end] + '\n\n' + patch['css'].strip('\n') + css[end:]
+    blocks[0][2] = None
+    return True
+
+def apply_insert_logo(tokens, patch):
+    """Insert the logo block right after <body> if the page has no logo div at all"""
+    if find_block(tokens, has_logo_class):
+        return False
+    return insert_after_body(tokens, patch['html'])
+
+def uses_symbol(tokens, symbol_id):
+    """True if some <use> references the symbol"""
+    href = '#' + symbol_id
+    return any(kind == 'tag' and tag_name(text) == 'use'
+               and href in (tag_attributes(text).get('href'), tag_attributes(text).get('xlink:href'))
+               for kind, text, *_ in tokens)
+
+def find_sprite(tokens, sprite_id):
+    """Token range of the sprite element, or None"""
+    return find_block(tokens, lambda text: tag_attributes(text).get('id') == sprite_id)
+
+def apply_insert_sprite(tokens, patch):
+    """Keep one up-to-date sprite (element with id patch['sprite_id']) after <body>
+
+    The sprite is only added to pages with a <use> of patch['symbol_id'].
+    """
+    block = find_sprite(tokens, patch['sprite_id'])
+    html = patch['html'].strip()
+    if not block:
+        return uses_symbol(tokens, patch['symbol_id']) and insert_after_body(tokens, html)
+    if serialize(tokens[block[0]:block[1] + 1]) == html:
+        return False
+    tokens[block[0]:block[1] + 1] = tokenize(html)
+    return True
+
+def apply_replace_logo(tokens, patch):
+    """Replace the logo block; the indentation before it is kept"""
+    block = find_logo_block(tokens)
+    html = patch['html'].strip()
+    if not block or serialize(tokens[block[0]:block[1] + 1]) == html:
+        return False
+    tokens[block[0]:block[1] + 1] = tokenize(html)
+    return True
+
+def apply_replace_logo_graphics(tokens, patch):
+    """Replace every logo graphic (<img> or <svg>) inside a logo div with patch['html']"""
+    html = patch['html'].strip()
+    changed = False
+    for first, last in reversed(logo_graphics(tokens)):
+        if serialize(tokens[first:last + 1]) != html:
+            tokens[first:last + 1] = tokenize(html)
+            changed = True
+    return changed
+
+def apply_remove_sprite(tokens, patch):
+    """Remove the sprite when no <use> references its symbol any more"""
+    block = find_sprite(tokens, patch['sprite_id'])
+    if not block or uses_symbol(tokens, patch['symbol_id']):
+        return False
+    first = block[0]
+    if first and tokens[first - 1][0] == 'text':
+        # Take the sprite's line along with it
+        text = tokens[first - 1][1]
+        line_start = text.rfind('\n')
+        if line_start >= 0 and not text[line_start:].strip():
+            tokens[first - 1][1] = text[:line_start]
+    del tokens[first:block[1] + 1]
+    return True
+
+def apply_indent_logo(tokens, patch):
+    """Set the indentation of the line holding the logo start tag"""
+    block = find_logo_block(tokens)
+    if not block or block[0] == 0 or tokens[block[0] - 1][0] != 'text':
+        return False
+    text = tokens[block[0] - 1][1]
+    line_start = text.rfind('\n') + 1
+    if text[line_start:].strip():
+        return False
+    new_text = text[:line_start] + patch['indent']
+    if new_text == text:
+        return False
+    tokens[block[0] - 1][1] = new_text
+    return True
+
+def apply_set_src(tokens, patch):
+    """Point <img> tags whose src matches one of the patterns at patch['src']"""
+    changed = False
+    for token in tokens:
+        kind, text, *_ = token
+        if kind != 'tag' or tag_name(text) != 'img':
+            continue
+        src = tag_attributes(text).get('src')
+        if src is None or src == patch['src']:
+            continue
+        if any(re.match(pattern, src) for pattern in patch['patterns']):
+            token[1] = text.replace(f'src="{src}"', f'src="{patch["src"]}"', 1)
+            changed = True
+    return changed
+
+def apply_rename_selector(tokens, patch):
+    """Rename one selector in every rule that lists it"""
+    rules = matching_rules(tokens, patch['old'])
+    for sheet, rule in rules:
+        rename_selector(sheet, rule, patch['old'], patch['new'])
+    return bool(rules)
+
+def apply_strip_rule(tokens, patch):
+    """Remove every rule whose selector list is exactly the selector"""
+    rules = [(sheet, rule) for sheet, rule in matching_rules(tokens, patch['selector'])
+             if rule['selectors'] == (patch['selector'],)]
+    for sheet, rule in rules:
+        remove_rule(sheet, rule)
+    return bool(rules)
+
+def apply_ensure_declaration(tokens, patch):
+    """Add 'property: value' as the first declaration where the property is missing"""
+    changed = False
+    for sheet, rule in matching_rules(tokens, patch['selector']):
+        if not has_declaration(rule, patch['property']):
+            prepend_declaration(sheet, rule, patch['property'], patch['value'])
+            changed = True
+    return changed
+
+def apply_remove_declaration(tokens, patch):
+    """Remove a property from the selector's rules"""
+    changed = False
+    for sheet, rule in matching_rules(tokens, patch['selector']):
+        changed |= remove_declaration(sheet, rule, patch['property'])
+    return changed
+
+PATCH_APPLIERS = {
+    'insert_css': apply_insert_css,
+    'insert_logo': apply_insert_logo,
+    'insert_sprite': apply_insert_sprite,
+    'remove_sprite': apply_remove_sprite,
+    'replace_logo': apply_replace_logo,
+    'replace_logo_graphics': apply_replace_logo_graphics,
+    'indent_logo': apply_indent_logo,
+    'set_src': apply_set_src,
+    'rename_selector': apply_rename_selector,
+    'strip_rule': apply_strip_rule,
+    'ensure_declaration': apply_ensure_declaration,
+    'remove_declaration': apply_remove_declaration,
+}
+
+def validate_patches(patches):
+    """Raise ValueError for unknown patch types before any file is read"""
+    for index, patch in enumerate(patches, 1):
+        if patch.get('type') not in PATCH_APPLIERS:
+            raise ValueError(f"תיקון {index}: סוג לא מוכר {patch.get('type')!r}")
+    return patches
+
+def apply_patches(content, patches):
+    """Apply the patches in order to HTML text, returns (new_content, applied ids)"""
+    tokens = tokenize(content)
+    applied = [patch.get('id') or patch['type'] for patch in patches
+               if PATCH_APPLIERS[patch['type']](tokens, patch)]
+    return (serialize(tokens) if applied else content), applied
+
+def noop_patches(content, patches):
+    """Indexes of the patches that leave the content unchanged, each run on its own
+
+    Patches need not commute (a sprite inserted by one list is removed by
+    another), so being last in a pass does not make a patch a no-op.
+    """
+    noop = []
+    tokens = tokenize(content)
+    for index, patch in enumerate(patches):
+        if PATCH_APPLIERS[patch['type']](tokens, patch):
+            tokens = tokenize(content)
+        else:
+            noop.append(index)
+    return noop
+
+def write_atomic(file_path, content):
+    """Write through a temp file in the same directory and rename over the original"""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+        shutil.copymode(file_path, tmp_path)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def _patch_file(file_path, patches, dry_run=False, skip_hash=None):
+    """Patch one file, returns (applied ids, ledger state, indexes of no-op patches)
+
+    skip_hash is the hash of content the ledger already saw these patches
+    leave alone; such a file is not tokenized. The no-op patches are the ones
+    confirmed to leave the file as it is now.
+    """
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    digest = content_hash(data)
+    every_patch = list(range(len(patches)))
+    if digest == skip_hash:
+        return [], file_state(file_path, digest), every_patch
+    new_content, applied = apply_patches(data.decode('utf-8'), patches)
+    if not applied:
+        return [], file_state(file_path, digest), every_patch
+    if dry_run:
+        return applied, file_state(file_path, digest), []
+    write_atomic(file_path, new_content)
+    digest = content_hash(new_content.encode('utf-8'))
+    return applied, file_state(file_path, digest), noop_patches(new_content, patches)
+
+def patch_file(file_path, patches, dry_run=False):
+    """Patch one file, returns the ids of the patches that changed it
+
+    The file is written once, and only when the list is not empty.
+    """
+    return _patch_file(file_path, patches, dry_run)[0]
+
+def _patch_file_result(file_path, patches, dry_run, skip_hash):
+    """Worker wrapper: errors are returned so one bad file doesn't stop the rest"""
+    try:
+        applied, state, noop = _patch_file(file_path, patches, dry_run, skip_hash)
+        return applied, None, state, noop
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}", None, None
+
+def patch_files(file_paths, patches, workers=None, dry_run=False, use_ledger=True):
+    """Patch files in parallel, returns {path: (applied ids, error)} in input order
+
+    With the ledger, files recorded as already patched are skipped after a
+    single stat and never reach the workers.
+    """
+    validate_patches(patches)
+    file_paths = list(file_paths)
+    versions = patch_versions(patches)
+    ledger = load_ledger() if use_ledger else {}
+    results = {}
+    pending = []
+    for path in file_paths:
+        entry = None
+        if use_ledger:
+            entry = ledger.get(ledger_key(path))
+            try:
+                if is_current(entry, os.stat(path), versions):
+                    results[path] = ([], None)
+                    continue
+            except OSError:
+                pass
+        pending.append((path, entry))
+    
+    workers = min(workers or os.cpu_count() or 1, len(pending))
+    jobs = [(path, patches, dry_run, known_hash(entry, versions)) for path, entry in pending]
+    if workers <= 1:
+        outcomes = [_patch_file_result(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(_patch_file_result, *zip(*jobs)))
+    
+    touched = False
+    for (path, entry), (applied, error, state, noop) in zip(pending, outcomes):
+        results[path] = (applied, error)
+        if use_ledger and state and not dry_run:
+            verified = patch_versions([patches[index] for index in noop])
+            ledger[ledger_key(path)] = ledger_entry(entry, state, verified)
+            touched = True
+    if touched:
+        save_ledger(ledger)
+    return {path: results[path] for path in file_paths}
+
+def report(results):
+    """Print one line per file in the style of the old fixer scripts"""
+    for path, (applied, error) in results.items():
+        if error:
+            print(f"  שגיאה ב-{path}: {error}")
+        elif applied:
+            print(f"✓ עודכן {path} ({', '.join(applied)})")
+        else:
+            print(f"  {path} כבר תקין")
+
+def main():
+    parser = argparse.ArgumentParser(description="החלת תיקוני לוגו ו-CSS על קבצי HTML במעבר אחד")
+    parser.add_argument('files', nargs='*', default=HTML_FILES, help="קבצי HTML")
+    parser.add_argument('--workers', type=int, help="מספר תהליכים")
+    parser.add_argument('--dry-run', action='store_true', help="הצגת התיקונים בלי לכתוב")
+    parser.add_argument('--no-ledger', action='store_true', help="קריאת כל הקבצים בלי יומן התיקונים")
+    args = parser.parse_args()
+    
+    print("מחיל תיקוני לוגו על קבצי ה-HTML...")
+    report(patch_files(args.files, LOGO_PATCHES, args.workers, args.dry_run,
+                       use_ledger=not args.no_ledger))
+    print("\n✓ הושלם!")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"שגיאה: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sidecar ledger of HTML files already patched by html_patch_engine
+One .html_patch_ledger.json next to the scripts records, per file, the size,
+mtime, content hash and the patches (id and version) the file is known to be
+a fixed point of. A patch is only recorded after it was run on its own against
+that exact content and changed nothing. A file whose stat still matches and
+whose entry covers every requested patch is skipped without being opened. If
+only the mtime moved (touch, checkout) the hash is compared before the file is
+tokenized again.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+LEDGER_FILE = ".html_patch_ledger.json"
+LEDGER_DIR = os.path.dirname(os.path.abspath(__file__))
+LEDGER_FORMAT = 1
+
+def patch_version(patch):
+    """Content fingerprint of a patch; editing a patch gives it a new version"""
+    data = json.dumps(patch, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(data).hexdigest()[:16]
+
+def patch_versions(patches):
+    """{version: id} for a patch list"""
+    return {patch_version(patch): patch.get('id') or patch['type'] for patch in patches}
+
+def content_hash(data):
+    """sha256 of file bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+def file_state(file_path, digest):
+    """Size, mtime and hash of a file as stored in the ledger"""
+    st = os.stat(file_path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': digest}
+
+def ledger_key(file_path):
+    """Ledger key of a file: its path relative to the ledger directory"""
+    return os.path.relpath(os.path.abspath(file_path), LEDGER_DIR)
+
+def load_ledger():
+    """{file key: entry}; a missing or foreign ledger is empty"""
+    try:
+        with open(os.path.join(LEDGER_DIR, LEDGER_FILE), 'r', encoding='utf-8') as f:
+            ledger = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if ledger.get('format') != LEDGER_FORMAT:
+        return {}
+    return ledger.get('files', {})
+
+def save_ledger(files):
+    """Write the ledger atomically"""
+    fd, tmp_path = tempfile.mkstemp(dir=LEDGER_DIR, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'format': LEDGER_FORMAT, 'files': files}, f,
+                      ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, os.path.join(LEDGER_DIR, LEDGER_FILE))
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def covers(entry, versions):
+    """True if the entry records every patch version"""
+    return entry is not None and versions.keys() <= entry.get('patches', {}).keys()
+
+def is_current(entry, stat_result, versions):
+    """The single-stat check: same size and mtime, all patches recorded"""
+    return (covers(entry, versions)
+            and entry['size'] == stat_result.st_size
+            and entry['mtime_ns'] == stat_result.st_mtime_ns)
+
+def known_hash(entry, versions):
+    """Hash of content already known to be unchanged by these patches, or None"""
+    return entry['sha256'] if covers(entry, versions) else None
+
+def ledger_entry(entry, state, verified):
+    """New ledger entry after running the patches on a file
+
+    verified ({version: id}) are the patches confirmed to leave the file's
+    current content unchanged; versions recorded earlier for the same content
+    are kept.
+    """
+    patches = {}
+    if entry is not None and entry.get('sha256') == state['sha256']:
+        patches.update(entry.get('patches', {}))
+    patches.update(verified)
+    return dict(state, patches=patches)
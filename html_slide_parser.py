@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming slide tokenizer for the generated HTML presentations
+One linear pass over the file with html.parser - no nested DOTALL regexes
+"""
+
+import re
+from html.parser import HTMLParser
+
+SLIDE_ID_PATTERN = re.compile(r'slide(\d+)$')
+
+# Read size when streaming a file into the parser
+CHUNK_SIZE = 64 * 1024
+
+def normalize_text(parts):
+    """Join text fragments and collapse whitespace"""
+    return ' '.join(''.join(parts).split())
+
+class SlideHTMLParser(HTMLParser):
+    """Collect slide records while the HTML is fed in
+
+    A slide is a <div> whose class list contains "slide" and whose id is
+    "slide<N>". Its title is the first <h1 class="slide-title"> and its
+    paragraphs are the <p> elements inside <div class="slide-body">; when a
+    slide has no body paragraphs, every <p> in the slide is used instead.
+    Nested <div>s are tracked on a stack, so inner closing tags never end
+    the slide early.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.slides = []
+        self._div_stack = []
+        self._slide = None
+        self._body_depth = 0
+        self._capture = None
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'div':
+            attrs = dict(attrs)
+            classes = (attrs.get('class') or '').split()
+            role = None
+            slide_id = SLIDE_ID_PATTERN.match(attrs.get('id') or '')
+            if self._slide is None and 'slide' in classes and slide_id:
+                role = 'slide'
+                self._slide = {
+                    'number': int(slide_id.group(1)),
+                    'title': '',
+                    'body': [],
+                    'other': [],
+                }
+            elif self._slide is not None and 'slide-body' in classes:
+                role = 'body'
+                self._body_depth += 1
+            self._div_stack.append(role)
+        elif self._slide is not None and self._capture is None:
+            if tag == 'h1' and not self._slide['title']:
+                classes = (dict(attrs).get('class') or '').split()
+                if 'slide-title' in classes:
+                    self._capture = 'h1'
+                    self._text = []
+            elif tag == 'p':
+                self._capture = 'p'
+                self._text = []
+        elif self._capture == 'p' and tag == 'p':
+            # Implicitly closed paragraph
+            self._end_capture()
+            self._capture = 'p'
+            self._text = []
+
+    def handle_endtag(self, tag):
+        if tag == self._capture:
+            self._end_capture()
+        elif tag == 'div' and self._div_stack:
+            if self._capture == 'p':
+                self._end_capture()
+            role = self._div_stack.pop()
+            if role == 'body':
+                self._body_depth -= 1
+            elif role == 'slide':
+                self._end_slide()
+
+    def handle_data(self, data):
+        if self._capture is not None:
+            self._text.append(data)
+
+    def _end_capture(self):
+        text = normalize_text(self._text)
+        if self._capture == 'h1':
+            self._slide['title'] = text
+        elif text:
+            target = 'body' if self._body_depth else 'other'
+            self._slide[target].append(text)
+        self._capture = None
+        self._text = []
+
+    def _end_slide(self):
+        slide = self._slide
+        self.slides.append({
+            'number': slide['number'],
+            'title': slide['title'],
+            'paragraphs': slide['body'] or slide['other'],
+        })
+        self._slide = None
+        self._body_depth = 0
+
+def parse_html_string(content):
+    """Parse slide records from an HTML string"""
+    parser = SlideHTMLParser()
+    parser.feed(content)
+    parser.close()
+    return parser.slides
+
+def parse_html_slides(html_file):
+    """Parse HTML file and extract slide content"""
+    parser = SlideHTMLParser()
+    with open(html_file, 'r', encoding='utf-8') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), ''):
+            parser.feed(chunk)
+    parser.close()
+    return parser.slides
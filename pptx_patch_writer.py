@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Patch writer for existing decks
+Only the XML parts that were modified are serialized again; every other zip
+member (media, fonts, untouched XML) is copied byte-for-byte, without being
+decompressed or recompressed.
+"""
+
+import os
+import shutil
+import struct
+import zipfile
+import posixpath
+
+from lxml import etree
+from pptx.opc.oxml import serialize_part_xml
+from pptx.oxml import parse_xml
+
+NS = {
+    'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
+    'p': 'http://schemas.openxmlformats.org/presentationml/2006/main',
+    'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships',
+    'rel': 'http://schemas.openxmlformats.org/package/2006/relationships',
+}
+
+# Local file header: signature ... name length, extra length (APPNOTE 4.3.7)
+LOCAL_HEADER = struct.Struct('<4s2B4HL2L2H')
+DATA_DESCRIPTOR_SIGNATURE = b'PK\x07\x08'
+
+# Top-level text shapes, the same runs python-pptx's slide.shapes exposes
+TEXT_RUN_PATH = './p:cSld/p:spTree/p:sp/p:txBody/a:p/a:r'
+
+def slide_part_names(package):
+    """Zip member names of the slides, in presentation order"""
+    presentation = etree.fromstring(package.read('ppt/presentation.xml'))
+    rels = etree.fromstring(package.read('ppt/_rels/presentation.xml.rels'))
+    targets = {rel.get('Id'): rel.get('Target') for rel in rels.iterfind('rel:Relationship', NS)}
+    names = []
+    for sld_id in presentation.iterfind('p:sldIdLst/p:sldId', NS):
+        target = targets[sld_id.get(f'{{{NS["r"]}}}id')]
+        if target.startswith('/'):
+            names.append(target.lstrip('/'))
+        else:
+            names.append(posixpath.normpath(posixpath.join('ppt', target)))
+    return names
+
+def read_part_xml(package, name):
+    """Parse one zip member with the python-pptx element classes"""
+    return parse_xml(package.read(name))
+
+def serialize_xml(element):
+    """Part bytes for a modified element, as python-pptx writes them"""
+    return serialize_part_xml(element)
+
+def text_runs(slide):
+    """<a:r> elements of the slide's text shapes, in document order"""
+    return slide.iterfind(TEXT_RUN_PATH, NS)
+
+def run_text(run):
+    """Text of an <a:r>"""
+    t = run.find('a:t', NS)
+    return (t.text or '') if t is not None else ''
+
+def set_run_text(run, text):
+    """Replace the text of an <a:r>"""
+    run.find('a:t', NS).text = text
+
+def copy_member_raw(source, output, info):
+    """Append a member of source to output without touching its compressed data"""
+    source_fp = source.fp
+    source_fp.seek(info.header_offset)
+    header = source_fp.read(LOCAL_HEADER.size)
+    fields = LOCAL_HEADER.unpack(header)
+    header += source_fp.read(fields[-2] + fields[-1])
+    data_length = info.compress_size
+    if info.flag_bits & 0x08:
+        # Sizes live in a data descriptor after the data
+        source_fp.seek(info.header_offset + len(header) + data_length)
+        signature = source_fp.read(4)
+        descriptor = 16 if signature == DATA_DESCRIPTOR_SIGNATURE else 12
+        if info.compress_size > 0xFFFFFFFF or info.file_size > 0xFFFFFFFF:
+            descriptor += 8
+        data_length += descriptor
+        source_fp.seek(info.header_offset + len(header))
+    
+    output_fp = output.fp
+    copied = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+    for attribute in ('compress_type', 'comment', 'extra', 'create_system', 'create_version',
+                      'extract_version', 'flag_bits', 'volume', 'internal_attr',
+                      'external_attr', 'CRC', 'compress_size', 'file_size'):
+        setattr(copied, attribute, getattr(info, attribute))
+    copied.header_offset = output_fp.tell()
+    output_fp.write(header)
+    remaining = data_length
+    while remaining:
+        chunk = source_fp.read(min(remaining, 1024 * 1024))
+        if not chunk:
+            raise zipfile.BadZipFile(f'חבר חתוך בארכיון: {info.filename}')
+        output_fp.write(chunk)
+        remaining -= len(chunk)
+    output.filelist.append(copied)
+    output.NameToInfo[copied.filename] = copied
+    output.start_dir = output_fp.tell()
+
+def write_patched_package(input_file, output_file, patches):
+    """Write input_file to output_file with the parts in patches replaced
+
+    patches maps zip member names to new bytes. Members keep their original
+    order; the result is written to a temporary file and renamed into place.
+    """
+    if not patches:
+        if os.path.abspath(input_file) != os.path.abspath(output_file):
+            shutil.copyfile(input_file, output_file)
+        return
+    
+    tmp_file = f'{output_file}.tmp'
+    try:
+        with zipfile.ZipFile(input_file) as source, zipfile.ZipFile(tmp_file, 'w') as output:
+            missing = set(patches) - set(source.namelist())
+            if missing:
+                raise KeyError(f'חלקים שאינם קיימים במצגת: {sorted(missing)}')
+            for info in source.infolist():
+                if info.filename in patches:
+                    patched = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+                    patched.compress_type = zipfile.ZIP_DEFLATED
+                    patched.external_attr = info.external_attr
+                    output.writestr(patched, patches[info.filename])
+                else:
+                    copy_member_raw(source, output, info)
+        os.replace(tmp_file, output_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+def save_presentation(prs, input_file, output_file):
+    """Save a python-pptx Presentation loaded from input_file as a patch
+
+    XML parts and relationships whose serialization differs from the
+    original are written; everything else is copied raw. When parts were
+    added or removed the package layout changed, so this falls back to
+    prs.save(). Returns the list of rewritten member names.
+    """
+    with zipfile.ZipFile(input_file) as source:
+        members = set(source.namelist())
+        patches = {}
+        for part in prs.part.package.iter_parts():
+            name = part.partname.lstrip('/')
+            if name not in members:
+                prs.save(output_file)
+                return None
+            if hasattr(part, '_element'):
+                original = serialize_part_xml(parse_xml(source.read(name)))
+                if part.blob != original:
+                    patches[name] = part.blob
+            rels_name = part.partname.rels_uri.lstrip('/')
+            rels_xml = part.rels.xml
+            if rels_name in members:
+                original = serialize_part_xml(parse_xml(source.read(rels_name)))
+                if rels_xml != original:
+                    patches[rels_name] = rels_xml
+            elif len(part.rels):
+                prs.save(output_file)
+                return None
+    write_patched_package(input_file, output_file, patches)
+    return sorted(patches)
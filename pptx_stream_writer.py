@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming OOXML writer for generated decks
+Slide parts are written straight into the output ZipFile as they are produced,
+so memory stays constant per slide. The package skeleton (master, layouts,
+theme, properties) comes from a python-pptx blank presentation built once.
+"""
+
+import hashlib
+import io
+import os
+import re
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+from lxml import etree
+from pptx import Presentation
+from pptx.util import Inches
+
+BLANK_LAYOUT_INDEX = 6
+
+# Fixed zip timestamp so the same input always produces the same bytes
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+P_NS = 'http://schemas.openxmlformats.org/presentationml/2006/main'
+R_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+RELS_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+CT_NS = 'http://schemas.openxmlformats.org/package/2006/content-types'
+
+SLIDE_RELTYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/slide'
+LAYOUT_RELTYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/slideLayout'
+IMAGE_RELTYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/image'
+SLIDE_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.presentationml.slide+xml'
+
+# Media extensions the writer can add default content types for
+MEDIA_CONTENT_TYPES = {
+    'png': 'image/png',
+    'jpeg': 'image/jpeg',
+    'jpg': 'image/jpeg',
+    'gif': 'image/gif',
+    'svg': 'image/svg+xml',
+}
+
+XML_DECLARATION = b"<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n"
+
+# First id python-pptx / PowerPoint use for p:sldId
+FIRST_SLIDE_ID = 256
+
+# Parts rewritten at the end with the final slide list
+DEFERRED_PARTS = (
+    '[Content_Types].xml',
+    'ppt/presentation.xml',
+    'ppt/_rels/presentation.xml.rels',
+    'docProps/app.xml',
+)
+
+@lru_cache(maxsize=None)
+def build_template_package(slide_width=Inches(10), slide_height=Inches(7.5)):
+    """Blank presentation package as (parts, blank layout target)
+
+    parts is a tuple of (name, bytes) in package order.
+    """
+    prs = Presentation()
+    prs.slide_width = slide_width
+    prs.slide_height = slide_height
+    layout_partname = prs.slide_layouts[BLANK_LAYOUT_INDEX].part.partname
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    with zipfile.ZipFile(buffer) as package:
+        parts = tuple((info.filename, package.read(info.filename)) for info in package.infolist())
+    # slide rels live in ppt/slides/_rels, the layout target is relative to ppt/slides
+    layout_target = '../' + layout_partname.split('/ppt/', 1)[1]
+    return parts, layout_target
+
+def slide_rels_xml(layout_target, media_targets=()):
+    """Relationships of a generated slide
+
+    rId1 is always the layout; media parts follow as rId2, rId3... in the
+    order the slide lists them, so slide XML can reference them up front.
+    """
+    rels = [f'<Relationship Id="rId1" Type="{LAYOUT_RELTYPE}" Target="{escape(layout_target)}"/>']
+    for index, target in enumerate(media_targets):
+        rels.append(f'<Relationship Id="rId{index + 2}" Type="{IMAGE_RELTYPE}" '
+                    f'Target="{escape(target)}"/>')
+    return (XML_DECLARATION +
+            f'<Relationships xmlns="{RELS_NS}">{"".join(rels)}</Relationships>'.encode('utf-8'))
+
+def _write_part(package, name, data):
+    """Deflated zip member with a fixed timestamp"""
+    info = zipfile.ZipInfo(name, date_time=ZIP_DATE_TIME)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    package.writestr(info, data)
+
+def _finish_presentation_xml(data, slide_rids):
+    """Add p:sldIdLst with one p:sldId per slide"""
+    root = etree.fromstring(data)
+    for old in root.findall(f'{{{P_NS}}}sldIdLst'):
+        root.remove(old)
+    sld_id_lst = etree.Element(f'{{{P_NS}}}sldIdLst')
+    for index, rid in enumerate(slide_rids):
+        sld_id = etree.SubElement(sld_id_lst, f'{{{P_NS}}}sldId')
+        sld_id.set('id', str(FIRST_SLIDE_ID + index))
+        sld_id.set(f'{{{R_NS}}}id', rid)
+    # sldIdLst comes after the master/notes/handout id lists
+    anchor = root.find(f'{{{P_NS}}}sldSz')
+    anchor.addprevious(sld_id_lst)
+    return etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+def _finish_presentation_rels(data, slide_count):
+    """Add one slide relationship per slide, with rIds after the template's"""
+    root = etree.fromstring(data)
+    used = [int(m.group(1)) for rel in root
+            for m in [re.match(r'rId(\d+)$', rel.get('Id', ''))] if m]
+    first = max(used, default=0) + 1
+    slide_rids = []
+    for index in range(slide_count):
+        rid = f'rId{first + index}'
+        rel = etree.SubElement(root, f'{{{RELS_NS}}}Relationship')
+        rel.set('Id', rid)
+        rel.set('Type', SLIDE_RELTYPE)
+        rel.set('Target', f'slides/slide{index + 1}.xml')
+        slide_rids.append(rid)
+    return etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True), slide_rids
+
+def _finish_content_types(data, slide_count, media_extensions=()):
+    """Add a content-type override per slide part and defaults for media"""
+    root = etree.fromstring(data)
+    defaults = root.findall(f'{{{CT_NS}}}Default')
+    known = {node.get('Extension') for node in defaults}
+    # Defaults go before the overrides
+    position = root.index(defaults[-1]) + 1 if defaults else 0
+    for extension in sorted(set(media_extensions) - known):
+        default = etree.Element(f'{{{CT_NS}}}Default')
+        default.set('Extension', extension)
+        default.set('ContentType', MEDIA_CONTENT_TYPES[extension])
+        root.insert(position, default)
+        position += 1
+    for index in range(slide_count):
+        override = etree.SubElement(root, f'{{{CT_NS}}}Override')
+        override.set('PartName', f'/ppt/slides/slide{index + 1}.xml')
+        override.set('ContentType', SLIDE_CONTENT_TYPE)
+    return etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+def _finish_app_xml(data, slide_count):
+    """Slide count in the extended properties"""
+    return re.sub(rb'<Slides>\d+</Slides>', f'<Slides>{slide_count}</Slides>'.encode(), data, count=1)
+
+@contextmanager
+def stream_presentation(output_file, slide_width=Inches(10), slide_height=Inches(7.5)):
+    """Open a streaming package and yield write_slide(slide_xml, media=())
+
+    Slides are numbered in the order they are written. media is a sequence of
+    (extension, bytes); identical media is stored once and parts are named
+    image1, image2... in order of first use, so the same slides always give
+    the same package. The output is written to a temporary file and renamed
+    into place only when the block completes.
+    """
+    parts, layout_target = build_template_package(slide_width, slide_height)
+    deferred = {name: data for name, data in parts if name in DEFERRED_PARTS}
+    layout_rels = slide_rels_xml(layout_target)
+    tmp_file = f'{output_file}.tmp'
+    slide_count = 0
+    media_parts = {}
+    
+    try:
+        with zipfile.ZipFile(tmp_file, 'w') as package:
+            # Template parts that do not depend on the slide count; [Content_Types].xml,
+            # presentation.xml, its rels and app.xml are deferred and written last
+            for name, data in parts:
+                if name not in DEFERRED_PARTS:
+                    _write_part(package, name, data)
+            
+            def write_slide(slide_xml, media=()):
+                nonlocal slide_count
+                slide_count += 1
+                targets = []
+                for extension, data in media:
+                    key = (extension, hashlib.sha256(data).digest())
+                    if key not in media_parts:
+                        media_parts[key] = f'image{len(media_parts) + 1}.{extension}'
+                        _write_part(package, f'ppt/media/{media_parts[key]}', data)
+                    targets.append(f'../media/{media_parts[key]}')
+                rels = slide_rels_xml(layout_target, targets) if targets else layout_rels
+                _write_part(package, f'ppt/slides/slide{slide_count}.xml', slide_xml)
+                _write_part(package, f'ppt/slides/_rels/slide{slide_count}.xml.rels', rels)
+                return slide_count
+            
+            yield write_slide
+            
+            rels, slide_rids = _finish_presentation_rels(
+                deferred['ppt/_rels/presentation.xml.rels'], slide_count)
+            _write_part(package, 'ppt/presentation.xml',
+                        _finish_presentation_xml(deferred['ppt/presentation.xml'], slide_rids))
+            _write_part(package, 'ppt/_rels/presentation.xml.rels', rels)
+            _write_part(package, '[Content_Types].xml',
+                        _finish_content_types(deferred['[Content_Types].xml'], slide_count,
+                                              [extension for extension, _ in media_parts]))
+            _write_part(package, 'docProps/app.xml',
+                        _finish_app_xml(deferred['docProps/app.xml'], slide_count))
+        os.replace(tmp_file, output_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+def write_slides_parallel(write_slide, build_slides, chunks, args=(), workers=None):
+    """Build slide chunks in worker processes and write them in order
+
+    build_slides(chunk, *args) must be a module-level function returning a
+    list of (slide_xml, media) tuples. Workers only serialize XML; this
+    process is the single writer, so numbering, rIds and media names are the
+    same as a serial run. At most two chunks per worker are in flight, which
+    keeps memory bounded for long decks.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = iter(chunks)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(build_slides, chunk, *args))
+            if len(pending) >= workers * 2:
+                break
+        while pending:
+            for slide_xml, media in pending.popleft().result():
+                write_slide(slide_xml, media)
+            for chunk in chunks:
+                pending.append(executor.submit(build_slides, chunk, *args))
+                break
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Prebuilt paragraph/run XML templates for bulk slide creation
+Each distinct (font, size, bold, color, rtl, spacing) style is built once as
+an lxml <a:p> template and deep-copied per paragraph, instead of styling every
+run through python-pptx setters.
+"""
+
+import copy
+from functools import lru_cache
+from xml.sax.saxutils import escape, quoteattr
+
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls
+
+# Paragraphs starting with these are styled as sub-titles
+EMOJI_STARTERS = ('📚', '🤖', '💬', '📊', '📖', '🔍', '❌', '✅', '💡', '🎯', '📈')
+
+@lru_cache(maxsize=None)
+def paragraph_markup(font='Arial Hebrew', size=None, bold=False, color=None, rtl=True,
+                     align='r', space_after=None, line_spacing=None):
+    """Build (once per style) the <a:p> markup around the run text
+
+    Returns (head, tail): head ends with the opening <a:t> and tail starts
+    with its closing tag. size and space_after are in points, color is an RGBColor or 'RRGGBB'
+    string and line_spacing is a multiple (1.3 = 130%).
+    """
+    pPr_attrs = ''
+    if align:
+        pPr_attrs += f' algn="{align}"'
+    if rtl:
+        pPr_attrs += ' rtl="1"'
+    pPr_children = ''
+    if line_spacing is not None:
+        pPr_children += f'<a:lnSpc><a:spcPct val="{int(round(line_spacing * 100000))}"/></a:lnSpc>'
+    if space_after is not None:
+        pPr_children += f'<a:spcAft><a:spcPts val="{int(round(space_after * 100))}"/></a:spcAft>'
+    
+    rPr_attrs = ''
+    if size is not None:
+        rPr_attrs += f' sz="{int(round(size * 100))}"'
+    if bold:
+        rPr_attrs += ' b="1"'
+    rPr_children = ''
+    if color is not None:
+        rPr_children += f'<a:solidFill><a:srgbClr val="{color}"/></a:solidFill>'
+    if font:
+        rPr_children += f'<a:latin typeface={quoteattr(font)}/>'
+    
+    head = (f'<a:p><a:pPr{pPr_attrs}>{pPr_children}</a:pPr>'
+            f'<a:r><a:rPr{rPr_attrs}>{rPr_children}</a:rPr><a:t>')
+    return head, '</a:t></a:r></a:p>'
+
+@lru_cache(maxsize=None)
+def paragraph_template(**style):
+    """Build (once per style) an <a:p> element with pPr and a single styled run"""
+    head, tail = paragraph_markup(**style)
+    # parse_xml gives python-pptx element classes, so copies stay usable
+    # through the normal python-pptx API afterwards
+    return parse_xml(head.replace('<a:p>', f'<a:p {nsdecls("a")}>', 1) + tail)
+
+def styled_paragraph(text, **style):
+    """Deep copy of the cached template for this style, with the text set"""
+    p = copy.deepcopy(paragraph_template(**style))
+    p[-1][-1].text = text
+    return p
+
+def append_paragraph(txBody, text, **style):
+    """Append a styled paragraph to a python-pptx <p:txBody>"""
+    p = styled_paragraph(text, **style)
+    txBody.append(p)
+    return p
+
+def paragraph_xml(text, **style):
+    """Serialized styled paragraph for writers that emit slide XML directly
+
+    The a: prefix must be declared by the enclosing document.
+    """
+    head, tail = paragraph_markup(**style)
+    return head + escape(text) + tail
+
+def is_title_paragraph(para_text):
+    """Paragraphs styled as sub-titles inside the body"""
+    return (para_text.startswith(EMOJI_STARTERS)
+            or (len(para_text) < 50 and ':' in para_text)
+            or para_text.endswith('%'))
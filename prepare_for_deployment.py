@@ -3,53 +3,548 @@
 """
 סקריפט להכנת הקבצים לפרסום
 יוצר תיקייה עם כל הקבצים הנדרשים לפרסום
+כולל Service Worker ומניפסט precache לעבודה ללא חיבור (נמל / אונייה)
+קבצים קבועים (MP3, לוגו) מקבלים שם עם hash תוכן לשמירה ארוכה במטמון
+קבצי טקסט נדחסים מראש (gzip, ו-brotli אם מותקן) לשרת המקומי בקיוסק
+הגופן העברי נחתך לתווים שבמצגת (font_subset); בלי fontTools או בלי קבצי
+הגופן - גופני המערכת, כמו --skip-fonts (--require-fonts הופך זאת לשגיאה)
+רק ה-CSS של השקופית הראשונה נשאר inline, השאר נטען ברקע (critical_css)
+הסנכרון ל-deploy הוא אינקרמנטלי - נכתבים רק קבצים שה-hash שלהם השתנה,
+והעץ החדש מוחלף בתיקייה הקיימת בפעולת rename אחת
 """
 
 import os
+import re
+import sys
+import gzip
+import fcntl
 import shutil
+import hashlib
+import json
+import ctypes
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, unquote
 
-def prepare_deployment():
-    """הכנת קבצים לפרסום"""
+from critical_css import split_critical_css, summary_lines
+from font_subset import apply_font_faces, build_font_subsets, font_sources_problem
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# קבצי ה-Service Worker וה-precache
+SERVICE_WORKER_FILE = "sw.js"
+PRECACHE_MANIFEST_FILE = "precache-manifest.json"
+
+# קובץ כותרות HTTP (פורמט Netlify / Cloudflare Pages)
+HEADERS_FILE = "_headers"
+
+# קבצים שלא נכנסים ל-precache
+PRECACHE_EXCLUDE = ("README.md", SERVICE_WORKER_FILE, PRECACHE_MANIFEST_FILE, HEADERS_FILE)
+
+# תיקיית מטמון לבנייה (מחוץ ל-deploy, נשמרת בין הרצות)
+BUILD_CACHE_DIR = ".deploy_cache"
+
+# מניפסט הסנכרון: (path, size, hash, mtime) לכל קובץ ב-deploy
+DEPLOY_MANIFEST_FILE = os.path.join(BUILD_CACHE_DIR, "deploy-manifest.json")
+
+# ioctl FICLONE (Linux) - העתקת reflink במערכות קבצים שתומכות (btrfs, xfs)
+FICLONE = 0x40049409
+
+# renameat2 (Linux) - החלפה אטומית של שתי תיקיות
+AT_FDCWD = -100
+RENAME_EXCHANGE = 2
+
+# העץ החדש נבנה כאן (לצד deploy, באותה מערכת קבצים) ומוחלף בפעולה אחת
+STAGING_SUFFIX = ".staging"
+
+# קבצי טקסט שנדחסים מראש, וסיומות הגרסאות הדחוסות
+COMPRESSIBLE_EXTENSIONS = (".html", ".js", ".json", ".css", ".svg")
+PRECOMPRESSED_SUFFIXES = (".gz", ".br")
+
+# קובץ המצגת (נשמר בשמו המקורי ונבדק מחדש בכל טעינה)
+HTML_SOURCE = "presentation_v2.html"
+
+# קבצים קבועים - מקבלים שם עם hash (name.<hash>.ext)
+IMMUTABLE_ASSETS = [
+    "בוט הנמל החכם.mp3",
+    "asdod_port_logo_official.png"
+]
+
+# גופנים חתוכים לפי קבוצת הגליפים (נשמרים בין הרצות)
+FONT_CACHE_DIR = os.path.join(BUILD_CACHE_DIR, "fonts")
+
+# אורך ה-hash בשם הקובץ
+ASSET_HASH_LENGTH = 10
+
+CACHE_CONTROL_IMMUTABLE = "public, max-age=31536000, immutable"
+CACHE_CONTROL_REVALIDATE = "no-cache"
+
+# הפניות לקבצים בתוך ה-HTML: src="..." / href="..." / url(...)
+ASSET_REFERENCE_PATTERN = re.compile(
+    r'(?P<prefix>\b(?:src|href)\s*=\s*(?P<quote>["\'])|url\(\s*(?P<css_quote>["\']?))'
+    r'(?P<url>[^"\'()]+)'
+)
+
+SW_REGISTRATION_SNIPPET = """
+    <script>
+        // Service Worker - הצגה ללא חיבור לרשת
+        if ('serviceWorker' in navigator) {
+            window.addEventListener('load', () => {
+                navigator.serviceWorker.register('sw.js').catch(() => {});
+            });
+        }
+    </script>
+"""
+
+SERVICE_WORKER_TEMPLATE = """// נוצר אוטומטית ע"י prepare_for_deployment.py - אין לערוך ידנית
+// כל קובץ נשמר במטמון לפי ה-hash שלו, כך שבטעינה חוזרת הכל מוגש מהמטמון
+// ובעדכון המצגת נטענים מהרשת רק הקבצים שהשתנו.
+const PRECACHE = 'ashdod-deck-precache';
+const MANIFEST = __MANIFEST__;
+
+const scopeUrl = new URL(self.registration.scope);
+
+function assetUrl(path) {
+    return new URL(path.split('/').map(encodeURIComponent).join('/'), scopeUrl).href;
+}
+
+function cacheKey(path) {
+    return assetUrl(path) + '?__rev=' + MANIFEST[path];
+}
+
+self.addEventListener('install', (event) => {
+    event.waitUntil((async () => {
+        const cache = await caches.open(PRECACHE);
+        await Promise.all(Object.keys(MANIFEST).map(async (path) => {
+            const key = cacheKey(path);
+            if (await cache.match(key)) {
+                return;
+            }
+            const response = await fetch(assetUrl(path), { cache: 'reload' });
+            if (!response.ok) {
+                throw new Error('precache failed: ' + path);
+            }
+            await cache.put(key, response);
+        }));
+        await self.skipWaiting();
+    })());
+});
+
+self.addEventListener('activate', (event) => {
+    event.waitUntil((async () => {
+        const cache = await caches.open(PRECACHE);
+        const wanted = new Set(Object.keys(MANIFEST).map(cacheKey));
+        const keys = await cache.keys();
+        await Promise.all(keys.filter((request) => !wanted.has(request.url))
+                              .map((request) => cache.delete(request)));
+        await self.clients.claim();
+    })());
+});
+
+self.addEventListener('fetch', (event) => {
+    const request = event.request;
+    if (request.method !== 'GET') {
+        return;
+    }
+    const url = new URL(request.url);
+    if (url.origin !== scopeUrl.origin || !url.pathname.startsWith(scopeUrl.pathname)) {
+        return;
+    }
+    let path = decodeURIComponent(url.pathname.slice(scopeUrl.pathname.length));
+    if (path === '' || path.endsWith('/')) {
+        path += 'index.html';
+    }
+    if (!(path in MANIFEST)) {
+        return;
+    }
+    event.respondWith((async () => {
+        const cache = await caches.open(PRECACHE);
+        const cached = await cache.match(cacheKey(path));
+        return cached || fetch(request);
+    })());
+});
+"""
+
+def file_sha256(path):
+    """חישוב hash של קובץ (בבלוקים, גם לקבצי MP3 גדולים)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def source_sha256(path, source_stats):
+    """hash של קובץ מקור - ללא קריאה מחדש אם הגודל וה-mtime לא השתנו"""
+    stat = os.stat(path)
+    cached = source_stats.get(path)
+    if cached and cached['size'] == stat.st_size and cached['mtime'] == stat.st_mtime_ns:
+        return cached['hash']
+    digest = file_sha256(path)
+    source_stats[path] = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'hash': digest}
+    return digest
+
+def hashed_asset_name(file_name, digest):
+    """name.ext -> name.<hash>.ext"""
+    stem, ext = os.path.splitext(file_name)
+    return f"{stem}.{digest[:ASSET_HASH_LENGTH]}{ext}"
+
+def rewrite_asset_references(content, renamed_assets):
+    """החלפת ההפניות לקבצים ב-HTML בשמות עם ה-hash (גם בקידוד URL)"""
+    def replace_reference(match):
+        url = match.group('url')
+        new_name = renamed_assets.get(url) or renamed_assets.get(unquote(url))
+        if not new_name:
+            return match.group(0)
+        if url != unquote(url):
+            new_name = quote(new_name)
+        return match.group('prefix') + new_name
+    
+    return ASSET_REFERENCE_PATTERN.sub(replace_reference, content)
+
+def inject_sw_registration(content):
+    """הוספת רישום ה-Service Worker לתוכן HTML שנפרס"""
+    if "serviceWorker.register('sw.js')" in content:
+        return content
+    
+    if '</body>' in content:
+        return content.replace('</body>', SW_REGISTRATION_SNIPPET + '</body>', 1)
+    return content + SW_REGISTRATION_SNIPPET
+
+def data_entry(data):
+    """רשומת תוכנית-פרסום לתוכן שנוצר בזיכרון"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return {'data': data, 'hash': hashlib.sha256(data).hexdigest(), 'size': len(data)}
+
+def source_entry(path, digest):
+    """רשומת תוכנית-פרסום לקובץ קיים (יקושר / יועתק)"""
+    return {'source': path, 'hash': digest, 'size': os.path.getsize(path)}
+
+def entry_bytes(plan, entry):
+    """התוכן של רשומה בתוכנית הפרסום"""
+    if 'alias' in entry:
+        entry = plan[entry['alias']]
+    if 'data' in entry:
+        return entry['data']
+    with open(entry['source'], 'rb') as f:
+        return f.read()
+
+def build_headers_file(hashed_files):
+    """תוכן _headers - שמירה ארוכה לקבצים עם hash, בדיקה מחדש ל-HTML"""
+    lines = []
+    revalidate_paths = ["/", "/*.html", f"/{SERVICE_WORKER_FILE}", f"/{PRECACHE_MANIFEST_FILE}"]
+    for path in revalidate_paths:
+        lines.append(path)
+        lines.append(f"  Cache-Control: {CACHE_CONTROL_REVALIDATE}")
+    for name in sorted(hashed_files):
+        lines.append(f"/{quote(name)}")
+        lines.append(f"  Cache-Control: {CACHE_CONTROL_IMMUTABLE}")
+    return '\n'.join(lines) + '\n'
+
+def build_precache_manifest(plan):
+    """בניית מניפסט precache עם hash תוכן לכל קובץ שנפרס"""
+    manifest = []
+    for rel_path, entry in sorted(plan.items()):
+        if rel_path in PRECACHE_EXCLUDE or rel_path.endswith(PRECOMPRESSED_SUFFIXES):
+            continue
+        manifest.append({
+            'url': rel_path,
+            'revision': entry['hash'][:16],
+            'size': entry['size'],
+        })
+    return manifest
+
+def build_service_worker(manifest):
+    """תוכן המניפסט וה-Service Worker"""
+    manifest_content = json.dumps(manifest, ensure_ascii=False, indent=2)
+    
+    # המניפסט מוטמע בתוך sw.js - כל שינוי בקובץ משנה את ה-SW ומפעיל עדכון
+    revisions = {entry['url']: entry['revision'] for entry in manifest}
+    sw_content = SERVICE_WORKER_TEMPLATE.replace(
+        '__MANIFEST__', json.dumps(revisions, ensure_ascii=False, indent=4)
+    )
+    return manifest_content, sw_content
+
+def build_cached_variant(data, cached_path, compress):
+    """דחיסת תוכן אחד לתוך מטמון הבנייה"""
+    tmp_path = cached_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(compress(data))
+    os.replace(tmp_path, cached_path)
+
+def precompress_text_assets(plan):
+    """דחיסה מראש (רמה מקסימלית) של קבצי הטקסט במקביל
+    
+    הגרסאות הדחוסות נשמרות ב-.deploy_cache לפי hash המקור,
+    כך שקובץ שלא השתנה לא נדחס שוב. הגרסאות נוספות לתוכנית הפרסום.
+    """
+    compressors = {'.gz': lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        compressors['.br'] = lambda data: brotli.compress(data, quality=11)
+    
+    sources = [rel_path for rel_path in sorted(plan) if rel_path.endswith(COMPRESSIBLE_EXTENSIONS)]
+    
+    # קבצים זהים (index.html / presentation_v2.html) נדחסים פעם אחת בלבד
+    pending = {}
+    for rel_path in sources:
+        for suffix in compressors:
+            cached_path = os.path.join(BUILD_CACHE_DIR, plan[rel_path]['hash'] + suffix)
+            if not os.path.exists(cached_path):
+                pending.setdefault(cached_path, (rel_path, suffix))
+    
+    with ThreadPoolExecutor() as executor:
+        futures = [executor.submit(build_cached_variant, entry_bytes(plan, plan[rel_path]),
+                                   cached_path, compressors[suffix])
+                   for cached_path, (rel_path, suffix) in pending.items()]
+        for future in futures:
+            future.result()
+    
+    results = []
+    for rel_path in sources:
+        entry = plan[rel_path]
+        for suffix in compressors:
+            cached_path = os.path.join(BUILD_CACHE_DIR, entry['hash'] + suffix)
+            plan[rel_path + suffix] = source_entry(cached_path, f"{entry['hash']}{suffix}")
+            compressed_size = os.path.getsize(cached_path)
+            reused = cached_path not in pending
+            results.append((rel_path + suffix, entry['size'], compressed_size, reused))
+            ratio = compressed_size / entry['size'] if entry['size'] else 1.0
+            status = "מהמטמון" if reused else "נדחס"
+            print(f"   {rel_path}{suffix}: {entry['size']:,} → {compressed_size:,} בתים "
+                  f"({ratio:.1%}, {status})")
+    
+    return results
+
+def load_deploy_manifest():
+    """טעינת מניפסט הסנכרון מההרצה הקודמת"""
+    try:
+        with open(DEPLOY_MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    manifest.setdefault('files', {})
+    manifest.setdefault('sources', {})
+    return manifest
+
+def save_deploy_manifest(manifest):
+    """שמירת מניפסט הסנכרון (temp + rename)"""
+    tmp_path = DEPLOY_MANIFEST_FILE + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, DEPLOY_MANIFEST_FILE)
+
+def deploy_owned(path):
+    """קבצים שרק הבנייה כותבת (מטמון הבנייה - תמיד דרך rename)
+
+    רק אליהם מותר hardlink - קובץ מקור במאגר יכול להיערך במקום, והעותק
+    שמוגש כ-immutable תחת ה-hash הישן היה משתנה איתו.
+    """
+    path = os.path.abspath(path)
+    return path.startswith(os.path.abspath(BUILD_CACHE_DIR) + os.sep)
+
+def link_or_copy(source_path, target_path, allow_link):
+    """hardlink (רק כשמותר), אחרת reflink, ורק בסוף העתקה מלאה"""
+    if allow_link:
+        try:
+            os.link(source_path, target_path)
+            return 'link'
+        except OSError:
+            pass
+    
+    try:
+        with open(source_path, 'rb') as src, open(target_path, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        shutil.copystat(source_path, target_path)
+        return 'reflink'
+    except OSError:
+        if os.path.exists(target_path):
+            os.remove(target_path)
+    
+    shutil.copy2(source_path, target_path)
+    return 'copy'
+
+def exchange_dirs(staging_dir, deploy_dir):
+    """החלפת deploy בעץ החדש: renameat2(RENAME_EXCHANGE) אטומי ב-Linux
+
+    במערכות אחרות - שני rename (deploy חסר לרגע). העץ הישן נשאר ב-staging_dir.
+    """
+    if not os.path.exists(deploy_dir):
+        os.rename(staging_dir, deploy_dir)
+        return
+    renameat2 = getattr(ctypes.CDLL(None, use_errno=True), 'renameat2', None)
+    if renameat2 is not None:
+        if renameat2(AT_FDCWD, os.fsencode(staging_dir), AT_FDCWD, os.fsencode(deploy_dir),
+                     RENAME_EXCHANGE) == 0:
+            return
+    old_dir = staging_dir + ".old"
+    os.rename(deploy_dir, old_dir)
+    os.rename(staging_dir, deploy_dir)
+    os.rename(old_dir, staging_dir)
+
+def sync_deploy_dir(deploy_dir, plan, manifest):
+    """סנכרון אינקרמנטלי של תיקיית הפרסום לפי תוכנית הפרסום
+    
+    העץ החדש נבנה ב-deploy.staging: קובץ שה-hash שלו לא השתנה וה-stat שלו
+    תואם למניפסט מקושר (hardlink) מ-deploy, ורק השאר נכתבים. אחר כך העץ
+    מוחלף ב-deploy בפעולה אחת, כך שהשרת לא רואה אף פעם עץ חלקי, וקבצים
+    ישנים נעלמים יחד עם העץ הקודם.
+    """
+    staging_dir = deploy_dir + STAGING_SUFFIX
+    if os.path.exists(staging_dir):
+        shutil.rmtree(staging_dir)
+    os.makedirs(staging_dir)
+    previous = manifest['files']
+    current = {}
+    stats = {'unchanged': 0, 'data': 0, 'link': 0, 'reflink': 0, 'copy': 0, 'removed': 0}
+    
+    # כינויים (index.html) אחרי הקבצים שהם מצביעים עליהם
+    ordered = sorted(plan.items(), key=lambda item: ('alias' in item[1], item[0]))
+    for rel_path, entry in ordered:
+        live_path = os.path.join(deploy_dir, rel_path)
+        target_path = os.path.join(staging_dir, rel_path)
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        digest = entry['hash']
+        
+        old = previous.get(rel_path)
+        if old and old['hash'] == digest and os.path.exists(live_path):
+            stat = os.stat(live_path)
+            # קובץ שעדיין מקושר למקור במאגר (בנייה ישנה) מועתק מחדש
+            shared = ('source' in entry and not deploy_owned(entry['source'])
+                      and os.path.samefile(entry['source'], live_path))
+            if stat.st_size == old['size'] and stat.st_mtime_ns == old['mtime'] and not shared:
+                os.link(live_path, target_path)
+                current[rel_path] = old
+                stats['unchanged'] += 1
+                continue
+        
+        if 'alias' in entry:
+            method = link_or_copy(os.path.join(staging_dir, entry['alias']), target_path, True)
+        elif 'source' in entry:
+            method = link_or_copy(entry['source'], target_path, deploy_owned(entry['source']))
+        else:
+            with open(target_path, 'wb') as f:
+                f.write(entry['data'])
+            method = 'data'
+        stats[method] += 1
+        
+        stat = os.stat(target_path)
+        current[rel_path] = {'size': stat.st_size, 'hash': digest, 'mtime': stat.st_mtime_ns}
+    
+    if os.path.exists(deploy_dir):
+        for root, _dirs, files in os.walk(deploy_dir):
+            for name in files:
+                rel_path = os.path.relpath(os.path.join(root, name), deploy_dir).replace(os.sep, '/')
+                if rel_path not in current:
+                    stats['removed'] += 1
+                    print(f"   - הוסר: {rel_path}")
+    
+    exchange_dirs(staging_dir, deploy_dir)
+    shutil.rmtree(staging_dir)
+    manifest['files'] = current
+    save_deploy_manifest(manifest)
+    
+    return stats
+
+def prepare_deployment(skip_fonts=False, require_fonts=False):
+    """הכנת קבצים לפרסום
+
+    בלי fontTools או בלי קבצי הגופן הפרסום ממשיך בגופני המערכת;
+    require_fonts הופך זאת ל-RuntimeError.
+    """
     
     # שם התיקייה לפרסום
     deploy_dir = "deploy"
     
-    # יצירת תיקייה חדשה
-    if os.path.exists(deploy_dir):
-        shutil.rmtree(deploy_dir)
-    os.makedirs(deploy_dir)
+    os.makedirs(BUILD_CACHE_DIR, exist_ok=True)
+    manifest = load_deploy_manifest()
     
-    # רשימת הקבצים להעתקה
-    files_to_copy = [
-        "presentation_v2.html",
-        "בוט הנמל החכם.mp3",
-        "asdod_port_logo_official.png"
-    ]
+    # תוכנית הפרסום: נתיב ב-deploy -> מקור (קובץ / תוכן / כינוי)
+    plan = {}
     
-    # העתקת קבצים
+    # קבצים קבועים בשם עם hash
     copied_files = []
-    for file in files_to_copy:
+    renamed_assets = {}
+    font_files = []
+    stylesheet_files = []
+    for file in IMMUTABLE_ASSETS:
         if os.path.exists(file):
-            shutil.copy2(file, deploy_dir)
+            digest = source_sha256(file, manifest['sources'])
+            hashed_name = hashed_asset_name(file, digest)
+            plan[hashed_name] = source_entry(file, digest)
+            renamed_assets[file] = hashed_name
             copied_files.append(file)
-            print(f"✓ הועתק: {file}")
+            print(f"✓ הועתק: {file} → {hashed_name}")
         else:
             print(f"✗ לא נמצא: {file}")
     
-    # שינוי שם קובץ HTML ל-index.html (אופציונלי)
-    html_file = os.path.join(deploy_dir, "presentation_v2.html")
-    if os.path.exists(html_file):
-        index_file = os.path.join(deploy_dir, "index.html")
-        shutil.copy2(html_file, index_file)
+    # המצגת: עדכון הפניות לקבצים ורישום Service Worker
+    # index.html הוא כינוי (hardlink) לאותו קובץ - ללא עותק נוסף
+    if os.path.exists(HTML_SOURCE):
+        with open(HTML_SOURCE, 'r', encoding='utf-8') as f:
+            content = f.read()
+        content = rewrite_asset_references(content, renamed_assets)
+        
+        # גופן עברי חתוך לתווים שבמצגת (שם הקובץ כולל את hash הגליפים)
+        fonts = None
+        font_problem = "--skip-fonts" if skip_fonts else font_sources_problem()
+        if font_problem is None:
+            fonts = build_font_subsets(content, FONT_CACHE_DIR)
+        elif require_fonts and not skip_fonts:
+            raise RuntimeError(f"--require-fonts: {font_problem}")
+        if fonts is None:
+            print(f"⚠ הגופן העברי לא נחתך: {font_problem}; המצגת תוצג בגופני המערכת")
+        else:
+            content = apply_font_faces(content, fonts)
+            for entry in fonts['files']:
+                plan[entry['name']] = source_entry(entry['path'], file_sha256(entry['path']))
+                font_files.append(entry['name'])
+                state = "מהמטמון" if entry['cached'] else "נחתך"
+                print(f"✓ גופן: {entry['name']} ({entry['size']:,} בתים, "
+                      f"{len(entry['codepoints'])} תווים, {state})")
+        
+        # CSS קריטי inline, הגיליון המלא בקובץ עם hash שנטען ברקע
+        content, deferred = split_critical_css(content, os.path.splitext(HTML_SOURCE)[0])
+        if deferred:
+            plan[deferred['name']] = data_entry(deferred['css'])
+            stylesheet_files.append(deferred['name'])
+            for line in summary_lines(deferred):
+                print(f"✓ {line}")
+        
+        content = inject_sw_registration(content)
+        plan[HTML_SOURCE] = data_entry(content)
+        plan["index.html"] = {'alias': HTML_SOURCE, 'hash': plan[HTML_SOURCE]['hash'],
+                              'size': plan[HTML_SOURCE]['size']}
+        copied_files.insert(0, HTML_SOURCE)
+        print(f"✓ הועתק: {HTML_SOURCE}")
         print(f"✓ נוצר גם: index.html")
+    else:
+        print(f"✗ לא נמצא: {HTML_SOURCE}")
+    
+    # כותרות מטמון
+    hashed_files = list(renamed_assets.values()) + font_files + stylesheet_files
+    plan[HEADERS_FILE] = data_entry(build_headers_file(hashed_files))
+    print(f"✓ נוצר: {HEADERS_FILE} (max-age ארוך ל-{len(hashed_files)} קבצים עם hash)")
     
     # יצירת קובץ README
     readme_content = """# מצגת אינטראקטיבית - נמל אשדוד
 
 ## קבצים נדרשים:
 - presentation_v2.html (או index.html)
-- בוט הנמל החכם.mp3
-- asdod_port_logo_official.png
+- בוט הנמל החכם.<hash>.mp3
+- asdod_port_logo_official.<hash>.png
+- sw.js + precache-manifest.json (עבודה ללא חיבור)
+- _headers (כותרות מטמון)
+
+## מטמון:
+קבצים עם hash בשם נשמרים במטמון לשנה (immutable).
+ה-HTML נבדק מחדש בכל טעינה - מבקר חוזר מוריד מחדש רק אותו.
+
+## עבודה ללא חיבור:
+בטעינה הראשונה ה-Service Worker שומר את כל הקבצים במטמון.
+מהטעינה השנייה המצגת מוגשת כולה מהמטמון, ובעדכון נטענים רק הקבצים שהשתנו.
 
 ## הוראות פרסום:
 
@@ -76,11 +571,28 @@ def prepare_deployment():
 3. firebase deploy
 """
     
-    readme_path = os.path.join(deploy_dir, "README.md")
-    with open(readme_path, 'w', encoding='utf-8') as f:
-        f.write(readme_content)
+    plan["README.md"] = data_entry(readme_content)
     print(f"✓ נוצר: README.md")
     
+    # מניפסט precache ו-Service Worker
+    precache, sw_content = build_service_worker(build_precache_manifest(plan))
+    plan[PRECACHE_MANIFEST_FILE] = data_entry(precache)
+    plan[SERVICE_WORKER_FILE] = data_entry(sw_content)
+    print(f"✓ נוצר: {SERVICE_WORKER_FILE} + {PRECACHE_MANIFEST_FILE} "
+          f"({len(json.loads(precache))} קבצים ב-precache)")
+    
+    # גרסאות דחוסות מראש
+    encodings = "gzip + brotli" if brotli is not None else "gzip (brotli לא מותקן)"
+    print(f"✓ דחיסה מראש - {encodings}:")
+    precompress_text_assets(plan)
+    
+    # סנכרון אינקרמנטלי ל-deploy
+    print(f"✓ סנכרון לתיקייה {deploy_dir}:")
+    stats = sync_deploy_dir(deploy_dir, plan, manifest)
+    written = stats['data'] + stats['link'] + stats['reflink'] + stats['copy']
+    print(f"   נכתבו {written} (hardlink: {stats['link']}, reflink: {stats['reflink']}, "
+          f"העתקה: {stats['copy']}), ללא שינוי: {stats['unchanged']}, הוסרו: {stats['removed']}")
+    
     print(f"\n✅ הושלם! כל הקבצים נמצאים בתיקייה: {deploy_dir}")
     print(f"\n📁 קבצים שהועתקו ({len(copied_files)}):")
     for file in copied_files:
@@ -89,5 +601,14 @@ def prepare_deployment():
     return deploy_dir
 
 if __name__ == "__main__":
-    prepare_deployment()
-
+    parser = argparse.ArgumentParser(description="הכנת הקבצים לפרסום בתיקייה deploy")
+    parser.add_argument('--skip-fonts', action='store_true',
+                        help="פרסום בלי חיתוך הגופן העברי (גופני המערכת)")
+    parser.add_argument('--require-fonts', action='store_true',
+                        help="כישלון כשאין fontTools או קבצי גופן (במקום גופני המערכת)")
+    args = parser.parse_args()
+    try:
+        prepare_deployment(skip_fonts=args.skip_fonts, require_fonts=args.require_fonts)
+    except RuntimeError as e:
+        print(f"שגיאה: {e}")
+        sys.exit(1)
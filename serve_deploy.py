@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+שרת סטטי מקומי לתיקיית deploy (קיוסק / לפטופ הצגה)
+במקום python -m http.server:
+- keep-alive (HTTP/1.1)
+- os.sendfile (zero-copy) דרך loop.sendfile
+- הגשת גרסאות .br / .gz שנוצרו ע"י prepare_for_deployment
+- ETag + If-None-Match (304)
+- Range (206) - דילוג במוזיקת הרקע
+- Cache-Control לפי קובץ _headers
+
+שימוש:
+    python3 serve_deploy.py                 # הגשה על פורט 8000
+    python3 serve_deploy.py --bench         # בדיקת עומס מקומית
+"""
+
+import os
+import sys
+import time
+import fnmatch
+import asyncio
+import hashlib
+import argparse
+import mimetypes
+import subprocess
+from email.utils import formatdate
+from urllib.parse import unquote, quote, urlsplit
+
+DEPLOY_DIR = "deploy"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+
+# ניתוק חיבור keep-alive שלא שלח בקשה
+KEEP_ALIVE_TIMEOUT = 15
+MAX_HEADER_BYTES = 16 * 1024
+
+# סדר העדפה של גרסאות דחוסות מראש
+PRECOMPRESSED_ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+# קבצי הגדרות של האחסון - לא מוגשים
+HIDDEN_FILES = ("_headers",)
+
+# ברירת מחדל ל-Cache-Control כשאין התאמה ב-_headers
+DEFAULT_CACHE_CONTROL = "no-cache"
+
+STATUS_TEXT = {
+    200: "OK",
+    206: "Partial Content",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    416: "Range Not Satisfiable",
+}
+
+mimetypes.add_type("audio/mpeg", ".mp3")
+mimetypes.add_type("application/javascript", ".js")
+mimetypes.add_type("application/manifest+json", ".webmanifest")
+mimetypes.add_type("font/woff2", ".woff2")
+mimetypes.add_type("font/woff", ".woff")
+
+# מטמון ETag לפי (path, size, mtime) - hash מחושב פעם אחת לכל גרסת קובץ.
+# הערכים הם futures, כך שבקשות מקבילות לאותו קובץ ממתינות לאותו חישוב
+_etag_cache = {}
+
+def content_etag(path):
+    """ETag חזק לפי hash תוכן הקובץ (רץ ב-thread, מחוץ ללולאת האירועים)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return f'"{digest.hexdigest()[:20]}"'
+
+async def file_etag(path, stat):
+    """ETag של גרסת הקובץ; הגיבוב הראשון לא חוסם את שאר החיבורים"""
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    etag = _etag_cache.get(key)
+    if etag is None:
+        etag = asyncio.get_running_loop().run_in_executor(None, content_etag, path)
+        _etag_cache[key] = etag
+    try:
+        # shield: a client that disconnects must not cancel the shared hash
+        return await asyncio.shield(etag)
+    except OSError:
+        _etag_cache.pop(key, None)
+        raise
+
+def load_header_rules(root):
+    """קריאת קובץ _headers (פורמט Netlify) לרשימת (תבנית, כותרות)"""
+    rules = []
+    try:
+        with open(os.path.join(root, "_headers"), 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return rules
+    
+    for line in lines:
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        if not line[0].isspace():
+            rules.append((line.strip(), {}))
+        elif rules and ':' in line:
+            name, value = line.split(':', 1)
+            rules[-1][1][name.strip()] = value.strip()
+    return rules
+
+def headers_for_path(rules, url_path):
+    """כותרות מ-_headers עבור נתיב (הכלל המאוחר גובר)"""
+    headers = {}
+    for pattern, values in rules:
+        if pattern == url_path or fnmatch.fnmatchcase(url_path, pattern):
+            headers.update(values)
+    return headers
+
+def resolve_path(root, raw_path):
+    """תרגום נתיב URL לקובץ בתוך root (ללא יציאה מהתיקייה)
+
+    נתיב שאינו UTF-8 תקין או שיש בו תו NUL מעלה ValueError (400).
+    """
+    path = unquote(urlsplit(raw_path).path, errors='strict')
+    if '\0' in path:
+        raise ValueError("NUL בנתיב")
+    if path.endswith('/'):
+        path += "index.html"
+    full_path = os.path.realpath(os.path.join(root, path.lstrip('/')))
+    if full_path != root and not full_path.startswith(root + os.sep):
+        return None, path
+    if os.path.isdir(full_path):
+        full_path = os.path.join(full_path, "index.html")
+        path = path.rstrip('/') + "/index.html"
+    return full_path, path
+
+def parse_range(value, size):
+    """פענוח כותרת Range (טווח יחיד) -> (start, end) כולל, או None"""
+    if not value.startswith("bytes=") or ',' in value:
+        return None
+    start, _, end = value[6:].strip().partition('-')
+    try:
+        if not start:
+            length = int(end)
+            if length <= 0:
+                return None
+            return max(size - length, 0), size - 1
+        start = int(start)
+        end = int(end) if end else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+def etag_matches(header_value, etag):
+    """בדיקת If-None-Match (כולל רשימה ו-*)"""
+    if header_value.strip() == '*':
+        return True
+    candidates = [candidate.strip() for candidate in header_value.split(',')]
+    return etag in candidates or f"W/{etag}" in candidates
+
+async def read_request(reader):
+    """קריאת שורת בקשה וכותרות. מחזיר None בסגירת חיבור"""
+    try:
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_TIMEOUT)
+    except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+        return None
+    except asyncio.LimitOverrunError:
+        return 'too-large'
+    
+    lines = head.decode('latin-1').split("\r\n")
+    parts = lines[0].split()
+    if len(parts) != 3:
+        return 'bad'
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+    return parts[0], parts[1], parts[2], headers
+
+def has_request_body(headers):
+    """בקשה שמכריזה על גוף (Content-Length / Transfer-Encoding)
+
+    השרת לא קורא גופי בקשות, ולכן אחרי בקשה כזו החיבור נסגר - אחרת הגוף
+    היה מפוענח כבקשה הבאה באותו חיבור.
+    """
+    if "transfer-encoding" in headers:
+        return True
+    return headers.get("content-length", "0").strip() != "0"
+
+async def send_simple(writer, status, keep_alive, extra=None, body=b""):
+    """תשובה קצרה (שגיאה / 304)
+
+    ל-304 אין Content-Length: אורך 0 היה סותר את אורך ה-200 (RFC 9110 8.6).
+    """
+    headers = {"Date": formatdate(usegmt=True)}
+    if status != 304:
+        headers["Content-Length"] = str(len(body))
+    headers["Connection"] = "keep-alive" if keep_alive else "close"
+    if body:
+        headers["Content-Type"] = "text/plain; charset=utf-8"
+    headers.update(extra or {})
+    head = f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+    head += "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+    writer.write(head.encode('latin-1') + b"\r\n" + body)
+    await writer.drain()
+
+async def handle_request(root, rules, method, target, headers, writer, keep_alive):
+    """טיפול בבקשה אחת"""
+    if method not in ("GET", "HEAD"):
+        await send_simple(writer, 405, keep_alive, {"Allow": "GET, HEAD"}, b"405 Method Not Allowed")
+        return
+    
+    try:
+        full_path, url_path = resolve_path(root, target)
+    except ValueError:
+        # כולל UnicodeDecodeError
+        await send_simple(writer, 400, keep_alive, body=b"400 Bad Request")
+        return
+    if (full_path is None or not os.path.isfile(full_path)
+            or os.path.basename(full_path) in HIDDEN_FILES):
+        await send_simple(writer, 404, keep_alive, body=b"404 Not Found")
+        return
+    
+    stat = os.stat(full_path)
+    content_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+    if content_type.startswith("text/") or content_type.endswith(("javascript", "json")):
+        content_type += "; charset=utf-8"
+    
+    response_headers = {
+        "Date": formatdate(usegmt=True),
+        "Content-Type": content_type,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": DEFAULT_CACHE_CONTROL,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Connection": "keep-alive" if keep_alive else "close",
+    }
+    response_headers.update(headers_for_path(rules, quote(url_path)))
+    
+    # גרסה דחוסה מראש - רק לבקשה מלאה (טווחים מוגשים מהקובץ המקורי)
+    send_path = full_path
+    etag = await file_etag(full_path, stat)
+    range_header = headers.get("range")
+    accepted = {token.split(';')[0].strip() for token in headers.get("accept-encoding", "").split(',')}
+    if not range_header:
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            variant = full_path + suffix
+            if encoding in accepted and os.path.isfile(variant):
+                send_path, stat = variant, os.stat(variant)
+                etag = etag[:-1] + f'-{encoding}"'
+                response_headers["Content-Encoding"] = encoding
+                break
+    for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+        if os.path.isfile(full_path + suffix):
+            response_headers["Vary"] = "Accept-Encoding"
+            break
+    response_headers["ETag"] = etag
+    
+    if_none_match = headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        for name in ("Content-Type", "Accept-Ranges", "Content-Encoding"):
+            response_headers.pop(name, None)
+        await send_simple(writer, 304, keep_alive, response_headers)
+        return
+    
+    size = stat.st_size
+    status, start, length = 200, 0, size
+    if range_header and headers.get("if-range", etag) == etag:
+        byte_range = parse_range(range_header, size)
+        if byte_range is None:
+            await send_simple(writer, 416, keep_alive, {"Content-Range": f"bytes */{size}"})
+            return
+        start, end = byte_range
+        status, length = 206, end - start + 1
+        response_headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response_headers["Content-Length"] = str(length)
+    
+    head = f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+    head += "".join(f"{name}: {value}\r\n" for name, value in response_headers.items())
+    writer.write(head.encode('latin-1') + b"\r\n")
+    await writer.drain()
+    
+    if method == "GET" and length:
+        loop = asyncio.get_running_loop()
+        with open(send_path, 'rb') as f:
+            # os.sendfile כשאפשר, אחרת נפילה אוטומטית לקריאה/כתיבה
+            await loop.sendfile(writer.transport, f, start, length)
+
+async def serve_connection(root, reader, writer):
+    """חיבור keep-alive אחד - בקשות ברצף עד סגירה / timeout"""
+    rules = load_header_rules(root)
+    try:
+        while True:
+            request = await read_request(reader)
+            if request is None:
+                break
+            if request in ('bad', 'too-large'):
+                await send_simple(writer, 400, False, body=b"400 Bad Request")
+                break
+            method, target, version, headers = request
+            connection = headers.get("connection", "").lower()
+            if version == "HTTP/1.1":
+                keep_alive = connection != "close"
+            else:
+                keep_alive = connection == "keep-alive"
+            if has_request_body(headers):
+                keep_alive = False
+            await handle_request(root, rules, method, target, headers, writer, keep_alive)
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+async def run_server(root, host, port):
+    """הפעלת השרת עד עצירה"""
+    root = os.path.realpath(root)
+    server = await asyncio.start_server(
+        lambda reader, writer: serve_connection(root, reader, writer),
+        host, port, limit=MAX_HEADER_BYTES
+    )
+    print(f"🌐 מגיש את {root}")
+    print(f"   http://{host}:{port}/")
+    async with server:
+        await server.serve_forever()
+
+async def bench_client(host, port, path, deadline, latencies, counters):
+    """לקוח עומס אחד על חיבור keep-alive"""
+    reader, writer = await asyncio.open_connection(host, port)
+    request = (f"GET {quote(path)} HTTP/1.1\r\nHost: {host}\r\n"
+               f"Accept-Encoding: br, gzip\r\n\r\n").encode('latin-1')
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+            counters['bytes'] += length
+            if not head.startswith(b"HTTP/1.1 200"):
+                counters['errors'] += 1
+    finally:
+        writer.close()
+
+async def run_bench(host, port, path, connections, duration):
+    """בדיקת עומס: בקשות לשנייה ו-p99"""
+    latencies = []
+    counters = {'bytes': 0, 'errors': 0}
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(bench_client(host, port, path, deadline, latencies, counters)
+                           for _ in range(connections)))
+    elapsed = time.perf_counter() - started
+    
+    latencies.sort()
+    def percentile(fraction):
+        return latencies[min(int(len(latencies) * fraction), len(latencies) - 1)] * 1000
+    
+    print(f"\n📊 בדיקת עומס: {path}")
+    print(f"   חיבורים: {connections}, משך: {elapsed:.1f} שניות")
+    print(f"   בקשות: {len(latencies):,} ({len(latencies) / elapsed:,.0f} לשנייה)")
+    print(f"   p50: {percentile(0.50):.2f} ms, p99: {percentile(0.99):.2f} ms")
+    print(f"   נתונים: {counters['bytes'] / elapsed / 1024 / 1024:.1f} MB/s, שגיאות: {counters['errors']}")
+    return {
+        'requests': len(latencies),
+        'rps': len(latencies) / elapsed,
+        'p99_ms': percentile(0.99),
+        'errors': counters['errors'],
+    }
+
+def wait_for_port(host, port, timeout=10):
+    """המתנה עד שהשרת מקבל חיבורים"""
+    async def probe():
+        deadline = time.perf_counter() + timeout
+        while True:
+            try:
+                _reader, writer = await asyncio.open_connection(host, port)
+                writer.close()
+                return
+            except OSError:
+                if time.perf_counter() > deadline:
+                    raise
+                await asyncio.sleep(0.05)
+    asyncio.run(probe())
+
+def main():
+    parser = argparse.ArgumentParser(description="שרת סטטי מקומי לתיקיית deploy")
+    parser.add_argument("--root", default=DEPLOY_DIR)
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--bench", action="store_true", help="בדיקת עומס מקומית")
+    parser.add_argument("--path", default="/index.html", help="נתיב לבדיקת העומס")
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+    
+    if not os.path.isdir(args.root):
+        print(f"✗ לא נמצאה תיקייה: {args.root} (הרץ קודם prepare_for_deployment.py)")
+        return 1
+    
+    if not args.bench:
+        try:
+            asyncio.run(run_server(args.root, args.host, args.port))
+        except KeyboardInterrupt:
+            print("\n✓ השרת נעצר")
+        return 0
+    
+    # השרת רץ בתהליך נפרד כדי שהלקוחות לא יתחרו איתו על אותו event loop
+    server = subprocess.Popen([sys.executable, os.path.abspath(__file__),
+                               "--root", args.root, "--host", args.host, "--port", str(args.port)],
+                              stdout=subprocess.DEVNULL)
+    try:
+        wait_for_port(args.host, args.port)
+        asyncio.run(run_bench(args.host, args.port, args.path, args.connections, args.duration))
+    finally:
+        server.terminate()
+        server.wait()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Near-duplicate slides across deck versions (MinHash + LSH)
+Every slide's text is normalized with hebrew_text and cut into character
+shingles. A 128-value MinHash signature is computed with one-permutation
+hashing (one hash per shingle, split into bins, empty bins filled by
+rotation), so a slide costs O(shingles) instead of O(shingles x 128), and is
+kept as 1 KB of packed 64-bit values.
+Signatures are cut into LSH bands; slides sharing a band bucket are compared
+against a few bucket leaders by estimated Jaccard (the share of equal
+signature values) and joined in a union-find, which keeps the whole corpus
+near-linear.
+Each cluster is reported with its most recent version (newest deck file)
+and every other version's similarity to it.
+
+Usage:
+    python3 slide_clusters.py [paths ...]
+    python3 slide_clusters.py --db .corpus_index.sqlite   # texts from corpus_index
+"""
+
+import argparse
+import array
+import os
+import sqlite3
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from deck_text import extract_deck, find_decks, slide_texts
+from hebrew_text import normalize_text
+
+SHINGLE_SIZE = 5
+
+# crc32 of a shingle spread over 64 bits (stable across worker processes)
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+HASH_MASK = (1 << 64) - 1
+
+# Signature of NUM_BINS values, BANDS bands of ROWS values each: pairs above
+# ~(1 / BANDS) ** (1 / ROWS) = 0.6 Jaccard become candidates
+NUM_BINS = 128
+ROWS = 6
+BANDS = NUM_BINS // ROWS
+
+# A bin value keeps the hash bits above the bin number; densified bins put
+# the rotation distance in the freed top bits
+BIN_BITS = NUM_BINS.bit_length() - 1
+VALUE_BITS = 64 - BIN_BITS
+
+DEFAULT_THRESHOLD = 0.7
+
+# Bucket members are compared with at most this many leaders
+MAX_LEADERS = 8
+
+def shingles(text):
+    """64-bit hashes of the character shingles of a normalized text"""
+    if len(text) <= SHINGLE_SIZE:
+        pieces = [text]
+    else:
+        pieces = (text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1))
+    hashes = set()
+    for piece in pieces:
+        value = (zlib.crc32(piece.encode('utf-8')) * HASH_MULTIPLIER) & HASH_MASK
+        hashes.add(value ^ (value >> 32))
+    return frozenset(hashes)
+
+def minhash(hashes):
+    """One-permutation MinHash signature with rotation densification, packed
+
+    The low bits of a shingle hash pick its bin, the rest is its value; an
+    empty bin takes the next non-empty bin's value tagged with the distance,
+    so two slides fill empty bins the same way.
+    """
+    bins = [None] * NUM_BINS
+    for value in hashes:
+        index = value & (NUM_BINS - 1)
+        value >>= BIN_BITS
+        if bins[index] is None or value < bins[index]:
+            bins[index] = value
+    signature = list(bins)
+    for index in range(NUM_BINS):
+        distance = 1
+        while signature[index] is None:
+            source = bins[(index + distance) % NUM_BINS]
+            if source is not None:
+                signature[index] = source | distance << VALUE_BITS
+            distance += 1
+    return array.array('Q', signature).tobytes()
+
+def similarity(a, b):
+    """Estimated Jaccard similarity: the share of equal signature values"""
+    return sum(x == y for x, y in zip(memoryview(a).cast('Q'), memoryview(b).cast('Q'))) / NUM_BINS
+
+def slide_record(deck, mtime, number, title, text):
+    """Slide dict with its shingles and signature, or None for an empty slide"""
+    normalized = normalize_text(text)
+    if not normalized:
+        return None
+    return {'deck': deck, 'mtime': mtime, 'number': number, 'title': title,
+            'text': text, 'signature': minhash(shingles(normalized))}
+
+def deck_records(path):
+    """Worker: slide records of one deck and the error, if any"""
+    try:
+        mtime = os.stat(path).st_mtime
+        records = [slide_record(path, mtime, slide['number'], slide['title'],
+                                '\n'.join(slide_texts(slide)))
+                   for slide in extract_deck(path)]
+        return [record for record in records if record], None
+    except Exception as e:
+        return [], f"{path}: {type(e).__name__}: {e}"
+
+def load_from_decks(paths, workers=None):
+    """Slide records of every deck under paths, extracted in worker processes"""
+    records = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for deck_result, error in executor.map(deck_records, find_decks(paths), chunksize=4):
+            if error:
+                print(f"   ✗ {error}")
+            records.extend(deck_result)
+    return records
+
+def load_from_index(db_path):
+    """Slide records from a corpus_index database, without re-extracting"""
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("SELECT d.path, d.mtime_ns, s.number, s.title, s.text "
+                            "FROM slides s JOIN decks d ON d.id = s.deck_id").fetchall()
+    finally:
+        conn.close()
+    records = (slide_record(path, mtime_ns / 1e9, number, title, text)
+               for path, mtime_ns, number, title, text in rows)
+    return [record for record in records if record]
+
+def find(parent, i):
+    """Union-find root with path halving"""
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+def cluster_slides(records, threshold=DEFAULT_THRESHOLD):
+    """Clusters (lists of record indexes) of two or more near-duplicate slides"""
+    parent = list(range(len(records)))
+    for band in range(BANDS):
+        start = band * ROWS * 8
+        buckets = {}
+        for i, record in enumerate(records):
+            buckets.setdefault(record['signature'][start:start + ROWS * 8], []).append(i)
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            leaders = []
+            for i in members:
+                for leader in leaders:
+                    if find(parent, i) == find(parent, leader):
+                        break
+                    if similarity(records[i]['signature'], records[leader]['signature']) >= threshold:
+                        parent[find(parent, i)] = find(parent, leader)
+                        break
+                else:
+                    if len(leaders) < MAX_LEADERS:
+                        leaders.append(i)
+    clusters = {}
+    for i in range(len(records)):
+        clusters.setdefault(find(parent, i), []).append(i)
+    return [members for members in clusters.values() if len(members) > 1]
+
+def newest(records, members):
+    """Index of the most recent version in a cluster (newest deck, then path)"""
+    return max(members, key=lambda i: (records[i]['mtime'], records[i]['deck'], -records[i]['number']))
+
+def describe(records, clusters):
+    """Clusters ordered by size, each with its newest slide and the similarities"""
+    report = []
+    for members in clusters:
+        latest = newest(records, members)
+        versions = sorted(((similarity(records[latest]['signature'], records[i]['signature']), i)
+                           for i in members if i != latest), reverse=True)
+        report.append({'latest': latest, 'versions': versions})
+    report.sort(key=lambda cluster: (-len(cluster['versions']), records[cluster['latest']]['deck']))
+    return report
+
+def slide_label(record):
+    """deck · slide N (date)"""
+    date = datetime.fromtimestamp(record['mtime']).strftime('%Y-%m-%d %H:%M')
+    return f"{record['deck']} · שקופית {record['number']} ({date})"
+
+def main():
+    parser = argparse.ArgumentParser(description="איתור שקופיות כמעט-זהות בין גרסאות מצגת")
+    parser.add_argument('paths', nargs='*', default=['.'])
+    parser.add_argument('--db', help="קריאת הטקסטים מאינדקס corpus_index במקום חילוץ")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="דמיון Jaccard מינימלי (0-1)")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--limit', type=int, default=50, help="מספר האשכולות המוצגים")
+    args = parser.parse_args()
+    
+    started = time.perf_counter()
+    records = load_from_index(args.db) if args.db else load_from_decks(args.paths, args.workers)
+    loaded = time.perf_counter()
+    clusters = cluster_slides(records, args.threshold)
+    report = describe(records, clusters)
+    clustered = sum(len(cluster['versions']) + 1 for cluster in report)
+    
+    for number, cluster in enumerate(report[:args.limit], 1):
+        latest = records[cluster['latest']]
+        heading = (latest['title'] or latest['text']).split('\n')[0][:60]
+        print(f"\nאשכול {number} - {len(cluster['versions']) + 1} גרסאות: {heading}")
+        print(f"   ★ {slide_label(latest)}  ← הגרסה העדכנית")
+        for estimate, i in cluster['versions']:
+            state = "זהה" if normalize_text(records[i]['text']) == normalize_text(latest['text']) else f"~{estimate:.0%}"
+            print(f"     {slide_label(records[i])}  {state}")
+    if len(report) > args.limit:
+        print(f"\n... ועוד {len(report) - args.limit} אשכולות")
+    print(f"\n✓ {len(records)} שקופיות, {len(report)} אשכולות ({clustered} שקופיות), "
+          f"{len(records) - clustered} ללא כפילות "
+          f"(טעינה {loaded - started:.2f} שניות, אשכול {time.perf_counter() - loaded:.2f} שניות)")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"שגיאה: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
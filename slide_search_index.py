@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Build-time full-text search for the generated HTML presentations
+The generators pass their extracted slides to search_index_island(), which
+builds an inverted index (normalized term -> paragraph numbers, gap-encoded)
+over every title and paragraph and embeds it as a gzip + base64 data island.
+SEARCH_SCRIPT decompresses it on first use (DecompressionStream) and answers
+each keystroke from the index alone: exact lookups by binary search over the
+sorted terms, the word still being typed as a prefix range, and an AND of
+the words through a stamp array - the DOM is never scanned.
+Hebrew normalization (niqqud, final letters, prefix letters) is hebrew_text's;
+prefixed forms are expanded when indexing, so queries are looked up as typed.
+"""
+
+import argparse
+import base64
+import bisect
+import gzip
+import json
+import sys
+
+from hebrew_text import index_terms, normalize_words
+from html_slide_parser import parse_html_slides
+
+INDEX_VERSION = 1
+MAX_RESULTS = 12
+
+SEARCH_CSS = """        
+        .slide-search {
+            position: fixed;
+            top: 25px;
+            left: 50%;
+            transform: translateX(-50%);
+            width: min(420px, 60vw);
+            z-index: 1002;
+        }
+        
+        .slide-search input {
+            width: 100%;
+            padding: 10px 18px;
+            border: none;
+            border-radius: 25px;
+            background: rgba(255, 255, 255, 0.9);
+            box-shadow: 0 4px 15px rgba(0, 0, 0, 0.2);
+            font: inherit;
+            font-size: 16px;
+            direction: rtl;
+        }
+        
+        .slide-search-results {
+            margin-top: 8px;
+            max-height: 50vh;
+            overflow-y: auto;
+            background: rgba(255, 255, 255, 0.97);
+            border-radius: 15px;
+            box-shadow: 0 4px 20px rgba(0, 0, 0, 0.2);
+        }
+        
+        .slide-search-results[hidden] {
+            display: none;
+        }
+        
+        .search-result {
+            display: flex;
+            gap: 12px;
+            align-items: baseline;
+            width: 100%;
+            padding: 10px 16px;
+            border: none;
+            background: none;
+            font: inherit;
+            font-size: 15px;
+            text-align: right;
+            cursor: pointer;
+        }
+        
+        .search-result:hover,
+        .search-result:focus {
+            background: rgba(0, 102, 204, 0.1);
+        }
+        
+        .search-result-slide {
+            flex-shrink: 0;
+            min-width: 28px;
+            padding: 2px 8px;
+            border-radius: 10px;
+            background: linear-gradient(135deg, #003366, #0066CC);
+            color: white;
+            font-weight: bold;
+            text-align: center;
+        }
+"""
+
+SEARCH_HTML = """    <div class="slide-search" role="search">
+        <input type="search" id="slideSearch" placeholder="חיפוש במצגת ( / )" autocomplete="off" aria-label="חיפוש במצגת">
+        <div class="slide-search-results" id="slideSearchResults" hidden></div>
+    </div>
+    
+"""
+
+# Same splitting as hebrew_text.normalize_words()
+SEARCH_NORMALIZE_JS = r"""        
+        const SEARCH_NIQQUD = /[\u0591-\u05BD\u05BF\u05C1\u05C2\u05C4\u05C5\u05C7]/g;
+        const SEARCH_JOINER = /(?<=[\p{L}\p{N}])['"`\u05F3\u05F4](?=[\p{L}\p{N}])/gu;
+        const SEARCH_WORD = /[\p{L}\p{N}]+/gu;
+        const SEARCH_FINALS = { 'ך': 'כ', 'ם': 'מ', 'ן': 'נ', 'ף': 'פ', 'ץ': 'צ' };
+        
+        function searchWords(text) {
+            const words = text.replace(SEARCH_NIQQUD, '').replace(SEARCH_JOINER, '')
+                .toLowerCase().match(SEARCH_WORD) || [];
+            return words.map((word) => word.replace(/[ךםןףץ]/g, (letter) => SEARCH_FINALS[letter]));
+        }
+"""
+
+SEARCH_SCRIPT = (r"""    <script>
+        // Slide search over the index built by slide_search_index.py
+        const searchInput = document.getElementById('slideSearch');
+        const searchResults = document.getElementById('slideSearchResults');
+        const SEARCH_MAX_RESULTS = __MAX_RESULTS__;
+        let searchIndex = null;
+        let searchLoading = null;
+        let searchStamps = null;
+        let searchBase = 0;
+""" + SEARCH_NORMALIZE_JS + r"""        
+        async function loadSearchIndex() {
+            const island = document.getElementById('slideSearchIndex');
+            const bytes = Uint8Array.from(atob(island.textContent.trim()), (c) => c.charCodeAt(0));
+            const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+            const data = JSON.parse(await new Response(stream).text());
+            // Postings are stored as gaps between paragraph numbers
+            data.postings = data.postings.map((gaps) => {
+                const ids = new Uint32Array(gaps.length);
+                let id = 0;
+                gaps.forEach((gap, i) => {
+                    id += gap;
+                    ids[i] = id;
+                });
+                return ids;
+            });
+            searchStamps = new Uint32Array(data.docs.length);
+            searchIndex = data;
+        }
+        
+        function termPostings(word, prefix) {
+            // The exact term, or every term starting with the word being typed
+            const terms = searchIndex.terms;
+            let low = 0;
+            let high = terms.length;
+            while (low < high) {
+                const middle = (low + high) >> 1;
+                if (terms[middle] < word) {
+                    low = middle + 1;
+                } else {
+                    high = middle;
+                }
+            }
+            const lists = [];
+            for (let i = low; i < terms.length && terms[i].startsWith(word); i++) {
+                if (prefix || terms[i] === word) {
+                    lists.push(searchIndex.postings[i]);
+                }
+                if (!prefix) {
+                    break;
+                }
+            }
+            return lists;
+        }
+        
+        function searchSlides(query) {
+            const words = searchWords(query);
+            if (!words.length) {
+                return [];
+            }
+            const typing = !/\s$/.test(query);
+            // A paragraph's stamp is base + the number of words it matched so far
+            const base = searchBase;
+            searchBase += words.length + 2;
+            let lists = [];
+            words.forEach((word, k) => {
+                lists = termPostings(word, typing && k === words.length - 1);
+                for (const ids of lists) {
+                    for (const id of ids) {
+                        if (k === 0 || searchStamps[id] === base + k) {
+                            searchStamps[id] = base + k + 1;
+                        }
+                    }
+                }
+            });
+            const hits = [];
+            for (const ids of lists) {
+                for (const id of ids) {
+                    if (searchStamps[id] === base + words.length) {
+                        searchStamps[id] = base + words.length + 1;
+                        hits.push(id);
+                    }
+                }
+            }
+            return hits.sort((a, b) => a - b).slice(0, SEARCH_MAX_RESULTS);
+        }
+        
+        function showSearchResults(hits) {
+            const fragment = document.createDocumentFragment();
+            for (const id of hits) {
+                const [slide, text] = searchIndex.docs[id];
+                const item = document.createElement('button');
+                item.type = 'button';
+                item.className = 'search-result';
+                const number = document.createElement('span');
+                number.className = 'search-result-slide';
+                number.textContent = slide + 1;
+                item.append(number, text);
+                item.onclick = () => openSearchResult(slide);
+                fragment.appendChild(item);
+            }
+            searchResults.replaceChildren(fragment);
+            searchResults.hidden = !hits.length;
+        }
+        
+        function openSearchResult(slide) {
+            currentSlide = slide;
+            updateSlide();
+            searchResults.hidden = true;
+            searchInput.blur();
+        }
+        
+        async function runSearch() {
+            if (!searchIndex) {
+                searchLoading = searchLoading || loadSearchIndex();
+                await searchLoading;
+            }
+            showSearchResults(searchSlides(searchInput.value));
+        }
+        
+        if (typeof DecompressionStream === 'undefined') {
+            searchInput.parentElement.hidden = true;
+        }
+        searchInput.addEventListener('focus', () => {
+            searchLoading = searchLoading || loadSearchIndex();
+        });
+        searchInput.addEventListener('input', runSearch);
+        searchInput.addEventListener('keydown', (e) => {
+            // Typing must not move the slides
+            e.stopPropagation();
+            if (e.key === 'Enter' && searchResults.firstElementChild) {
+                searchResults.firstElementChild.click();
+            } else if (e.key === 'Escape') {
+                searchInput.value = '';
+                searchResults.hidden = true;
+                searchInput.blur();
+            }
+        });
+        searchResults.addEventListener('wheel', (e) => e.stopPropagation(), { passive: true });
+        document.addEventListener('keydown', (e) => {
+            if (e.key === '/' && document.activeElement !== searchInput) {
+                e.preventDefault();
+                searchInput.focus();
+            }
+        });
+    </script>
+""").replace('__MAX_RESULTS__', str(MAX_RESULTS))
+
+def slide_paragraphs(slides_data):
+    """[slide index, text] for every title and body paragraph, in deck order"""
+    docs = []
+    for slide_index, slide in enumerate(slides_data):
+        texts = ([slide['title']] if slide.get('title') else []) + list(slide.get('body', []))
+        docs.extend([slide_index, text] for text in texts if text.strip())
+    return docs
+
+def build_search_index(slides_data):
+    """Inverted index {'version', 'docs', 'terms', 'postings'}
+
+    terms are sorted; postings[i] lists the paragraphs containing terms[i] as
+    gaps between paragraph numbers.
+    """
+    docs = slide_paragraphs(slides_data)
+    postings = {}
+    for doc_id, (_, text) in enumerate(docs):
+        for term in index_terms(text):
+            postings.setdefault(term, []).append(doc_id)
+    terms = sorted(postings)
+    gaps = [[ids[0]] + [b - a for a, b in zip(ids, ids[1:])]
+            for ids in (postings[term] for term in terms)]
+    return {'version': INDEX_VERSION, 'docs': docs, 'terms': terms, 'postings': gaps}
+
+def encode_search_index(index):
+    """Compact JSON, gzip, base64"""
+    data = json.dumps(index, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return base64.b64encode(gzip.compress(data, compresslevel=9, mtime=0)).decode('ascii')
+
+def search_index_island(slides_data):
+    """The <script> data island holding the compressed index"""
+    encoded = encode_search_index(build_search_index(slides_data))
+    return f'    <script type="application/octet-stream" id="slideSearchIndex">{encoded}</script>\n'
+
+def search(index, query, limit=MAX_RESULTS):
+    """Paragraph numbers matching every query word - the runtime's algorithm
+
+    The last word matches as a prefix unless the query ends with a space.
+    """
+    words = normalize_words(query)
+    if not words:
+        return []
+    terms = index['terms']
+    postings = {}
+    matches = None
+    for k, word in enumerate(words):
+        prefix = k == len(words) - 1 and not query[-1:].isspace()
+        i = bisect.bisect_left(terms, word)
+        ids = set()
+        while i < len(terms) and terms[i].startswith(word) and (prefix or terms[i] == word):
+            if i not in postings:
+                postings[i] = set()
+                doc_id = 0
+                for gap in index['postings'][i]:
+                    doc_id += gap
+                    postings[i].add(doc_id)
+            ids |= postings[i]
+            i += 1
+        matches = ids if matches is None else matches & ids
+    return sorted(matches)[:limit]
+
+def main():
+    parser = argparse.ArgumentParser(description="אינדקס חיפוש למצגת HTML")
+    parser.add_argument('html_file', nargs='?', default="presentation_v2.html")
+    parser.add_argument('query', nargs='?')
+    args = parser.parse_args()
+    
+    slides_data = [{'title': slide['title'], 'body': slide['paragraphs']}
+                   for slide in parse_html_slides(args.html_file)]
+    index = build_search_index(slides_data)
+    raw_size = len(json.dumps(index, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+    print(f"{args.html_file}: {len(index['docs'])} פסקאות, {len(index['terms'])} מונחים, "
+          f"{raw_size:,} בתים → {len(encode_search_index(index)):,} בתים באי הנתונים")
+    if args.query:
+        for doc_id in search(index, args.query):
+            slide_index, text = index['docs'][doc_id]
+            print(f"  שקופית {slide_index + 1}: {text}")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"שגיאה: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Multi-pattern text replacement with an Aho-Corasick automaton
+All patterns are matched in one scan of the text with leftmost-longest
+semantics, so overlapping terms (מפוזר / מפוזרים) resolve to the longest one
+and every occurrence is counted exactly once. Paragraph text is matched as a
+whole and the replacements are mapped back onto the runs, so words that
+PowerPoint split across runs are found too.
+"""
+
+from collections import deque
+
+from pptx_patch_writer import NS, run_text, set_run_text
+
+def build_automaton(replacements):
+    """Compile {pattern: replacement} into goto table, failure links and match lengths"""
+    goto = [{}]
+    # Pattern lengths ending at each state, longest first
+    lengths = [()]
+    for pattern in replacements:
+        if not pattern:
+            raise ValueError("תבנית ריקה")
+        state = 0
+        for char in pattern:
+            next_state = goto[state].get(char)
+            if next_state is None:
+                next_state = len(goto)
+                goto[state][char] = next_state
+                goto.append({})
+                lengths.append(())
+            state = next_state
+        lengths[state] = (len(pattern),)
+    
+    # Breadth-first failure links; a state's lengths include its suffixes'
+    fail = [0] * len(goto)
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        for char, next_state in goto[state].items():
+            queue.append(next_state)
+            if state:
+                link = fail[state]
+                while link and char not in goto[link]:
+                    link = fail[link]
+                fail[next_state] = goto[link].get(char, 0)
+            lengths[next_state] = tuple(sorted(
+                set(lengths[next_state] + lengths[fail[next_state]]), reverse=True))
+    
+    return {
+        'replacements': dict(replacements),
+        'goto': goto,
+        'fail': fail,
+        'lengths': lengths,
+    }
+
+def find_matches(automaton, text):
+    """Non-overlapping leftmost-longest matches as (start, end) pairs"""
+    goto, fail, lengths = automaton['goto'], automaton['fail'], automaton['lengths']
+    longest = {}
+    state = 0
+    for end, char in enumerate(text, 1):
+        while state and char not in goto[state]:
+            state = fail[state]
+        state = goto[state].get(char, 0)
+        for length in lengths[state]:
+            start = end - length
+            if length > longest.get(start, 0):
+                longest[start] = length
+    
+    matches = []
+    position = 0
+    for start in sorted(longest):
+        if start >= position:
+            position = start + longest[start]
+            matches.append((start, position))
+    return matches
+
+def replace_in_runs(automaton, texts):
+    """Replace across consecutive text pieces (the runs of a paragraph)
+    
+    Matching runs over the joined text. A replacement is written into the
+    run where its match starts; the rest of the matched text is removed
+    from the runs it spilled into. Returns (new_texts, count).
+    """
+    full = ''.join(texts)
+    matches = find_matches(automaton, full)
+    if not matches:
+        return list(texts), 0
+    
+    replacements = automaton['replacements']
+    new_texts = []
+    index = 0
+    offset = 0
+    for text in texts:
+        end = offset + len(text)
+        pieces = []
+        position = offset
+        while position < end:
+            if index < len(matches) and matches[index][0] < end:
+                start, stop = matches[index]
+                if start > position:
+                    pieces.append(full[position:start])
+                    position = start
+                if position == start:
+                    pieces.append(replacements[full[start:stop]])
+                position = min(stop, end)
+                if stop <= end:
+                    index += 1
+            else:
+                pieces.append(full[position:end])
+                position = end
+        new_texts.append(''.join(pieces))
+        offset = end
+    return new_texts, len(matches)
+
+def replace_text(automaton, text):
+    """Replace all matches in a string, returns (new_text, count)"""
+    new_texts, count = replace_in_runs(automaton, [text])
+    return new_texts[0], count
+
+def replace_in_slide(slide, automaton):
+    """Apply the automaton to every paragraph of the slide's text shapes
+
+    Returns the number of replacements made.
+    """
+    count = 0
+    for p in slide.iterfind('./p:cSld/p:spTree/p:sp/p:txBody/a:p', NS):
+        runs = p.findall('a:r', NS)
+        if not runs:
+            continue
+        texts = [run_text(run) for run in runs]
+        new_texts, replaced = replace_in_runs(automaton, texts)
+        if not replaced:
+            continue
+        count += replaced
+        for run, old, new in zip(runs, texts, new_texts):
+            if old != new:
+                set_run_text(run, new)
+    return count
@@ -5,41 +5,40 @@ Update text in PowerPoint presentation
 Replace "מפוזר" with "מבוזר"
 """
 
-from pptx import Presentation
+import sys
+import zipfile
+
+from pptx_patch_writer import read_part_xml, serialize_xml, slide_part_names, write_patched_package
+from text_replacer import build_automaton, replace_in_slide
+
+REPLACEMENTS = {
+    'מפוזר': 'מבוזר',
+    'מפוזרים': 'מבוזרים',
+    'מפוזרות': 'מבוזרות',
+}
 
 def update_text_in_presentation(input_file, output_file):
     """Update text in presentation"""
     print(f"טוען מצגת: {input_file}")
-    prs = Presentation(input_file)
     
-    replacements = {
-        'מפוזר': 'מבוזר',
-        'מפוזרים': 'מבוזרים',
-        'מפוזרות': 'מבוזרות',
-    }
+    # One automaton for all terms: leftmost-longest, across run boundaries
+    automaton = build_automaton(REPLACEMENTS)
     
     changes_count = 0
+    patches = {}
     
-    for slide_idx, slide in enumerate(prs.slides):
-        for shape in slide.shapes:
-            if shape.has_text_frame:
-                for paragraph in shape.text_frame.paragraphs:
-                    for run in paragraph.runs:
-                        original_text = run.text
-                        new_text = original_text
-                        
-                        # Replace all occurrences
-                        for old, new in replacements.items():
-                            if old in new_text:
-                                new_text = new_text.replace(old, new)
-                                changes_count += new_text.count(new) - original_text.count(new)
-                        
-                        if new_text != original_text:
-                            run.text = new_text
-                            print(f"  שקופית {slide_idx + 1}: עודכן טקסט")
+    with zipfile.ZipFile(input_file) as package:
+        for slide_idx, slide_name in enumerate(slide_part_names(package)):
+            slide = read_part_xml(package, slide_name)
+            replaced = replace_in_slide(slide, automaton)
+            if replaced:
+                changes_count += replaced
+                patches[slide_name] = serialize_xml(slide)
+                print(f"  שקופית {slide_idx + 1}: עודכן טקסט ({replaced})")
     
+    # Only changed slides are rewritten, all other parts are copied as-is
     print(f"שומר ל: {output_file}")
-    prs.save(output_file)
+    write_patched_package(input_file, output_file, patches)
     print(f"\n✓ הושלם! בוצעו {changes_count} שינויים")
 
 if __name__ == "__main__":
@@ -47,7 +46,13 @@ if __name__ == "__main__":
     output_file = "ספריה דיגיטלית חכמה.pptx"
     
     try:
-        update_text_in_presentation(input_file, output_file)
+        if '--daemon' in sys.argv[1:]:
+            # The parsed deck stays in deck_daemon between runs
+            from deck_daemon import edit_via_daemon
+            edit_via_daemon(input_file, [{'id': 'mevuzar', 'type': 'replace',
+                                          'terms': REPLACEMENTS}], output_file)
+        else:
+            update_text_in_presentation(input_file, output_file)
     except Exception as e:
         print(f"שגיאה: {e}")
         import traceback
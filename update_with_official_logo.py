@@ -4,66 +4,40 @@
 Update all HTML files with official Ashdod Port logo from their website
 """
 
-import re
 import os
 
+from html_patch_engine import (HTML_FILES, LOGO_IMG_HTML, LOGO_IMG_TAG, LOGO_SRC,
+                               REMOVE_LOGO_SPRITE, logo_css_patches, patch_file, patch_files)
+
+OFFICIAL_LOGO_URL = "https://www.ashdodport.co.il/_catalogs/masterpage/AshdodPort/images/logo_big.png"
+
+def official_logo_patches():
+    """Image logo block plus img CSS; local file first, then website URL"""
+    logo_url = LOGO_SRC if os.path.exists(LOGO_SRC) else OFFICIAL_LOGO_URL
+    return [
+        {'id': 'logo-img', 'type': 'replace_logo', 'html': LOGO_IMG_HTML.format(src=logo_url)},
+        {'id': 'logo-graphics-img', 'type': 'replace_logo_graphics',
+         'html': LOGO_IMG_TAG.format(src=logo_url)},
+        REMOVE_LOGO_SPRITE,
+        # Update CSS to work with img
+        *logo_css_patches('svg', 'img'),
+        {'id': 'logo-radius', 'type': 'ensure_declaration', 'selector': '.logo img',
+         'property': 'border-radius', 'value': '8px'},
+    ]
+
 def update_logo_official(file_path):
     """Update logo to use official logo from Ashdod Port website"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Find logo div and replace with official logo
-    logo_pattern = r'(<div class="logo">.*?</div>)'
-    
-    # Use official logo - try local file first, then website URL
-    logo_file = "asdod_port_logo_official.png"
-    if os.path.exists(logo_file):
-        logo_url = logo_file
-    else:
-        logo_url = "https://www.ashdodport.co.il/_catalogs/masterpage/AshdodPort/images/logo_big.png"
-    
-    new_logo_html = f'''    <div class="logo">
-        <img src="{logo_url}" alt="לוגו נמל אשדוד" />
-    </div>'''
-    
-    if re.search(logo_pattern, content, re.DOTALL):
-        content = re.sub(logo_pattern, new_logo_html, content, flags=re.DOTALL)
-        
-        # Update CSS to work with img
-        if '.logo svg' in content:
-            content = content.replace('.logo svg', '.logo img')
-            # Add border-radius if not exists
-            if 'border-radius' not in content.split('.logo img')[1].split('}')[0]:
-                content = content.replace(
-                    '.logo img {',
-                    '.logo img {\n            border-radius: 8px;'
-                )
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        
-        return True
-    
-    return False
+    return bool(patch_file(file_path, official_logo_patches()))
 
 if __name__ == "__main__":
-    html_files = [
-        "presentation_v2.html",
-        "presentation_2key.html",
-        "presentation_v1.html",
-        "presentation.html"
-    ]
-    
     print("מעדכן לוגו רשמי של נמל אשדוד מהאתר...")
     
-    for html_file in html_files:
-        try:
-            if update_logo_official(html_file):
-                print(f"✓ עודכן {html_file}")
-            else:
-                print(f"  לא נמצא לוגו ב-{html_file}")
-        except Exception as e:
-            print(f"  שגיאה ב-{html_file}: {e}")
+    for html_file, (applied, error) in patch_files(HTML_FILES, official_logo_patches()).items():
+        if error:
+            print(f"  שגיאה ב-{html_file}: {error}")
+        elif applied:
+            print(f"✓ עודכן {html_file}")
+        else:
+            print(f"  לא נמצא לוגו ב-{html_file} או שהוא כבר מעודכן")
     
     print("\n✓ הושלם! הלוגו הרשמי מהאתר של נמל אשדוד נוסף.")
-
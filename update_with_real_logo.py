@@ -4,65 +4,37 @@
 Update all HTML files with real Ashdod Port logo from Wikimedia
 """
 
-import re
-import os
+from html_patch_engine import (HTML_FILES, LOGO_IMG_HTML, LOGO_IMG_TAG, REMOVE_LOGO_SPRITE,
+                               logo_css_patches, patch_file, patch_files)
 
-def update_logo_with_image(file_path, logo_path):
+# Use Wikimedia Commons direct URL (always use online version)
+LOGO_URL = "https://upload.wikimedia.org/wikipedia/commons/4/4a/%D7%9C%D7%95%D7%92%D7%95_%D7%A0%D7%9E%D7%9C_%D7%90%D7%A9%D7%93%D7%95%D7%93.jpg"
+
+PATCHES = [
+    {'id': 'logo-img', 'type': 'replace_logo', 'html': LOGO_IMG_HTML.format(src=LOGO_URL)},
+    {'id': 'logo-graphics-img', 'type': 'replace_logo_graphics',
+     'html': LOGO_IMG_TAG.format(src=LOGO_URL)},
+    REMOVE_LOGO_SPRITE,
+    # Update CSS to work with img instead of svg
+    *logo_css_patches('svg', 'img'),
+    # Add border-radius back
+    {'id': 'logo-radius', 'type': 'ensure_declaration', 'selector': '.logo img',
+     'property': 'border-radius', 'value': '8px'},
+]
+
+def update_logo_with_image(file_path, logo_path=None):
     """Update logo to use real image"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Find logo div and replace SVG with image
-    logo_pattern = r'(<div class="logo">.*?</div>)'
-    
-    # Use Wikimedia Commons direct URL (always use online version)
-    # Try different possible URLs
-    logo_src = "https://upload.wikimedia.org/wikipedia/commons/4/4a/%D7%9C%D7%95%D7%92%D7%95_%D7%A0%D7%9E%D7%9C_%D7%90%D7%A9%D7%93%D7%95%D7%93.jpg"
-    
-    new_logo_html = f'''    <div class="logo">
-        <img src="{logo_src}" alt="לוגו נמל אשדוד" />
-    </div>'''
-    
-    if re.search(logo_pattern, content, re.DOTALL):
-        content = re.sub(logo_pattern, new_logo_html, content, flags=re.DOTALL)
-        
-        # Update CSS to work with img instead of svg
-        if '.logo svg' in content:
-            content = content.replace('.logo svg', '.logo img')
-            # Add border-radius back
-            if 'border-radius' not in content.split('.logo img')[1].split('}')[0]:
-                content = content.replace(
-                    '.logo img {',
-                    '.logo img {\n            border-radius: 8px;'
-                )
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        
-        return True
-    
-    return False
+    return bool(patch_file(file_path, PATCHES))
 
 if __name__ == "__main__":
-    html_files = [
-        "presentation_v2.html",
-        "presentation_2key.html",
-        "presentation_v1.html",
-        "presentation.html"
-    ]
-    
-    logo_file = "asdod_port_logo_real.jpg"
-    
     print("מעדכן לוגו אמיתי של נמל אשדוד...")
     
-    for html_file in html_files:
-        try:
-            if update_logo_with_image(html_file, logo_file):
-                print(f"✓ עודכן {html_file}")
-            else:
-                print(f"  לא נמצא לוגו ב-{html_file}")
-        except Exception as e:
-            print(f"  שגיאה ב-{html_file}: {e}")
+    for html_file, (applied, error) in patch_files(HTML_FILES, PATCHES).items():
+        if error:
+            print(f"  שגיאה ב-{html_file}: {error}")
+        elif applied:
+            print(f"✓ עודכן {html_file}")
+        else:
+            print(f"  לא נמצא לוגו ב-{html_file} או שהוא כבר מעודכן")
     
     print("\n✓ הושלם!")
-